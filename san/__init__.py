@@ -1,41 +1,110 @@
-import json
+"""
+Python client for the Santiment API.
+
+Public names are loaded on first use, so `import san` does not pay for
+requests, pandas and the GraphQL helpers until they are needed.
+"""
 
-import requests
-from importlib.metadata import version, PackageNotFoundError
+import importlib
+import json
+import sys
+import types
 
 from .api_config import ApiConfig
-from .async_batch import AsyncBatch
-from .available_metrics import available_metric_for_slug_since, available_metric_versions, available_metrics, available_metrics_for_slug
-from .batch import Batch
 from .env_vars import SANPY_APIKEY
-from .get import get
-from .get_many import get_many
-from .execute_sql import execute_sql
-from .metadata import metadata
-from .metric_complexity import metric_complexity
-from .utility import api_calls_made, api_calls_remaining, is_rate_limit_exception, rate_limit_time_left
 
 if SANPY_APIKEY:
     ApiConfig.api_key = SANPY_APIKEY
 
 PROJECT = "sanpy"
 
-try:
-    __version__ = version(PROJECT)
-except PackageNotFoundError:
-    __version__ = "unknown"
+# Public name -> submodule defining it.
+_LAZY_ATTRIBUTES = {
+    "AsyncBatch": "async_batch",
+    "available_metric_for_slug_since": "available_metrics",
+    "available_metric_versions": "available_metrics",
+    "available_metrics": "available_metrics",
+    "available_metrics_for_slug": "available_metrics",
+    "Batch": "batch",
+    "ResponseCache": "cache",
+    "MetricCatalog": "catalog",
+    "SqlResultCache": "sql_cache",
+    "get": "get",
+    "get_many": "get_many",
+    "execute_sql": "execute_sql",
+    "execute_sql_iter": "execute_sql",
+    "execute_sql_many": "execute_sql",
+    "execute_sql_many_iter": "execute_sql",
+    "metadata": "metadata",
+    "metric_complexity": "metric_complexity",
+    "rate_limit_stats": "rate_limit",
+    "coalescing_stats": "singleflight",
+    "TimeseriesStore": "timeseries_store",
+    "api_calls_made": "utility",
+    "api_calls_remaining": "utility",
+    "is_rate_limit_exception": "utility",
+    "rate_limit_time_left": "utility",
+}
+
+# Functions named like the submodule they live in. Importing the submodule must not replace them.
+_SHADOWED_SUBMODULES = {name for name, module in _LAZY_ATTRIBUTES.items() if name == module}
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        if name in _SHADOWED_SUBMODULES and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+
+def __getattr__(name):
+    if name == "__version__":
+        # Reading the installed metadata is slow, so it is done on first access.
+        value = _installed_version()
+        globals()[name] = value
+        return value
+
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is not None:
+        value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+        globals()[name] = value
+        return value
+
+    if not name.startswith("__"):
+        # Submodules such as san.graphql stay reachable as attributes after `import san`.
+        try:
+            return importlib.import_module(f".{name}", __name__)
+        except ModuleNotFoundError as exc:
+            if exc.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | {"__version__"})
+
+
+def _installed_version():
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(PROJECT)
+    except PackageNotFoundError:
+        return "unknown"
 
 
 def get_latest():
+    import requests
+
     url = "https://pypi.python.org/pypi/%s/json" % (PROJECT)
     try:
         response = requests.get(url).text
         return json.loads(response)["info"]["version"]
     except requests.exceptions.RequestException:
-        try:
-            return version(PROJECT)
-        except PackageNotFoundError:
-            return "unknown"
+        return _installed_version()
 
 
 __all__ = [
@@ -47,13 +116,22 @@ __all__ = [
     "available_metrics",
     "available_metrics_for_slug",
     "Batch",
+    "ResponseCache",
+    "MetricCatalog",
+    "SqlResultCache",
     "get",
     "get_many",
     "execute_sql",
+    "execute_sql_iter",
+    "execute_sql_many",
+    "execute_sql_many_iter",
     "metadata",
     "metric_complexity",
+    "TimeseriesStore",
     "api_calls_made",
     "api_calls_remaining",
     "is_rate_limit_exception",
     "rate_limit_time_left",
+    "rate_limit_stats",
+    "coalescing_stats",
 ]
@@ -0,0 +1,23 @@
+"""
+Native asyncio API. Requires the optional httpx dependency (`pip install 'sanpy[async]'`).
+
+    import san.aio
+
+    df = await san.aio.get("price_usd", slug="bitcoin", from_date="utc_now-30d", to_date="utc_now")
+"""
+
+from .batch import Batch
+from .execute_sql import execute_sql
+from .get import get
+from .get_many import get_many
+from .graphql import execute_gql
+from .transport import AsyncTransport
+
+__all__ = [
+    "AsyncTransport",
+    "Batch",
+    "execute_gql",
+    "execute_sql",
+    "get",
+    "get_many",
+]
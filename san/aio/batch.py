@@ -0,0 +1,35 @@
+import asyncio
+
+from san.aio.get import get
+from san.aio.get_many import get_many
+from san.param_validation import validate_kwargs
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+class Batch:
+    """
+    Async counterpart of san.AsyncBatch. Every query is sent as a separate
+    request and up to `max_concurrency` of them are in flight at once on the
+    running event loop.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def get(self, dataset, **kwargs):
+        validate_kwargs("san.aio.Batch.get", kwargs)
+        self.queries.append([get, dataset, kwargs])
+
+    def get_many(self, dataset, **kwargs):
+        validate_kwargs("san.aio.Batch.get_many", kwargs)
+        self.queries.append([get_many, dataset, kwargs])
+
+    async def execute(self, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(fetch, dataset, kwargs):
+            async with semaphore:
+                return await fetch(dataset, **kwargs)
+
+        return list(await asyncio.gather(*(run(fetch, dataset, kwargs) for fetch, dataset, kwargs in self.queries)))
@@ -0,0 +1,24 @@
+from san.aio.graphql import execute_gql
+from san.error import SanError
+from san.execute_sql import build_sql_query, transform_sql_result
+
+
+async def execute_sql(**kwargs):
+    """
+    Async version of san.execute_sql, accepting the same arguments.
+
+    await san.aio.execute_sql(
+        query="SELECT dt, value FROM daily_metrics_v2 LIMIT {{limit}}",
+        parameters={"limit": 10},
+        set_index="dt")
+    """
+    if "query" in kwargs:
+        query = kwargs.pop("query")
+    else:
+        raise SanError("The 'query' argument is required when calling 'execute_sql'")
+
+    parameters = kwargs.pop("parameters", {})
+    idx = kwargs.pop("idx", 0)
+
+    res = await execute_gql(build_sql_query(query, parameters, idx))
+    return transform_sql_result(res, idx, **kwargs)
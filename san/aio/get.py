@@ -0,0 +1,34 @@
+import asyncio
+import functools
+
+import san
+from san.aio.graphql import execute_gql
+from san.get import build_get_query
+from san.param_validation import validate_kwargs
+from san.query import parse_dataset
+from san.query_constants import CUSTOM_QUERIES
+from san.transform import transform_timeseries_data_query_result
+
+
+async def get(dataset, **kwargs):
+    """
+    Async version of san.get, accepting the same arguments.
+
+    await san.aio.get(
+        "daily_active_addresses",
+        slug="bitcoin",
+        from_date="2020-01-01",
+        to_date="2020-01-10")
+    """
+    validate_kwargs("san.aio.get", kwargs)
+    query, slug = parse_dataset(dataset)
+    if slug and query in CUSTOM_QUERIES:
+        # Custom queries are composed of several blocking calls, keep them off the event loop.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(san.get, dataset, **kwargs))
+
+    as_arrow = kwargs.pop("as_arrow", False)
+    idx, gql_query = build_get_query(dataset, **kwargs)
+    res = await execute_gql(gql_query)
+
+    return transform_timeseries_data_query_result(idx, query, res, as_arrow=as_arrow)
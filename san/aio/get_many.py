@@ -0,0 +1,25 @@
+from san.aio.graphql import execute_gql
+from san.get_many import build_get_many_query
+from san.param_validation import validate_kwargs
+from san.query import parse_dataset
+from san.transform import transform_timeseries_data_per_slug_query_result
+
+
+async def get_many(dataset, **kwargs):
+    """
+    Async version of san.get_many, accepting the same arguments.
+
+    await san.aio.get_many(
+        "daily_active_addresses",
+        slugs=["bitcoin", "ethereum"],
+        from_date="2020-01-01",
+        to_date="2020-01-10")
+    """
+    validate_kwargs("san.aio.get_many", kwargs)
+    long_format = kwargs.pop("long_format", False)
+    as_arrow = kwargs.pop("as_arrow", False)
+    query, _slug = parse_dataset(dataset)
+    idx, gql_query = build_get_many_query(query, **kwargs)
+    res = await execute_gql(gql_query)
+
+    return transform_timeseries_data_per_slug_query_result(idx, query, res, long_format=long_format, as_arrow=as_arrow)
@@ -0,0 +1,26 @@
+from san.aio.transport import AsyncTransport
+from san.api_config import ApiConfig
+from san.graphql import build_headers, handle_response
+from san.rate_limit import RATE_LIMITER
+
+DEFAULT_TRANSPORT = AsyncTransport()
+
+
+async def execute_gql(gql_query_str):
+    cache = ApiConfig.cache
+    if cache is not None:
+        cached = cache.get(gql_query_str, ApiConfig.api_key)
+        if cached is not None:
+            return cached
+
+    await RATE_LIMITER.acquire_async()
+    response = None
+    try:
+        response = await DEFAULT_TRANSPORT.execute(gql_query_str, headers=build_headers())
+    finally:
+        RATE_LIMITER.release(response)
+    data = handle_response(response, gql_query_str)
+
+    if cache is not None:
+        cache.set(gql_query_str, data, ApiConfig.api_key)
+    return data
@@ -0,0 +1,74 @@
+import asyncio
+import weakref
+
+try:
+    import httpx
+except ImportError as exc:
+    raise ImportError("san.aio requires httpx. Install it with `pip install 'sanpy[async]'`.") from exc
+
+from san.api_config import ApiConfig
+from san.env_vars import SANBASE_GQL_HOST
+from san.httpx_support import build_timeout, retry_delay
+from san.transport import request_payload
+
+
+class AsyncTransport:
+    """
+    asyncio counterpart of san.transport.RequestsTransport.
+
+    Keeps one pooled httpx.AsyncClient per event loop and applies the same
+    timeout and retry settings from ApiConfig.
+    """
+
+    def __init__(self, base_url=SANBASE_GQL_HOST):
+        self.base_url = base_url
+        self._clients = weakref.WeakKeyDictionary()
+
+    async def execute(self, gql_query_str, headers=None):
+        client = self._get_client()
+        request_headers = headers or {}
+        retry_number = 0
+
+        while True:
+            try:
+                response = await client.post(
+                    self.base_url,
+                    json=request_payload(gql_query_str),
+                    headers=request_headers,
+                    timeout=build_timeout(),
+                )
+            except httpx.HTTPError as exc:
+                delay = retry_delay(retry_number, exc=exc)
+            else:
+                delay = retry_delay(retry_number, response=response)
+                if delay is None:
+                    return response
+
+            retry_number += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        """Close the client bound to the running event loop."""
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].aclose()
+
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        config_signature = self._config_signature()
+        if entry is None or entry[1] != config_signature:
+            if entry is not None:
+                loop.create_task(entry[0].aclose())
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=ApiConfig.aio_max_connections,
+                    max_keepalive_connections=ApiConfig.pool_maxsize,
+                ),
+            )
+            entry = (client, config_signature)
+            self._clients[loop] = entry
+        return entry[0]
+
+    def _config_signature(self):
+        return (ApiConfig.aio_max_connections, ApiConfig.pool_maxsize)
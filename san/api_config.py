@@ -9,6 +9,55 @@ class ApiConfig:
     pool_connections = 10
     # Maximum number of reusable connections kept per pool.
     pool_maxsize = 10
+    # Send only the SHA-256 of previously seen documents (Automatic Persisted Queries).
+    # Requires server support; the full document is sent whenever the server asks for it.
+    persisted_queries = False
+    # Ask for compressed responses (gzip, deflate, and br / zstd when brotli / zstandard are installed).
+    response_compression = True
+    # Gzip request bodies of at least this many bytes. Requires server support; None never compresses them.
+    request_compression_threshold = None
+    # Transport used by execute_gql, e.g. san.http2_transport.Http2Transport(). None uses san.graphql.DEFAULT_TRANSPORT.
+    transport = None
+    # Maximum number of concurrent connections opened by the san.aio transport.
+    aio_max_connections = 100
     # When True, passing unknown keyword arguments to san.get / san.get_many /
     # AsyncBatch raises SanError instead of being silently ignored.
     strict_kwargs = True
+    # Decoder for response bodies: "auto" (orjson when installed), "json" or "orjson".
+    json_parser = "auto"
+    # Parse timeseries and SQL responses of san.get / san.get_many / san.execute_sql
+    # while they download to lower peak memory. Bypasses the cache and request coalescing.
+    stream_responses = False
+    # Build san.execute_sql columns with the dtypes of their ClickHouse columnTypes
+    # (datetimes, integers, floats, categoricals). False keeps the JSON values as they are.
+    sql_column_types = True
+    # Optional san.ResponseCache used by execute_gql. None disables caching.
+    cache = None
+    # Optional san.SqlResultCache used by san.execute_sql and its paged / many variants. None disables it.
+    sql_cache = None
+    # Optional san.MetricCatalog answering san.available_metrics* and san.metadata from memory.
+    catalog = None
+    # Date-range chunking used by san.get / san.get_many when `chunk_size` is passed.
+    # "auto" windows hold at most this many points (points x slugs for get_many).
+    chunk_max_points = 10000
+    # Number of windows, or san.get_many slug shards, fetched concurrently.
+    chunk_max_workers = 4
+    # How many times a window failing with a size limit or timeout is halved and retried.
+    chunk_max_splits = 4
+    # san.get_many splits slug lists into shards of at most this many estimated
+    # points (slugs x intervals in the range) when `shard_size` is "auto".
+    shard_max_points = 200000
+    # Let concurrent execute_gql calls with an identical query share one HTTP request.
+    coalesce_requests = True
+    # Pace requests using the x-ratelimit-remaining-* response headers so the
+    # API budget is not exceeded.
+    rate_limit_pacing = True
+    # Calls per window kept in reserve for other processes using the same API key.
+    rate_limit_reserve = 0
+    # Waits longer than this many seconds raise SanRateLimitError instead of sleeping.
+    rate_limit_max_wait = 60
+    # Complexity budget per GraphQL document for Batch.execute. When set, batches are
+    # split into several documents that are executed concurrently. None sends one document.
+    batch_max_complexity = None
+    # Complexity assumed for Batch queries that are not getMetric timeseries.
+    batch_default_complexity = 1000
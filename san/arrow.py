@@ -0,0 +1,137 @@
+"""
+pyarrow Tables built straight from response columns.
+
+`san.get`, `san.get_many` and `san.execute_sql` return a `pyarrow.Table`
+instead of a DataFrame when called with `as_arrow=True`. getMetric points,
+per-slug points and SQL rows are turned into Arrow arrays without building a
+pandas frame first. Requires `pip install 'sanpy[arrow]'`.
+"""
+
+import numpy as np
+
+from san.error import SanError
+from san.streaming import StreamedColumns
+
+# Timestamps of every table, matching what `Table.to_pandas()` callers expect from the frames.
+TIMESTAMP_UNIT = "us"
+
+
+def pyarrow():
+    """Import pyarrow, which is slow to import and optional."""
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise SanError("as_arrow=True requires pyarrow. Install it with `pip install 'sanpy[arrow]'`.") from exc
+    return pyarrow
+
+
+def timeseries_table(points):
+    """Table with a "datetime" column and one column per field of a timeseriesDataJson result."""
+    pa = pyarrow()
+    if isinstance(points, StreamedColumns) and points.is_columnar:
+        columns = points.columns or {}
+    else:
+        if isinstance(points, StreamedColumns):
+            points = points.records()
+        keys = list(dict.fromkeys(key for point in points for key in point))
+        columns = {key: [point.get(key) for point in points] for key in keys}
+
+    if not columns:
+        return pa.table({})
+    names = ["datetime"] + [name for name in columns if name != "datetime"]
+    arrays = [timestamps(columns["datetime"]) if name == "datetime" else pa.array(columns[name]) for name in names]
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def per_slug_table(datetimes, counts, slugs, values):
+    """Long table with "datetime", "slug" and "value" columns and one row per point."""
+    pa = pyarrow()
+    rows = np.repeat(np.arange(len(datetimes)), counts)
+    return pa.Table.from_arrays(
+        [timestamps(datetimes).take(pa.array(rows, type=pa.int64())), pa.array(slugs, type=pa.string()), pa.array(values)],
+        names=["datetime", "slug", "value"],
+    )
+
+
+def sql_table(columns, values, column_types=None):
+    """
+    Table of a runRawSqlQuery result from its values, one list per column,
+    typed like execute_sql frames when column_types are given. Column names
+    may repeat, as in the SQL result.
+    """
+    pa = pyarrow()
+    if column_types is not None:
+        from san.sql_types import sql_column
+
+        values = [sql_column(column, column_type) for column, column_type in zip(values, column_types)]
+    return pa.Table.from_arrays([pa.array(column) for column in values], names=list(columns))
+
+
+def frame_table(frame):
+    """Table of a DataFrame built by the transforms of non-getMetric queries, keeping its index as a column."""
+    pa = pyarrow()
+    if frame.index.name is None:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    return pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+
+
+def timestamps(values):
+    """UTC timestamp array from API datetime strings."""
+    pa = pyarrow()
+    timestamp_type = pa.timestamp(TIMESTAMP_UNIT, tz="UTC")
+    try:
+        return pa.array(values, type=pa.string()).cast(timestamp_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Strings without a zone offset go through the more lenient pandas parser.
+        from san.pandas_utils import parse_utc_datetimes
+
+        return pa.array(parse_utc_datetimes(values)).cast(timestamp_type, safe=False)
+
+
+def merge_tables(tables):
+    """
+    Concatenate the tables of consecutive date windows. Rows at the boundary
+    shared with the next window are taken from the later window, like
+    chunking.merge_frames, and the result is sorted by "datetime".
+    """
+    pa = pyarrow()
+    import pyarrow.compute as pc
+
+    tables = [table for table in tables if table.num_rows > 0]
+    if not tables:
+        return pa.table({})
+
+    trimmed = []
+    for table, next_table in zip(tables, tables[1:] + [None]):
+        if next_table is not None:
+            table = table.filter(pc.less(table["datetime"], pc.min(next_table["datetime"])))
+        trimmed.append(table)
+    return pa.concat_tables(_unify_numeric_columns(trimmed)).sort_by("datetime")
+
+
+def concat_tables(tables):
+    """Concatenate long get_many tables of different slugs, sorted by "datetime" with the slug order kept."""
+    pa = pyarrow()
+    tables = [table for table in tables if table.num_rows > 0]
+    if not tables:
+        return pa.table({})
+    return pa.concat_tables(_unify_numeric_columns(tables)).sort_by("datetime")
+
+
+def _unify_numeric_columns(tables):
+    """Windows can infer int64 for a column another window holds as double; use double for all of them."""
+    pa = pyarrow()
+    schema = tables[0].schema
+    if all(table.schema.equals(schema) for table in tables):
+        return tables
+
+    unified = []
+    for table in tables:
+        columns = []
+        for name, column in zip(table.column_names, table.columns):
+            types = {other.schema.field(name).type for other in tables}
+            if len(types) > 1 and all(pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_null(t) for t in types):
+                column = column.cast(pa.float64())
+            columns.append(column)
+        unified.append(pa.Table.from_arrays(columns, names=table.column_names))
+    return unified
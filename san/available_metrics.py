@@ -1,16 +1,31 @@
+import functools
 import inspect
 import san.sanbase_graphql
+from san.api_config import ApiConfig
 from san.graphql import execute_gql
 
 
 def available_metrics():
-    sanbase_graphql_functions = inspect.getmembers(san.sanbase_graphql, inspect.isfunction)
-    all_functions = list(map(lambda x: x[0], sanbase_graphql_functions)) + execute_gql("{query: getAvailableMetrics}")["query"]
+    if ApiConfig.catalog is not None:
+        return ApiConfig.catalog.available_metrics()
+    return combine_metrics(execute_gql("{query: getAvailableMetrics}")["query"])
+
+
+def combine_metrics(api_metrics):
+    """The sanbase_graphql query functions followed by the metrics reported by the API."""
+    all_functions = list(_sanbase_graphql_functions()) + api_metrics
     all_functions = list(filter(lambda x: not (str.startswith(x, "get_metric") or str.startswith(x, "_")), all_functions))
     return all_functions
 
 
+@functools.lru_cache(maxsize=None)
+def _sanbase_graphql_functions():
+    return tuple(name for name, _ in inspect.getmembers(san.sanbase_graphql, inspect.isfunction))
+
+
 def available_metrics_for_slug(slug):
+    if ApiConfig.catalog is not None:
+        return ApiConfig.catalog.available_metrics_for_slug(slug)
     query_str = (
         """{{
         projectBySlug(slug: \"{slug}\"){{
@@ -24,6 +39,8 @@ def available_metrics_for_slug(slug):
 
 
 def available_metric_versions(metric):
+    if ApiConfig.catalog is not None:
+        return ApiConfig.catalog.available_metric_versions(metric)
     query_str = (
         """{{
         getMetric(metric: \"{metric}\"){{
@@ -43,6 +60,8 @@ def available_metric_versions(metric):
 
 
 def available_metric_for_slug_since(metric, slug):
+    if ApiConfig.catalog is not None:
+        return ApiConfig.catalog.available_metric_for_slug_since(metric, slug)
     query_str = (
         """{{
         getMetric(metric: \"{metric}\"){{
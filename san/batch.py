@@ -1,26 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import san.sanbase_graphql
+import san.sanbase_graphql_helper as sgh
+from san.api_config import ApiConfig
 from san.sanbase_graphql_helper import QUERY_MAPPING
 from san.query import get_gql_query
+from san.query_builder import build_document
 from san.graphql import execute_gql
+from san.metric_complexity import metric_complexities
 from san.transform import transform_timeseries_data_query_result
 from san.error import SanError
 from san.param_validation import validate_kwargs
 
+_DEFAULT_FROM_DATE = "utc_now-365d"
+_DEFAULT_TO_DATE = "utc_now"
+
 
 class Batch:
     def __init__(self):
         self.queries = []
 
     def get(self, dataset, **kwargs):
+        if "chunk_size" in kwargs:
+            raise SanError('"chunk_size" is not supported by Batch, use AsyncBatch or san.get instead')
         validate_kwargs("Batch.get", kwargs)
         self.queries.append([dataset, kwargs])
 
-    def execute(self):
-        graphql_string = self.__create_batched_query_string()
-        result = execute_gql(graphql_string)
+    def execute(self, max_complexity=None, max_workers=10):
+        """
+        Run the queued queries and return their frames in the order they were added.
+
+        With a complexity budget (`max_complexity` or ApiConfig.batch_max_complexity)
+        the queries are packed into several GraphQL documents that each stay under
+        the budget and are executed concurrently by up to `max_workers` threads.
+        """
+        batched_queries = self.__create_batched_queries()
+        max_complexity = ApiConfig.batch_max_complexity if max_complexity is None else max_complexity
+        if max_complexity is not None and max_complexity <= 0:
+            raise SanError(f"max_complexity must be positive, got {max_complexity!r}")
+        if max_complexity is None:
+            documents = [batched_queries]
+        else:
+            documents = self.__pack_documents(batched_queries, max_complexity)
+
+        if len(documents) == 1:
+            result = execute_gql(self.__batch_gql_queries(documents[0]))
+        else:
+            result = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for document_result in executor.map(execute_gql, map(self.__batch_gql_queries, documents)):
+                    result.update(document_result)
         return self.__transform_batch_result(result)
 
-    def __create_batched_query_string(self):
+    def __create_batched_queries(self):
         batched_queries = []
 
         for idx, query in enumerate(self.queries):
@@ -29,10 +61,41 @@ class Batch:
                 batched_queries.append(get_gql_query(idx, query[0], **query[1]))
             else:
                 if slug != "":
-                    batched_queries.append(san.sanbase_graphql.get_metric_timeseries_data(idx, metric, slug, **query[1]))
+                    batched_queries.append(san.sanbase_graphql._timeseries_data_fragment(idx, metric, slug, **query[1]))
                 else:
                     raise SanError("Invalid metric!")
-        return self.__batch_gql_queries(batched_queries)
+        return batched_queries
+
+    def __estimate_complexities(self):
+        complexities = [ApiConfig.batch_default_complexity] * len(self.queries)
+        requests = {}
+        for idx, [dataset, kwargs] in enumerate(self.queries):
+            metric = dataset.partition("/")[0]
+            if metric not in QUERY_MAPPING:
+                # The default range is the relative one the queries use, so its complexity stays cached across calls.
+                requests[idx] = (
+                    metric,
+                    kwargs.get("from_date", _DEFAULT_FROM_DATE),
+                    kwargs.get("to_date", _DEFAULT_TO_DATE),
+                    kwargs.get("interval", sgh._DEFAULT_INTERVAL),
+                )
+
+        for idx, complexity in zip(requests.keys(), metric_complexities(list(requests.values()))):
+            complexities[idx] = complexity
+        return complexities
+
+    def __pack_documents(self, batched_queries, max_complexity):
+        # First-fit decreasing: every document stays under the budget unless a single query exceeds it.
+        documents = []
+        for complexity, query in sorted(zip(self.__estimate_complexities(), batched_queries), key=lambda x: -x[0]):
+            for document in documents:
+                if document["complexity"] + complexity <= max_complexity:
+                    document["complexity"] += complexity
+                    document["queries"].append(query)
+                    break
+            else:
+                documents.append({"complexity": complexity, "queries": [query]})
+        return [document["queries"] for document in documents]
 
     def __transform_batch_result(self, graphql_result):
         result = []
@@ -45,9 +108,4 @@ class Batch:
         return result
 
     def __batch_gql_queries(self, batched_queries):
-        gql_string = "{\n"
-        for q in batched_queries:
-            gql_string = gql_string + q + "\n"
-
-        gql_string = gql_string + "}"
-        return gql_string
+        return build_document(batched_queries)
@@ -0,0 +1,226 @@
+"""
+Persistent on-disk cache for GraphQL responses.
+
+The cache is opt-in. Enable it by assigning an instance to ApiConfig:
+
+    san.ApiConfig.cache = san.ResponseCache()
+
+Entries are keyed by the normalized query text, its variables and a hash of
+the API key, so responses fetched with one key are never served to another.
+Versioned metrics are kept apart because the version is part of the query text.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from san.query_builder import variables_text
+
+# String literals, in which whitespace is kept, are delimited by double quotes in GraphQL and single quotes in SQL.
+_STRING_OR_WHITESPACE_RES = {quote: re.compile(rf"({quote}(?:\\.|[^{quote}\\])*{quote})|\s+") for quote in "\"'"}
+_METRIC_RE = re.compile(r'getMetric\s*\(\s*metric:\s*"([^"]+)"')
+_INCOMPLETE_DATA_RE = re.compile(r'includeIncompleteData(?::|_\d+":)\s*true')
+_RELATIVE_DATE_MARKER = "utc_now"
+# Queries touching account state must always reach the API.
+_UNCACHEABLE_MARKERS = ("currentUser",)
+
+DEFAULT_TTL = 24 * 60 * 60
+RELATIVE_DATE_TTL = 5 * 60
+INCOMPLETE_DATA_TTL = 60
+DEFAULT_MAX_SIZE_BYTES = 512 * 1024 * 1024
+
+
+def default_cache_dir():
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", Path.home())
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+
+    return Path(base) / "sanpy"
+
+
+def collapse_whitespace(text, quote='"'):
+    """Collapse whitespace outside of the string literals delimited by quote."""
+    return _STRING_OR_WHITESPACE_RES[quote].sub(lambda m: m.group(1) or " ", text).strip()
+
+
+def normalize_query(gql_query_str):
+    """Collapse whitespace outside of string literals so formatting does not affect the key."""
+    return collapse_whitespace(gql_query_str)
+
+
+def api_key_scope(api_key):
+    if not api_key:
+        return "anonymous"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class SqliteStore:
+    """
+    Size-bounded SQLite table of serialized entries, shared by ResponseCache
+    and san.sql_cache.SqlResultCache.
+
+    Every entry expires after its TTL, and above max_size_bytes the least
+    recently used entries are evicted. Subclasses name the table, add columns
+    stored with each entry, and build the keys and values.
+    """
+
+    table = None
+    # (name, SQL type) of the columns stored with every entry besides the value.
+    extra_columns = ()
+
+    def __init__(self, path, max_size_bytes):
+        self.path = Path(path)
+        self.max_size_bytes = max_size_bytes
+
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        extra_columns = "".join(f"{name} {sql_type},\n" for name, sql_type in self.extra_columns)
+        self._connection.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                {extra_columns}value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._connection.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at ON {self.table} (accessed_at)")
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute(f"DELETE FROM {self.table}")
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._connection.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+            stats = dict(self._counters)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = entries
+        stats["size_bytes"] = size
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _read(self, key, columns=()):
+        """Return the value of an entry followed by the given extra columns, or None on a miss."""
+        selected = ", ".join(("value", "expires_at") + tuple(columns))
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(f"SELECT {selected} FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._counters["misses"] += 1
+                return None
+
+            self._connection.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._counters["hits"] += 1
+
+        return (row[0],) + tuple(row[2:])
+
+    def _write(self, key, value, ttl, **columns):
+        """Store a serialized value with the extra columns, unless ttl is not positive or it is above max_size_bytes."""
+        if ttl <= 0 or len(value) > self.max_size_bytes:
+            return
+
+        names = ("key", "value", "size", "expires_at", "accessed_at") + tuple(columns)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                (key, value, len(value), now + ttl, now) + tuple(columns.values()),
+            )
+            self._counters["writes"] += 1
+            self._evict(now)
+
+    def _evict(self, now):
+        self._connection.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+        (size,) = self._connection.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        if size <= self.max_size_bytes:
+            return
+
+        rows = self._connection.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC").fetchall()
+        for key, entry_size in rows:
+            if size <= self.max_size_bytes:
+                break
+            self._connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._counters["evictions"] += 1
+            size -= entry_size
+
+
+class ResponseCache(SqliteStore):
+    """
+    Size-bounded SQLite-backed store of `execute_gql` results.
+
+    Args:
+        path: Location of the SQLite file. Defaults to <user cache dir>/sanpy/responses.sqlite
+        default_ttl: Seconds a response for fixed historical dates stays valid
+        metric_ttls: Per-metric TTL overrides, e.g. {"price_usd": 600}
+        relative_date_ttl: TTL for queries using `utc_now` relative dates
+        incomplete_data_ttl: TTL for queries with includeIncompleteData: true
+        max_size_bytes: Least recently used entries are evicted above this size
+    """
+
+    table = "responses"
+
+    def __init__(
+        self,
+        path=None,
+        default_ttl=DEFAULT_TTL,
+        metric_ttls=None,
+        relative_date_ttl=RELATIVE_DATE_TTL,
+        incomplete_data_ttl=INCOMPLETE_DATA_TTL,
+        max_size_bytes=DEFAULT_MAX_SIZE_BYTES,
+    ):
+        super().__init__(path if path is not None else default_cache_dir() / "responses.sqlite", max_size_bytes)
+        self.default_ttl = default_ttl
+        self.metric_ttls = dict(metric_ttls or {})
+        self.relative_date_ttl = relative_date_ttl
+        self.incomplete_data_ttl = incomplete_data_ttl
+
+    def get(self, gql_query_str, api_key=None):
+        """Return the cached result for the query or None on a miss."""
+        if not self.is_cacheable(gql_query_str):
+            return None
+
+        row = self._read(self.key(gql_query_str, api_key))
+        return None if row is None else json.loads(row[0])
+
+    def set(self, gql_query_str, data, api_key=None):
+        if not self.is_cacheable(gql_query_str):
+            return
+
+        value = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self._write(self.key(gql_query_str, api_key), value, self.ttl_for(gql_query_str))
+
+    def ttl_for(self, gql_query_str):
+        """Shortest TTL that applies to any part of the (possibly batched) query."""
+        metric_ttls = [self.metric_ttls.get(metric, self.default_ttl) for metric in _METRIC_RE.findall(gql_query_str)]
+        ttls = metric_ttls or [self.default_ttl]
+
+        text = gql_query_str + variables_text(gql_query_str)
+        if _RELATIVE_DATE_MARKER in text:
+            ttls.append(self.relative_date_ttl)
+        if _INCOMPLETE_DATA_RE.search(text):
+            ttls.append(self.incomplete_data_ttl)
+
+        return min(ttls)
+
+    def key(self, gql_query_str, api_key=None):
+        payload = api_key_scope(api_key) + "\n" + normalize_query(gql_query_str) + variables_text(gql_query_str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, gql_query_str):
+        return not any(marker in gql_query_str for marker in _UNCACHEABLE_MARKERS)
@@ -0,0 +1,310 @@
+"""
+Local catalog of available metrics, per-slug availability and metric metadata.
+
+    catalog = san.MetricCatalog()
+    catalog.load(slugs=slugs, metrics=["price_usd", "daily_active_addresses"], available_since=True)
+    san.ApiConfig.catalog = catalog
+
+`load` fetches everything in a few aliased GraphQL documents of `batch_size`
+fields each. With ApiConfig.catalog set, `san.available_metrics`,
+`san.available_metrics_for_slug`, `san.available_metric_versions`,
+`san.available_metric_for_slug_since` and `san.metadata` answer from memory;
+entries the catalog does not hold, or that are older than `max_age`, are
+fetched and added. The catalog is kept on disk per API key, since access
+depends on the plan.
+"""
+
+import json
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from san.api_config import ApiConfig
+from san.available_metrics import combine_metrics
+from san.cache import api_key_scope, default_cache_dir
+from san.error import SanEmptyResultError, SanGraphqlQueryError, SanPartialResultWarning
+from san.graphql import execute_gql
+
+DEFAULT_MAX_AGE = 24 * 60 * 60
+DEFAULT_BATCH_SIZE = 100
+VERSIONS_FIELD = "availableVersions { version }"
+# Metadata loaded for every metric by `load`. availableSlugs is left out, it is large and per-slug availability covers it.
+METADATA_FIELDS = (
+    VERSIONS_FIELD,
+    "defaultAggregation",
+    "humanReadableName",
+    "isAccessible",
+    "isRestricted",
+    "restrictedFrom",
+    "restrictedTo",
+)
+
+_FORMAT_VERSION = 1
+
+
+class MetricCatalog:
+    """
+    Args:
+        path: JSON file the catalog is kept in. Defaults to <user cache dir>/sanpy/catalog.json
+        max_age: Seconds after which an entry is fetched again. None keeps entries until refresh()
+        batch_size: Aliased fields per GraphQL document
+        max_workers: Documents fetched concurrently
+    """
+
+    def __init__(self, path=None, max_age=DEFAULT_MAX_AGE, batch_size=DEFAULT_BATCH_SIZE, max_workers=4):
+        self.path = Path(path).expanduser() if path is not None else default_cache_dir() / "catalog.json"
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "requests": 0}
+        self._scopes = self._read()
+
+    def load(self, slugs=(), metrics=(), available_since=False, metadata_fields=METADATA_FIELDS, force=False):
+        """
+        Fetch the metric list, the available metrics of every slug and the
+        metadata of every metric, skipping entries that are held and fresh
+        unless force is True. With available_since=True, availableSince is
+        loaded for every metric in `metrics` that a slug in `slugs` supports.
+        Items the API rejects are left out with a SanPartialResultWarning.
+        """
+        slugs = list(dict.fromkeys(slugs))
+        metrics = list(dict.fromkeys(metrics))
+        failed = []
+
+        self._ensure("metrics", [""], _metrics_field, _read_metrics, force, failed)
+        self._ensure("slug_metrics", slugs, _slug_metrics_field, _read_slug_metrics, force, failed)
+        self._ensure_metadata(metrics, list(metadata_fields), force, failed)
+        if available_since:
+            wanted = set(metrics)
+            pairs = [
+                _pair_key(metric, slug) for slug in slugs for metric in self._held("slug_metrics", slug, []) if metric in wanted
+            ]
+            self._ensure("since", pairs, _since_field, _read_since, force, failed)
+
+        self.save()
+        if failed:
+            warnings.warn(f"MetricCatalog could not load: {', '.join(failed)}", SanPartialResultWarning, stacklevel=2)
+
+    def refresh(self):
+        """Fetch every held entry again."""
+        with self._lock:
+            sections = self._sections()
+            held = {name: list(section) for name, section in sections.items()}
+            fields = sorted({field for entry in sections["metadata"].values() for field in entry["fields"]})
+        failed = []
+        self._ensure("metrics", held["metrics"], _metrics_field, _read_metrics, True, failed)
+        self._ensure("slug_metrics", held["slug_metrics"], _slug_metrics_field, _read_slug_metrics, True, failed)
+        self._ensure_metadata(held["metadata"], fields, True, failed)
+        self._ensure("since", held["since"], _since_field, _read_since, True, failed)
+        self.save()
+        if failed:
+            warnings.warn(f"MetricCatalog could not refresh: {', '.join(failed)}", SanPartialResultWarning, stacklevel=2)
+
+    def available_metrics(self):
+        return combine_metrics(self._lookup("metrics", "", _metrics_field, _read_metrics))
+
+    def available_metrics_for_slug(self, slug):
+        return self._lookup("slug_metrics", slug, _slug_metrics_field, _read_slug_metrics)
+
+    def available_metric_versions(self, metric):
+        versions = self.metadata(metric, [VERSIONS_FIELD])["availableVersions"] or []
+        return [v["version"] for v in versions]
+
+    def available_metric_for_slug_since(self, metric, slug):
+        return self._lookup("since", _pair_key(metric, slug), _since_field, _read_since)
+
+    def metadata(self, metric, arr):
+        """Same as `san.metadata`: the requested metadata fields of the metric."""
+        fields = list(arr)
+        fetched = self._ensure_metadata([metric], fields, False, None)
+        if fetched:
+            self.save()
+        with self._lock:
+            self._counters["misses" if fetched else "hits"] += 1
+            values = self._sections()["metadata"][metric]["value"]
+        return {_field_key(field): values.get(_field_key(field)) for field in fields}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            sections = self._sections()
+            for name, section in sections.items():
+                stats[name] = len(section)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._scopes = {}
+        self.save()
+
+    def save(self):
+        with self._lock:
+            content = json.dumps({"version": _FORMAT_VERSION, "scopes": self._scopes}, separators=(",", ":"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.path.with_name(self.path.name + ".tmp")
+        tmp_file.write_text(content, encoding="utf-8")
+        tmp_file.replace(self.path)
+
+    def _read(self):
+        try:
+            content = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(content, dict) or content.get("version") != _FORMAT_VERSION:
+            return {}
+        return content.get("scopes") or {}
+
+    def _sections(self):
+        scope = api_key_scope(ApiConfig.api_key)
+        return self._scopes.setdefault(scope, {"metrics": {}, "slug_metrics": {}, "metadata": {}, "since": {}})
+
+    def _held(self, section, key, default=None):
+        with self._lock:
+            entry = self._sections()[section].get(key)
+        return default if entry is None else entry["value"]
+
+    def _is_fresh(self, entry, now):
+        return entry is not None and (self.max_age is None or now - entry["fetched_at"] < self.max_age)
+
+    def _lookup(self, section, key, build_field, read_result):
+        with self._lock:
+            entry = self._sections()[section].get(key)
+            if self._is_fresh(entry, time.time()):
+                self._counters["hits"] += 1
+                return entry["value"]
+            self._counters["misses"] += 1
+
+        value = self._fetch([key], build_field, read_result)[key]
+        self._store(section, {key: value})
+        self.save()
+        return value
+
+    def _ensure(self, section, keys, build_field, read_result, force, failed):
+        """Fetch the keys of a section that are missing or stale, all of them with force."""
+        now = time.time()
+        with self._lock:
+            held = self._sections()[section]
+            missing = [key for key in keys if force or not self._is_fresh(held.get(key), now)]
+        if missing:
+            self._store(section, self._fetch(missing, build_field, read_result, failed))
+
+    def _ensure_metadata(self, metrics, fields, force, failed):
+        """Fetch the fields of every metric that are not held or are stale. Returns the fetched metrics."""
+        now = time.time()
+        with self._lock:
+            held = self._sections()["metadata"]
+            requests = {}
+            for metric in metrics:
+                entry = held.get(metric)
+                if force or not self._is_fresh(entry, now):
+                    requests[metric] = fields
+                else:
+                    missing_fields = [field for field in fields if field not in entry["fields"]]
+                    if missing_fields:
+                        requests[metric] = missing_fields
+
+        by_fields = {}
+        for metric, metric_fields in requests.items():
+            by_fields.setdefault(tuple(metric_fields), []).append(metric)
+        for metric_fields, group in by_fields.items():
+            values = self._fetch(group, _metadata_field(metric_fields), _read_metadata, failed)
+            with self._lock:
+                held = self._sections()["metadata"]
+                fetched_at = time.time()
+                for metric, value in values.items():
+                    entry = held.get(metric)
+                    if entry is None or force or not self._is_fresh(entry, fetched_at):
+                        held[metric] = {"value": value, "fields": list(metric_fields), "fetched_at": fetched_at}
+                    else:
+                        entry["value"].update(value)
+                        entry["fields"] = list(dict.fromkeys(entry["fields"] + list(metric_fields)))
+        return list(requests)
+
+    def _store(self, section, values):
+        fetched_at = time.time()
+        with self._lock:
+            held = self._sections()[section]
+            for key, value in values.items():
+                held[key] = {"value": value, "fetched_at": fetched_at}
+
+    def _fetch(self, keys, build_field, read_result, failed=None):
+        """
+        Fetch keys in aliased documents of batch_size fields. A document the API
+        rejects is split in half; keys that fail on their own are added to
+        failed, or raise when failed is None.
+        """
+        batches = [keys[start : start + self.batch_size] for start in range(0, len(keys), self.batch_size)]
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for values in executor.map(lambda batch: self._fetch_batch(batch, build_field, read_result, failed), batches):
+                results.update(values)
+        return results
+
+    def _fetch_batch(self, batch, build_field, read_result, failed):
+        document = "{\n" + "\n".join(build_field(f"q_{i}", key) for i, key in enumerate(batch)) + "\n}"
+        try:
+            data = execute_gql(document)
+        except SanGraphqlQueryError:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                results = self._fetch_batch(batch[:middle], build_field, read_result, failed)
+                results.update(self._fetch_batch(batch[middle:], build_field, read_result, failed))
+                return results
+            if failed is None:
+                raise
+            failed.append(batch[0] or "available metrics")
+            return {}
+        except SanEmptyResultError:
+            # Raised when every alias resolved to null.
+            data = {}
+        finally:
+            with self._lock:
+                self._counters["requests"] += 1
+
+        return {key: read_result(data.get(f"q_{i}")) for i, key in enumerate(batch)}
+
+
+def _pair_key(metric, slug):
+    return f"{metric}/{slug}"
+
+
+def _field_key(field):
+    return field.split("{", 1)[0].strip()
+
+
+def _metrics_field(alias, _key):
+    return f"{alias}: getAvailableMetrics"
+
+
+def _read_metrics(result):
+    return result or []
+
+
+def _slug_metrics_field(alias, slug):
+    return f"{alias}: projectBySlug(slug: {json.dumps(slug)}) {{ availableMetrics }}"
+
+
+def _read_slug_metrics(result):
+    return (result or {}).get("availableMetrics") or []
+
+
+def _since_field(alias, pair_key):
+    metric, slug = pair_key.split("/", 1)
+    return f"{alias}: getMetric(metric: {json.dumps(metric)}) {{ availableSince(slug: {json.dumps(slug)}) }}"
+
+
+def _read_since(result):
+    return (result or {}).get("availableSince")
+
+
+def _metadata_field(fields):
+    selection = " ".join(fields)
+    return lambda alias, metric: f"{alias}: getMetric(metric: {json.dumps(metric)}) {{ metadata {{ {selection} }} }}"
+
+
+def _read_metadata(result):
+    return (result or {}).get("metadata") or {}
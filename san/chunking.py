@@ -0,0 +1,204 @@
+"""
+Split long `from_date..to_date` ranges into windows that are fetched concurrently.
+
+Used by `san.get(..., chunk_size=...)` and `san.get_many(..., chunk_size=...)`.
+A window that fails with a response size limit or a read timeout is split in
+half and only that window is fetched again.
+
+`san.get_many` splits long slug lists into shards the same way: shards are
+sized by the estimated number of points, fetched concurrently, and a failing
+shard is halved and fetched again on its own.
+"""
+
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import san.sanbase_graphql_helper as sgh
+from san.api_config import ApiConfig
+from san.error import SanError, SanResponseSizeLimitError, SanTimeoutError
+
+AUTO_CHUNK_SIZE = "auto"
+AUTO_SHARD_SIZE = "auto"
+
+_SPLITTABLE_ERRORS = (SanResponseSizeLimitError, SanTimeoutError)
+
+
+def fetch_chunked(fetch, chunk_size, series_count=1, merge=None, **kwargs):
+    """
+    Call `fetch(from_date=..., to_date=..., **kwargs)` once per window and merge the
+    resulting frames into one deduplicated frame sorted by its DatetimeIndex.
+
+    Args:
+        fetch: Function returning a DataFrame for a single window
+        chunk_size: "auto", or the window length as a timedelta or an interval string like "30d"
+        series_count: Number of series per point (slugs in get_many), used to size "auto" windows
+        merge: Function combining the window frames, defaults to merge_frames
+    """
+    return (merge or merge_frames)(list(iter_chunked(fetch, chunk_size, series_count, **kwargs)))
+
+
+def iter_chunked(fetch, chunk_size, series_count=1, **kwargs):
+    """
+    Like fetch_chunked, but yield the frame of every window in date order as
+    soon as it and all earlier windows are fetched. Frames of consecutive
+    windows can share their boundary point.
+    """
+    windows = chunk_windows(
+        kwargs.pop("from_date", sgh._default_from_date()),
+        kwargs.pop("to_date", sgh._default_to_date()),
+        kwargs.get("interval", sgh._DEFAULT_INTERVAL),
+        chunk_size,
+        series_count,
+    )
+
+    min_window = _min_window(kwargs.get("interval", sgh._DEFAULT_INTERVAL))
+
+    with ThreadPoolExecutor(max_workers=ApiConfig.chunk_max_workers) as executor:
+        futures = [executor.submit(_fetch_window, fetch, start, end, min_window, kwargs, 0) for start, end in windows]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            # Windows that were not started are dropped when the consumer stops early.
+            for future in futures:
+                future.cancel()
+
+
+def chunk_windows(from_date, to_date, interval, chunk_size, series_count=1):
+    """Return the (start, end) windows covering the range. Consecutive windows share their boundary."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    from_dt = sgh.resolve_from_date(from_date, now)
+    to_dt = sgh.resolve_to_date(to_date, now)
+    if from_dt >= to_dt:
+        return [(from_dt, to_dt)]
+
+    window = _window_length(interval, chunk_size, series_count)
+    windows = []
+    start = from_dt
+    while start < to_dt:
+        end = min(start + window, to_dt)
+        windows.append((start, end))
+        start = end
+    return windows
+
+
+def shard_slugs(slugs, shard_size, from_date, to_date, interval):
+    """
+    Split slugs into lists of at most shard_size slugs. With "auto", shards hold
+    at most ApiConfig.shard_max_points estimated points over the range.
+    """
+    slugs = list(slugs)
+    if shard_size == AUTO_SHARD_SIZE:
+        shard_size = max(ApiConfig.shard_max_points // _points_per_series(from_date, to_date, interval), 1)
+    elif isinstance(shard_size, bool) or not isinstance(shard_size, int) or shard_size < 1:
+        raise SanError(f'"shard_size" must be "auto", None or a positive number of slugs, got: {shard_size!r}')
+    return [slugs[start : start + shard_size] for start in range(0, len(slugs), shard_size)]
+
+
+def fetch_sharded(fetch, shards, merge, **kwargs):
+    """
+    Call `fetch(slugs=shard, **kwargs)` once per shard, concurrently, and combine
+    the frames in shard order with merge.
+    """
+    with ThreadPoolExecutor(max_workers=ApiConfig.chunk_max_workers) as executor:
+        futures = [executor.submit(_fetch_shard, fetch, shard, kwargs, 0) for shard in shards]
+        try:
+            frames = [frame for future in futures for frame in future.result()]
+        finally:
+            for future in futures:
+                future.cancel()
+    return merge(frames)
+
+
+def merge_shard_frames(frames):
+    """Join wide get_many frames of different slugs on their DatetimeIndex."""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1).sort_index()
+
+
+def merge_long_shard_frames(frames):
+    """Combine long get_many frames of different slugs, keeping the slug order within every datetime."""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames).sort_index(kind="stable")
+
+
+def merge_frames(frames):
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    merged = pd.concat(frames)
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
+
+
+def merge_long_frames(frames):
+    """Like merge_frames for long get_many frames, where a point is identified by its datetime and slug."""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    merged = pd.concat(frames)
+    keys = pd.MultiIndex.from_arrays([merged.index, merged["slug"]])
+    merged = merged[~keys.duplicated(keep="last")]
+    return merged.sort_index(kind="stable")
+
+
+def _window_length(interval, chunk_size, series_count):
+    if isinstance(chunk_size, datetime.timedelta):
+        window = chunk_size
+    elif chunk_size == AUTO_CHUNK_SIZE:
+        points = max(ApiConfig.chunk_max_points // max(series_count, 1), 1)
+        window = sgh.interval_to_timedelta(interval) * points
+    elif isinstance(chunk_size, str):
+        window = sgh.interval_to_timedelta(chunk_size)
+    else:
+        raise SanError(f'"chunk_size" must be "auto", a timedelta or an interval string like "30d", got: {chunk_size!r}')
+
+    if window <= datetime.timedelta(0):
+        raise SanError(f'"chunk_size" must be positive, got: {chunk_size!r}')
+    return window
+
+
+def _points_per_series(from_date, to_date, interval):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    span = sgh.resolve_to_date(to_date, now) - sgh.resolve_from_date(from_date, now)
+    return max(int(span / _min_window(interval)) + 1, 1)
+
+
+def _min_window(interval):
+    try:
+        return sgh.interval_to_timedelta(interval)
+    except SanError:
+        # Calendar intervals such as toStartOfMonth have no fixed length.
+        return datetime.timedelta(days=31)
+
+
+def _fetch_window(fetch, start, end, min_window, kwargs, depth):
+    try:
+        return [fetch(from_date=start.isoformat(), to_date=end.isoformat(), **kwargs)]
+    except _SPLITTABLE_ERRORS:
+        if depth >= ApiConfig.chunk_max_splits or end - start <= min_window:
+            raise
+
+    middle = start + (end - start) / 2
+    return _fetch_window(fetch, start, middle, min_window, kwargs, depth + 1) + _fetch_window(
+        fetch, middle, end, min_window, kwargs, depth + 1
+    )
+
+
+def _fetch_shard(fetch, shard, kwargs, depth):
+    try:
+        return [fetch(slugs=shard, **kwargs)]
+    except _SPLITTABLE_ERRORS:
+        if depth >= ApiConfig.chunk_max_splits or len(shard) <= 1:
+            raise
+
+    middle = len(shard) // 2
+    return _fetch_shard(fetch, shard[:middle], kwargs, depth + 1) + _fetch_shard(fetch, shard[middle:], kwargs, depth + 1)
@@ -8,6 +8,7 @@ Usage:
     san get price_usd --slug bitcoin --format json
 """
 
+from pathlib import Path
 from typing import Optional
 import click
 import typer
@@ -22,11 +23,13 @@ from san.cli_config import (
     mask_api_key,
 )
 from san.cli_formatters import (
-    format_dataframe,
     format_list,
     format_dict,
+    COLUMNAR_FORMATS,
     format_api_calls,
     output,
+    write_frames,
+    write_table,
 )
 from san.error import SanError
 
@@ -42,6 +45,19 @@ FormatOption = Annotated[
     typer.Option("--format", "-f", help="Output format: json, csv, table",
                  click_type=click.Choice(["json", "csv", "table"])),
 ]
+FrameFormatOption = Annotated[
+    str,
+    typer.Option("--format", "-f", help="Output format: json, ndjson, csv, table (first rows only), parquet, arrow",
+                 click_type=click.Choice(["json", "ndjson", "csv", "table", "parquet", "arrow"])),
+]
+OutputOption = Annotated[
+    Optional[Path],
+    typer.Option("--output", "-o", help="File for parquet and arrow output (default: stdout)"),
+]
+ChunkSizeOption = Annotated[
+    Optional[str],
+    typer.Option(help='Fetch the range in windows ("auto" or an interval such as 30d) and write each as it arrives'),
+]
 ApiKeyOption = Annotated[
     Optional[str],
     typer.Option(envvar="SANPY_APIKEY", help="API key"),
@@ -82,6 +98,21 @@ def _handle_error(e: Exception) -> None:
     raise typer.Exit(code=1)
 
 
+def _check_output_path(fmt: str, output_path: Optional[Path]) -> None:
+    if output_path is not None and fmt not in COLUMNAR_FORMATS:
+        raise click.BadParameter("--output is only used with --format parquet or arrow", param_hint="'--output'")
+
+
+def _fetch_frames(fetch, chunk_size, series_count, kwargs):
+    """Frames to write: one per date window with a chunk size, else the whole range."""
+    if chunk_size is None:
+        return [fetch(**kwargs)]
+
+    from san.chunking import iter_chunked
+
+    return iter_chunked(fetch, chunk_size, series_count, **kwargs)
+
+
 # =============================================================================
 # Config Commands
 # =============================================================================
@@ -157,14 +188,18 @@ def metrics(
 
 @app.command()
 def projects(
-    fmt: FormatOption = "table",
+    fmt: FrameFormatOption = "table",
+    output_path: OutputOption = None,
     api_key: ApiKeyOption = None,
 ) -> None:
     """List all available projects/assets."""
+    _check_output_path(fmt, output_path)
     _init_api_key(api_key)
     try:
-        df = san.get("projects/all")
-        output(format_dataframe(df, fmt))
+        if fmt in COLUMNAR_FORMATS:
+            write_table(san.get("projects/all", as_arrow=True), fmt, output_path)
+        else:
+            write_frames([san.get("projects/all")], fmt)
     except Exception as e:
         _handle_error(e)
 
@@ -194,10 +229,13 @@ def get(
         Optional[str],
         typer.Option(help="Aggregation: avg, sum, min, max, first, last, etc."),
     ] = None,
-    fmt: FormatOption = "table",
+    chunk_size: ChunkSizeOption = None,
+    fmt: FrameFormatOption = "table",
+    output_path: OutputOption = None,
     api_key: ApiKeyOption = None,
 ) -> None:
     """Fetch timeseries data for a single metric/asset pair."""
+    _check_output_path(fmt, output_path)
     _init_api_key(api_key)
     try:
         kwargs = dict(
@@ -208,8 +246,13 @@ def get(
         )
         if aggregation:
             kwargs["aggregation"] = aggregation.upper()
-        df = san.get(metric, **kwargs)
-        output(format_dataframe(df, fmt))
+        if fmt in COLUMNAR_FORMATS:
+            if chunk_size is not None:
+                kwargs["chunk_size"] = chunk_size
+            write_table(san.get(metric, as_arrow=True, **kwargs), fmt, output_path)
+        else:
+            frames = _fetch_frames(lambda **window: san.get(metric, **window), chunk_size, 1, kwargs)
+            write_frames(frames, fmt, preview=chunk_size is not None)
     except Exception as e:
         _handle_error(e)
 
@@ -234,10 +277,13 @@ def get_many(
         Optional[str],
         typer.Option(help="Aggregation: avg, sum, min, max, first, last, etc."),
     ] = None,
-    fmt: FormatOption = "table",
+    chunk_size: ChunkSizeOption = None,
+    fmt: FrameFormatOption = "table",
+    output_path: OutputOption = None,
     api_key: ApiKeyOption = None,
 ) -> None:
     """Fetch timeseries data for a metric across multiple assets."""
+    _check_output_path(fmt, output_path)
     slug_list = [s.strip() for s in slugs.split(",") if s.strip()]
     if not slug_list:
         raise click.BadParameter(
@@ -254,11 +300,57 @@ def get_many(
         )
         if aggregation:
             kwargs["aggregation"] = aggregation.upper()
-        df = san.get_many(metric, **kwargs)
-        output(format_dataframe(df, fmt))
+        if fmt in COLUMNAR_FORMATS:
+            if chunk_size is not None:
+                kwargs["chunk_size"] = chunk_size
+            write_table(san.get_many(metric, as_arrow=True, **kwargs), fmt, output_path)
+        else:
+            frames = _fetch_frames(lambda **window: san.get_many(metric, **window), chunk_size, len(slug_list), kwargs)
+            write_frames(frames, fmt, preview=chunk_size is not None)
+    except Exception as e:
+        _handle_error(e)
+
+
+@app.command()
+def fetch(
+    manifest: Annotated[Path, typer.Argument(help="Manifest file (.csv, .json, .yaml) listing metric x slug/selector jobs")],
+    out_dir: Annotated[Path, typer.Option("--out", help="Directory receiving one file per job")] = Path("san-data"),
+    fmt: Annotated[
+        str,
+        typer.Option("--format", "-f", help="Output file format: csv, json, parquet, arrow",
+                     click_type=click.Choice(["csv", "json", "parquet", "arrow"])),
+    ] = "csv",
+    workers: Annotated[int, typer.Option(min=1, help="Requests run concurrently")] = 4,
+    batch_size: Annotated[int, typer.Option(min=1, help="Query windows per GraphQL request")] = 10,
+    chunk_size: Annotated[
+        Optional[str],
+        typer.Option(help='Split ranges into windows ("auto" or an interval such as 90d)'),
+    ] = None,
+    force: Annotated[bool, typer.Option("--force", help="Refetch jobs whose file already exists")] = False,
+    api_key: ApiKeyOption = None,
+) -> None:
+    """Fetch every job of a manifest into a directory, resuming where a previous run stopped."""
+    from san.cli_fetch import load_manifest, run_fetch
+
+    _init_api_key(api_key)
+    try:
+        result = run_fetch(
+            load_manifest(manifest),
+            out_dir,
+            fmt=fmt,
+            max_workers=workers,
+            batch_size=batch_size,
+            chunk_size=chunk_size,
+            force=force,
+            progress=lambda message: output(message, err=True),
+        )
     except Exception as e:
         _handle_error(e)
 
+    output(f"{len(result['written'])} written, {len(result['skipped'])} skipped, {len(result['failed'])} failed")
+    if result["failed"]:
+        raise typer.Exit(code=1)
+
 
 # =============================================================================
 # Rate Limit & Complexity Commands
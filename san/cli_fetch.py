@@ -0,0 +1,283 @@
+"""
+Manifest-driven bulk fetching for `san fetch`.
+
+A manifest lists timeseries to download, one job per metric and slug or
+selector. JSON and YAML manifests hold a list of objects (or {"jobs": [...]}),
+CSV manifests one job per row:
+
+    metric,slug,from_date,to_date,interval
+    price_usd,bitcoin,2020-01-01,utc_now,1d
+    daily_active_addresses,ethereum,utc_now-365d,utc_now,1d
+
+A "slugs" field (a list, or a comma-separated string in CSV) expands into one
+job per slug and "selector" takes a JSON object. Jobs are split into date
+windows when a chunk size is given, and the windows of many jobs are packed
+into batched GraphQL documents that run concurrently. Every job is written to
+its own file in the output directory; files that already exist are skipped,
+so an interrupted run resumes where it stopped.
+"""
+
+import csv
+import functools
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import san.sanbase_graphql
+import san.sanbase_graphql_helper as sgh
+from san.arrow import merge_tables
+from san.chunking import chunk_windows, merge_frames
+from san.cli_formatters import COLUMNAR_FORMATS, write_table
+from san.error import SanError
+from san.graphql import execute_gql
+from san.query_builder import build_document
+from san.transform import transform_timeseries_data_query_result
+
+MANIFEST_FIELDS = ("name", "metric", "slug", "slugs", "selector", "from_date", "to_date", "interval", "aggregation")
+OUTPUT_FORMATS = ("csv", "json") + COLUMNAR_FORMATS
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class FetchJob:
+    """One metric for one slug or selector, written to `<name>.<format>`."""
+
+    def __init__(self, name, metric, target, from_date, to_date, interval, aggregation=None):
+        self.name = name
+        self.metric = metric
+        self.target = target
+        self.from_date = from_date
+        self.to_date = to_date
+        self.interval = interval
+        self.aggregation = aggregation
+
+    def query_kwargs(self, from_date, to_date):
+        kwargs = dict(self.target, from_date=from_date, to_date=to_date, interval=self.interval)
+        if self.aggregation:
+            kwargs["aggregation"] = self.aggregation
+        return kwargs
+
+    def __repr__(self):
+        return f"FetchJob({self.name!r})"
+
+
+def load_manifest(path):
+    """Read a CSV, JSON or YAML manifest and return its FetchJobs."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, newline="" if suffix == ".csv" else None) as file:
+        if suffix == ".csv":
+            entries = [{key: value for key, value in row.items() if value not in (None, "")} for row in csv.DictReader(file)]
+        elif suffix == ".json":
+            entries = json.load(file)
+        elif suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as exc:
+                raise SanError("YAML manifests require PyYAML. Install it with `pip install 'sanpy[yaml]'`.") from exc
+            entries = yaml.safe_load(file)
+        else:
+            raise SanError(f"Unsupported manifest format {path.suffix!r}, expected .csv, .json, .yaml or .yml")
+
+    if isinstance(entries, dict):
+        entries = entries.get("jobs")
+    if not isinstance(entries, list):
+        raise SanError(f"{path} must contain a list of jobs")
+
+    jobs = [job for number, entry in enumerate(entries, 1) for job in _entry_jobs(entry, number, suffix == ".csv")]
+    file_names = set()
+    for job in jobs:
+        file_name = _file_stem(job)
+        if file_name in file_names:
+            raise SanError(f'Duplicate output name {job.name!r} in {path}, set a distinct "name" for these jobs')
+        file_names.add(file_name)
+    return jobs
+
+
+def plan_requests(jobs, batch_size=10, chunk_size=None):
+    """
+    Split jobs into (job, from_date, to_date) windows and pack them into
+    requests of at most batch_size windows each.
+    """
+    if batch_size < 1:
+        raise SanError(f'"batch_size" must be at least 1, got: {batch_size!r}')
+
+    windows = []
+    for job in jobs:
+        if chunk_size is None:
+            windows.append((job, job.from_date, job.to_date))
+            continue
+        for start, end in chunk_windows(job.from_date, job.to_date, job.interval, chunk_size):
+            windows.append((job, start.isoformat(), end.isoformat()))
+
+    return [windows[start : start + batch_size] for start in range(0, len(windows), batch_size)]
+
+
+def run_fetch(jobs, out_dir, fmt="csv", max_workers=4, batch_size=10, chunk_size=None, force=False, progress=None):
+    """
+    Fetch all jobs and write one file per job into out_dir.
+
+    Jobs whose file already exists are skipped unless force is True. Returns
+    a dict with the "written", "skipped" and "failed" job names; a failed
+    request only fails the jobs it contained.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise SanError(f'"fmt" must be one of {", ".join(OUTPUT_FORMATS)}, got: {fmt!r}')
+    progress = progress or (lambda message: None)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    pending = []
+    skipped = []
+    for job in jobs:
+        if not force and _output_file(out_dir, job, fmt).exists():
+            skipped.append(job.name)
+        else:
+            pending.append(job)
+    if skipped:
+        progress(f"Skipping {len(skipped)} job(s) already in {out_dir}")
+
+    requests = plan_requests(pending, batch_size=batch_size, chunk_size=chunk_size)
+    fetcher = _Fetcher(out_dir, fmt, requests, len(pending), progress)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        fetch = functools.partial(_fetch_request, as_arrow=fmt in COLUMNAR_FORMATS)
+        futures = {executor.submit(fetch, request): request for request in requests}
+        for future in as_completed(futures):
+            fetcher.collect(futures[future], future)
+
+    return {"written": fetcher.written, "skipped": skipped, "failed": sorted(fetcher.failed)}
+
+
+class _Fetcher:
+    """
+    Collects window frames and writes a job's file once all of its windows
+    arrived. Only used from the thread consuming the finished requests.
+    """
+
+    def __init__(self, out_dir, fmt, requests, total, progress):
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.progress = progress
+        self.total = total
+        self.written = []
+        self.failed = set()
+        self._frames = {}
+        self._remaining = {}
+        for request in requests:
+            for job, _, _ in request:
+                self._frames[job.name] = []
+                self._remaining[job.name] = self._remaining.get(job.name, 0) + 1
+
+    def collect(self, request, future):
+        try:
+            frames = future.result()
+        except Exception as exc:
+            names = sorted({job.name for job, _, _ in request})
+            self.failed.update(names)
+            self.progress(f"Failed {', '.join(names)}: {exc}")
+            frames = [None] * len(request)
+
+        for (job, _, _), frame in zip(request, frames):
+            if frame is not None:
+                self._frames[job.name].append(frame)
+            self._remaining[job.name] -= 1
+            if self._remaining[job.name] == 0:
+                if job.name in self.failed:
+                    del self._frames[job.name]
+                else:
+                    self._write(job)
+
+    def _write(self, job):
+        file = _output_file(self.out_dir, job, self.fmt)
+        tmp_file = file.with_name(file.name + ".tmp")
+        if self.fmt in COLUMNAR_FORMATS:
+            table = merge_tables(self._frames.pop(job.name))
+            write_table(table, self.fmt, tmp_file)
+            rows = table.num_rows
+        else:
+            frame = merge_frames(self._frames.pop(job.name))
+            if self.fmt == "csv":
+                frame.to_csv(tmp_file)
+            else:
+                frame.reset_index().to_json(tmp_file, orient="records", date_format="iso")
+            rows = len(frame)
+        tmp_file.replace(file)
+
+        self.written.append(job.name)
+        self.progress(f"[{len(self.written)}/{self.total}] {job.name}: {rows} rows -> {file}")
+
+
+def _fetch_request(request, as_arrow=False):
+    queries = [
+        san.sanbase_graphql._timeseries_data_fragment(idx, job.metric, **job.query_kwargs(from_date, to_date))
+        for idx, (job, from_date, to_date) in enumerate(request)
+    ]
+    result = execute_gql(build_document(queries))
+    return [
+        transform_timeseries_data_query_result(idx, job.metric, result, as_arrow=as_arrow)
+        for idx, (job, _, _) in enumerate(request)
+    ]
+
+
+def _entry_jobs(entry, number, from_csv):
+    if not isinstance(entry, dict):
+        raise SanError(f"Manifest job {number} must be an object, got: {entry!r}")
+    unknown = sorted(set(entry) - set(MANIFEST_FIELDS))
+    if unknown:
+        raise SanError(f"Manifest job {number} has unknown field(s): {', '.join(unknown)}")
+    if not entry.get("metric"):
+        raise SanError(f'Manifest job {number} is missing "metric"')
+
+    targets = []
+    if entry.get("slug"):
+        targets.append({"slug": entry["slug"]})
+    slugs = entry.get("slugs") or []
+    if isinstance(slugs, str):
+        slugs = [slug.strip() for slug in slugs.split(",") if slug.strip()]
+    targets.extend({"slug": slug} for slug in slugs)
+    if entry.get("selector"):
+        selector = entry["selector"]
+        if from_csv or isinstance(selector, str):
+            try:
+                selector = json.loads(selector)
+            except ValueError as exc:
+                raise SanError(f'Manifest job {number} has an invalid "selector": {exc}') from exc
+        targets.append({"selector": selector})
+    if not targets:
+        raise SanError(f'Manifest job {number} needs a "slug", "slugs" or "selector"')
+    if entry.get("name") and len(targets) > 1:
+        raise SanError(f'Manifest job {number} sets "name" but expands into {len(targets)} jobs')
+
+    interval = entry.get("interval", sgh._DEFAULT_INTERVAL)
+    aggregation = entry.get("aggregation")
+    return [
+        FetchJob(
+            entry.get("name") or _default_name(entry["metric"], target, interval),
+            entry["metric"],
+            target,
+            entry.get("from_date", sgh._default_from_date()),
+            entry.get("to_date", sgh._default_to_date()),
+            interval,
+            aggregation.upper() if aggregation else None,
+        )
+        for target in targets
+    ]
+
+
+def _default_name(metric, target, interval):
+    if "slug" in target:
+        target_name = target["slug"]
+    else:
+        selector = json.dumps(target["selector"], sort_keys=True)
+        target_name = "selector-" + hashlib.sha256(selector.encode("utf-8")).hexdigest()[:8]
+    return "__".join([metric, target_name, interval])
+
+
+def _file_stem(job):
+    return _UNSAFE_FILENAME_RE.sub("_", job.name)
+
+
+def _output_file(out_dir, job, fmt):
+    return out_dir / f"{_file_stem(job)}.{fmt}"
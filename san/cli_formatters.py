@@ -1,19 +1,35 @@
 """
 Output formatters for sanpy CLI.
 
-Supports JSON, CSV, and table (human-readable) output formats.
+Supports JSON, CSV, and table (human-readable) output formats. DataFrames can
+also be written incrementally with `write_frames`, which adds NDJSON output,
+and pyarrow Tables as Parquet or Arrow IPC with `write_table`.
 """
 
 import csv
 import io
 import json
-from typing import List
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
-import pandas as pd
+import click
 import typer
 
+from san.error import SanError
 
-def format_dataframe(df: pd.DataFrame, fmt: str = "table") -> str:
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Rows serialized per write when streaming CSV and NDJSON.
+WRITE_CHUNK_ROWS = 10000
+# Rows shown by the table format before the remaining ones are only counted.
+TABLE_PREVIEW_ROWS = 100
+# Formats written from pyarrow Tables with write_table.
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+def format_dataframe(df: "pd.DataFrame", fmt: str = "table") -> str:
     """
     Format a pandas DataFrame for CLI output.
 
@@ -24,6 +40,9 @@ def format_dataframe(df: pd.DataFrame, fmt: str = "table") -> str:
     Returns:
         Formatted string representation
     """
+    # Imported here so that commands without DataFrame output do not load pandas.
+    import pandas as pd
+
     if fmt == "json":
         # Reset index to include datetime in output
         if df.index.name == "datetime" or isinstance(df.index, pd.DatetimeIndex):
@@ -35,6 +54,121 @@ def format_dataframe(df: pd.DataFrame, fmt: str = "table") -> str:
         return df.to_string()
 
 
+def write_frames(frames: Iterable["pd.DataFrame"], fmt: str = "table", preview: bool = False) -> None:
+    """
+    Write DataFrames to stdout as they arrive.
+
+    CSV and NDJSON rows are written in slices of WRITE_CHUNK_ROWS, so output
+    starts with the first frame and no full-size string is built. With
+    preview, the table format shows the first TABLE_PREVIEW_ROWS rows and
+    counts the rest; otherwise it prints the whole table. JSON output is a
+    single array. Whole tables and JSON are only written after the last frame.
+
+    Frames are expected in index order, as produced by date-range chunking.
+    Rows of a DatetimeIndex at or before the last written timestamp are
+    dropped, so the boundary point shared by consecutive windows appears once.
+    CSV rows are written under the columns of the first frame; a later frame
+    with columns the header does not have raises SanError.
+
+    Args:
+        frames: DataFrames to write, in order
+        fmt: Output format - 'json', 'ndjson', 'csv', or 'table'
+        preview: Print a bounded preview in the table format
+    """
+    import pandas as pd
+
+    frames = _without_shared_boundaries(frames)
+    if fmt == "json" or (fmt == "table" and not preview):
+        frames = list(frames)
+        output(format_dataframe(pd.concat(frames) if frames else pd.DataFrame(), fmt))
+        return
+
+    preview_frames = []
+    preview_rows = 0
+    total_rows = 0
+    columns = None
+    header_written = False
+    for frame in frames:
+        total_rows += len(frame)
+
+        if fmt == "table":
+            if preview_rows < TABLE_PREVIEW_ROWS:
+                preview_frames.append(frame.iloc[: TABLE_PREVIEW_ROWS - preview_rows])
+                preview_rows += len(preview_frames[-1])
+            continue
+
+        if fmt == "csv":
+            # Later windows are written under the header of the first one, with its columns in its order.
+            if columns is None:
+                columns = frame.columns
+            elif not frame.columns.equals(columns):
+                new_columns = frame.columns.difference(columns)
+                if len(new_columns):
+                    raise SanError(
+                        f"Columns {', '.join(map(str, new_columns))} are missing from the first chunk and cannot be "
+                        "added to the CSV header, use --format ndjson instead"
+                    )
+                frame = frame.reindex(columns=columns)
+
+        for start in range(0, len(frame), WRITE_CHUNK_ROWS):
+            chunk = frame.iloc[start : start + WRITE_CHUNK_ROWS]
+            if fmt == "ndjson":
+                if chunk.index.name == "datetime" or isinstance(chunk.index, pd.DatetimeIndex):
+                    chunk = chunk.reset_index()
+                text = chunk.to_json(orient="records", lines=True, date_format="iso")
+                typer.echo(text if text.endswith("\n") else text + "\n", nl=False)
+            else:
+                typer.echo(chunk.to_csv(header=not header_written), nl=False)
+                header_written = True
+
+    if fmt == "table":
+        output(pd.concat(preview_frames).to_string() if preview_frames else pd.DataFrame().to_string())
+        if total_rows > preview_rows:
+            output(f"... {total_rows - preview_rows} more rows, use --format csv or ndjson to get all of them")
+    elif fmt == "csv" and not header_written:
+        typer.echo(pd.DataFrame().to_csv(), nl=False)
+
+
+def _without_shared_boundaries(frames: Iterable["pd.DataFrame"]) -> Iterable["pd.DataFrame"]:
+    """Yield the non-empty frames, without DatetimeIndex rows at or before the last yielded timestamp."""
+    import pandas as pd
+
+    last_timestamp = None
+    for frame in frames:
+        if isinstance(frame.index, pd.DatetimeIndex) and len(frame):
+            if last_timestamp is not None:
+                frame = frame[frame.index > last_timestamp]
+            if len(frame):
+                last_timestamp = frame.index[-1]
+        if not frame.empty:
+            yield frame
+
+
+def write_table(table: "pa.Table", fmt: str, path: Optional[Path] = None) -> None:
+    """
+    Write a pyarrow Table as Parquet or Arrow IPC.
+
+    Args:
+        table: The Table to write
+        fmt: Output format - 'parquet' or 'arrow'
+        path: Destination file. None writes to binary stdout, where Arrow
+            output uses the IPC stream format instead of the file format.
+    """
+    from san.arrow import pyarrow
+
+    pa = pyarrow()
+    sink = str(path) if path is not None else click.get_binary_stream("stdout")
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink)
+        return
+
+    new_writer = pa.ipc.new_file if path is not None else pa.ipc.new_stream
+    with new_writer(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
 def format_list(items: List[str], fmt: str = "table", header: str = "name") -> str:
     """
     Format a list of strings for CLI output.
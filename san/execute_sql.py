@@ -1,7 +1,24 @@
+import itertools
+import json
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
+from san.api_config import ApiConfig
+from san.arrow import pyarrow, sql_table
+from san.chunking import chunk_windows
 from san.graphql import execute_gql
-from san.error import SanError
-import json
+from san.error import SanAuthError, SanError, SanPartialResultWarning
+from san.sql_types import sql_column
+from san.streaming import StreamedColumns
+from san.transport import retry_backoff
+
+DEFAULT_PAGE_SIZE = 100000
+# Names of the window bounds added to the parameters of execute_sql_iter time windows.
+WINDOW_FROM_PARAMETER = "sanpy_window_from"
+WINDOW_TO_PARAMETER = "sanpy_window_to"
 
 
 def execute_sql(**kwargs):
@@ -24,6 +41,9 @@ def execute_sql(**kwargs):
         \""",
         parameters={'slug': 'bitcoin', 'metric': 'daily_active_addresses', 'last_n_days': 7},
         set_index="dt")
+
+    Pass `as_arrow=True` to get a pyarrow.Table built from the result rows
+    instead of a DataFrame.
     """
     if "query" in kwargs:
         query = kwargs.pop("query")
@@ -38,8 +58,242 @@ def execute_sql(**kwargs):
     return transformed_result
 
 
+def execute_sql_iter(
+    query,
+    parameters=None,
+    page_size=None,
+    time_column=None,
+    from_date=None,
+    to_date="utc_now",
+    window="1d",
+    prefetch=2,
+    **kwargs,
+):
+    """
+    Run a SQL query page by page and yield one DataFrame per page (a pyarrow.Table
+    with `as_arrow=True`). At most `prefetch` pages are requested ahead of the
+    page being consumed, so memory stays bounded however large the result is.
+
+    By default pages are LIMIT/OFFSET windows of `page_size` rows over the query,
+    which should have an ORDER BY so the pages are stable. Iteration stops at the
+    first page with fewer rows; up to `prefetch - 1` extra empty pages are requested.
+
+        for df in san.execute_sql_iter(
+                query="SELECT dt, value FROM daily_metrics_v2 WHERE metric_id = get_metric_id({{metric}}) ORDER BY dt",
+                parameters={"metric": "price_usd"},
+                page_size=500000):
+            ...
+
+    With `time_column`, the query is instead split into [from, to) windows of
+    length `window` between `from_date` and `to_date`, in date order:
+
+        san.execute_sql_iter(query=..., time_column="dt", from_date="2020-01-01", window="30d")
+
+    Other keyword arguments (`set_index`, `as_arrow`) are applied to every page.
+    Empty pages are skipped.
+    """
+    parameters = dict(parameters or {})
+    query = query.strip().rstrip(";")
+    if prefetch < 1:
+        raise SanError(f"'prefetch' must be at least 1, got: {prefetch!r}")
+
+    if time_column is not None:
+        if page_size is not None:
+            raise SanError("'page_size' and 'time_column' cannot be combined in 'execute_sql_iter'")
+        if from_date is None:
+            raise SanError("'from_date' is required when paging 'execute_sql_iter' by 'time_column'")
+        pages = (
+            _time_window_page(query, parameters, time_column, start, end)
+            for start, end in chunk_windows(from_date, to_date, window, window)
+        )
+        page_size = None
+    else:
+        page_size = DEFAULT_PAGE_SIZE if page_size is None else page_size
+        if page_size < 1:
+            raise SanError(f"'page_size' must be at least 1, got: {page_size!r}")
+        pages = (
+            (f"SELECT * FROM (\n{query}\n) LIMIT {page_size} OFFSET {offset}", parameters)
+            for offset in itertools.count(0, page_size)
+        )
+
+    for page in _prefetched(lambda page: __execute_sql(*page, **kwargs), pages, prefetch):
+        rows = page.num_rows if kwargs.get("as_arrow") else len(page)
+        if rows:
+            yield page
+        if page_size is not None and rows < page_size:
+            return
+
+
+def _time_window_page(query, parameters, time_column, start, end):
+    window_query = (
+        f"SELECT * FROM (\n{query}\n) WHERE {time_column} >= toDateTime({{{{{WINDOW_FROM_PARAMETER}}}}}, 'UTC') "
+        f"AND {time_column} < toDateTime({{{{{WINDOW_TO_PARAMETER}}}}}, 'UTC')"
+    )
+    window_parameters = dict(
+        parameters,
+        **{
+            WINDOW_FROM_PARAMETER: start.strftime("%Y-%m-%d %H:%M:%S"),
+            WINDOW_TO_PARAMETER: end.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+    )
+    return window_query, window_parameters
+
+
+def _prefetched(fetch, pages, prefetch):
+    """Yield fetch(page) for every page in order, with at most `prefetch` pages in flight."""
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        pending = deque()
+        try:
+            for page in pages:
+                pending.append(executor.submit(fetch, page))
+                if len(pending) >= prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def execute_sql_many(query, parameter_sets, max_concurrency=4, retries=2, skip_failed=False, **kwargs):
+    """
+    Run the same parameterized SQL query once per dict in `parameter_sets`,
+    up to `max_concurrency` runs at a time, and return the results concatenated
+    in the order of `parameter_sets`. Every parameter becomes a column holding
+    its value, unless the query already returns a column of that name.
+
+        san.execute_sql_many(
+            query="SELECT dt, value FROM daily_metrics_v2 WHERE asset_id = get_asset_id({{slug}}) ...",
+            parameter_sets=[{"slug": slug} for slug in ["bitcoin", "ethereum", "santiment"]],
+            max_concurrency=8)
+
+    Requests go through the usual rate limit pacing. A run failing with a
+    SanError is retried on its own, up to `retries` more times with exponential
+    backoff. A parameter set that still fails raises SanError, or with
+    `skip_failed=True` is left out with a SanPartialResultWarning naming it.
+    Other keyword arguments (`set_index`, `as_arrow`) apply to every run.
+    """
+    parameter_sets = [dict(parameters) for parameters in parameter_sets]
+    results = [None] * len(parameter_sets)
+    for position, result in _run_parameter_sets(query, parameter_sets, max_concurrency, retries, skip_failed, kwargs):
+        results[position] = result
+
+    tagged = [
+        _tag_result(result, parameters, kwargs.get("as_arrow"))
+        for parameters, result in zip(parameter_sets, results)
+        if result is not None
+    ]
+    if kwargs.get("as_arrow"):
+        pa = pyarrow()
+        return pa.concat_tables(tagged, promote_options="default") if tagged else pa.table({})
+    if not tagged:
+        return pd.DataFrame()
+    return pd.concat(tagged, ignore_index=kwargs.get("set_index") is None)
+
+
+def execute_sql_many_iter(query, parameter_sets, max_concurrency=4, retries=2, skip_failed=False, **kwargs):
+    """
+    Same as `execute_sql_many`, but yields a (parameters, result) pair for every
+    parameter set as soon as its run completes, without tagging or concatenating
+    the results. Closing the iterator cancels the runs that have not started.
+    """
+    parameter_sets = [dict(parameters) for parameters in parameter_sets]
+    for position, result in _run_parameter_sets(query, parameter_sets, max_concurrency, retries, skip_failed, kwargs):
+        yield parameter_sets[position], result
+
+
+def _run_parameter_sets(query, parameter_sets, max_concurrency, retries, skip_failed, kwargs):
+    """Yield (position, result) for every parameter set in completion order."""
+    if max_concurrency < 1:
+        raise SanError(f"'max_concurrency' must be at least 1, got: {max_concurrency!r}")
+    if retries < 0:
+        raise SanError(f"'retries' must be at least 0, got: {retries!r}")
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {
+            executor.submit(_execute_sql_with_retries, query, parameters, retries, kwargs): position
+            for position, parameters in enumerate(parameter_sets)
+        }
+        try:
+            for future in as_completed(futures):
+                position = futures[future]
+                try:
+                    result = future.result()
+                except SanError as exc:
+                    if not skip_failed:
+                        raise SanError(f"'execute_sql_many' failed for parameters {parameter_sets[position]!r}: {exc}") from exc
+                    failed.append(parameter_sets[position])
+                    continue
+                yield position, result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    if failed:
+        warnings.warn(
+            f"'execute_sql_many' skipped {len(failed)} failed parameter set(s): {failed!r}",
+            SanPartialResultWarning,
+            stacklevel=3,
+        )
+
+
+def _execute_sql_with_retries(query, parameters, retries, kwargs):
+    attempt = 0
+    while True:
+        try:
+            return __execute_sql(query, parameters, **kwargs)
+        except SanAuthError:
+            raise
+        except SanError:
+            if attempt >= retries:
+                raise
+        attempt += 1
+        # The transport already retried immediately, so start from the first backoff step.
+        time.sleep(retry_backoff(attempt + 1))
+
+
+def _tag_result(result, parameters, as_arrow):
+    """Add a column per parameter holding its value, in front of the result columns."""
+    columns = result.column_names if as_arrow else result.columns
+    tags = [(name, value) for name, value in parameters.items() if name not in columns]
+    if as_arrow:
+        pa = pyarrow()
+        for position, (name, value) in enumerate(tags):
+            result = result.add_column(position, name, pa.array([value] * result.num_rows))
+        return result
+
+    result = result.copy()
+    for position, (name, value) in enumerate(tags):
+        result.insert(position, name, [value] * len(result))
+    return result
+
+
 def __execute_sql(query, parameters, **kwargs):
     idx = kwargs.pop("idx", 0)
+    cache = ApiConfig.sql_cache
+    if cache is None:
+        res = execute_gql(build_sql_query(query, parameters, idx), stream=ApiConfig.stream_responses)
+        return transform_sql_result(res, idx, **kwargs)
+
+    cached = cache.get(query, parameters, ApiConfig.api_key)
+    if cached is not None:
+        return sql_result(cached["columns"], cached["columnTypes"], cached["values"], **kwargs)
+
+    started = time.monotonic()
+    res = execute_gql(build_sql_query(query, parameters, idx), stream=ApiConfig.stream_responses)
+    query_seconds = time.monotonic() - started
+    result = res[f"query_{idx}"]
+    columns = {
+        "columns": result["columns"],
+        "columnTypes": result.get("columnTypes"),
+        "values": sql_column_values(result["rows"], len(result["columns"])),
+    }
+    cache.set(query, parameters, columns, query_seconds, ApiConfig.api_key)
+    return sql_result(columns["columns"], columns["columnTypes"], columns["values"], **kwargs)
+
+
+def build_sql_query(query, parameters, idx=0):
     # Export the python dictionary parameters to a JSON string
     # where each of the quotes " is replaced with \", so when interpolated
     # in the GraphQL parameters field it is properly escaped
@@ -60,15 +314,30 @@ def __execute_sql(query, parameters, **kwargs):
         }}
     }}"""
 
-    res = execute_gql(gql_query)
-    res = __transform_sql_result(res, idx, **kwargs)
-
-    return res
+    return gql_query
 
 
-def __transform_sql_result(response, idx, **kwargs):
+def transform_sql_result(response, idx, **kwargs):
     result = response[f"query_{idx}"]
-    result = pd.DataFrame(result["rows"], columns=result["columns"])
+    values = sql_column_values(result["rows"], len(result["columns"]))
+    return sql_result(result["columns"], result.get("columnTypes"), values, **kwargs)
+
+
+def sql_result(names, column_types, values, **kwargs):
+    """DataFrame (pyarrow.Table with `as_arrow`) of SQL result columns, one list of values per column."""
+    if not ApiConfig.sql_column_types or (column_types is not None and len(column_types) != len(names)):
+        column_types = None
+    if kwargs.get("as_arrow"):
+        if kwargs.get("set_index") is not None:
+            raise SanError("'set_index' cannot be combined with 'as_arrow' in 'execute_sql'")
+        return sql_table(names, values, column_types)
+
+    if column_types is None:
+        result = pd.DataFrame(dict(enumerate(values)))
+    else:
+        columns = zip(values, column_types)
+        result = pd.DataFrame({i: sql_column(column, column_type) for i, (column, column_type) in enumerate(columns)})
+    result.columns = names
 
     set_index = kwargs.get("set_index")
 
@@ -83,3 +352,14 @@ def __transform_sql_result(response, idx, **kwargs):
         result = result.set_index(set_index)
 
     return result
+
+
+def sql_column_values(rows, column_count):
+    """The values of runRawSqlQuery rows as one list per column."""
+    if isinstance(rows, StreamedColumns) and rows.is_columnar and len(rows) > 0 and len(rows.columns) == column_count:
+        return rows.columns
+    if isinstance(rows, StreamedColumns):
+        rows = rows.records()
+    if not rows:
+        return [[] for _ in range(column_count)]
+    return [list(column) for column in zip(*rows)]
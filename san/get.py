@@ -1,8 +1,14 @@
+import functools
+
 import san.sanbase_graphql
+from san.api_config import ApiConfig
+from san.arrow import frame_table, merge_tables
+from san.chunking import fetch_chunked
 from san.query_constants import DEPRECATED_QUERIES, CUSTOM_QUERIES, NO_SLUG_QUERIES
 from san.sanbase_graphql_helper import QUERY_MAPPING
 from san.graphql import execute_gql
 from san.query import get_gql_query, parse_dataset
+from san.query_builder import build_document
 from san.transform import transform_timeseries_data_query_result
 from san.error import SanError
 from san.param_validation import validate_kwargs
@@ -36,13 +42,43 @@ def get(dataset, **kwargs):
         selector={"organization": "ethereum"},
         from_date="utc_now-60d",
         to_date="utc_now-40d")
+
+    Long ranges can be split into windows fetched concurrently and merged
+    by passing `chunk_size="auto"` or a window length such as `chunk_size="30d"`.
+
+    Pass `as_arrow=True` to get a pyarrow.Table with a "datetime" column
+    instead of a DataFrame.
     """
     validate_kwargs("san.get", kwargs)
+    chunk_size = kwargs.pop("chunk_size", None)
+    if chunk_size is not None:
+        merge = merge_tables if kwargs.get("as_arrow") else None
+        return fetch_chunked(functools.partial(get, dataset), chunk_size, merge=merge, **kwargs)
+
+    as_arrow = kwargs.pop("as_arrow", False)
+    query, slug = parse_dataset(dataset)
+    if slug and query in CUSTOM_QUERIES:
+        idx = kwargs.pop("idx", 0)
+        result = getattr(san.sanbase_graphql, query)(idx, slug, **kwargs)
+        return frame_table(result) if as_arrow else result
+
+    idx, gql_query = build_get_query(dataset, **kwargs)
+    res = execute_gql(gql_query, stream=ApiConfig.stream_responses)
+
+    return transform_timeseries_data_query_result(idx, query, res, as_arrow=as_arrow)
+
+
+def build_get_query(dataset, **kwargs):
+    """
+    Build the GraphQL document for a `san.get` call without executing it.
+    Returns a tuple of (idx, document), where the document carries its variables.
+    """
     query, slug = parse_dataset(dataset)
     if slug or query in NO_SLUG_QUERIES:
         return __get_metric_slug_string_selector(query, slug, dataset, **kwargs)
     elif query and not slug:
         return __get(query, **kwargs)
+    raise SanError("Invalid metric!")
 
 
 def __get_metric_slug_string_selector(query, slug, dataset, **kwargs):
@@ -55,18 +91,15 @@ def __get_metric_slug_string_selector(query, slug, dataset, **kwargs):
             )
         )
 
-    if query in CUSTOM_QUERIES:
-        return getattr(san.sanbase_graphql, query)(idx, slug, **kwargs)
     if query in QUERY_MAPPING.keys():
-        gql_query = "{" + get_gql_query(idx, dataset, **kwargs) + "}"
+        gql_query = build_document([get_gql_query(idx, dataset, **kwargs)])
     else:
         if slug != "":
-            gql_query = "{" + san.sanbase_graphql.get_metric_timeseries_data(idx, query, slug, **kwargs) + "}"
+            gql_query = build_document([san.sanbase_graphql._timeseries_data_fragment(idx, query, slug, **kwargs)])
         else:
             raise SanError("Invalid metric!")
-    res = execute_gql(gql_query)
 
-    return transform_timeseries_data_query_result(idx, query, res)
+    return idx, gql_query
 
 
 def __get(query, **kwargs):
@@ -78,10 +111,8 @@ def __get(query, **kwargs):
     idx = kwargs.pop("idx", 0)
 
     if query in QUERY_MAPPING.keys():
-        gql_query = "{" + get_gql_query(idx, query, **kwargs) + "}"
+        gql_query = build_document([get_gql_query(idx, query, **kwargs)])
     else:
-        gql_query = "{" + san.sanbase_graphql.get_metric_timeseries_data(idx, query, **kwargs) + "}"
-
-    res = execute_gql(gql_query)
+        gql_query = build_document([san.sanbase_graphql._timeseries_data_fragment(idx, query, **kwargs)])
 
-    return transform_timeseries_data_query_result(idx, query, res)
+    return idx, gql_query
@@ -1,6 +1,22 @@
+import functools
+
 import san.sanbase_graphql
+import san.sanbase_graphql_helper as sgh
+from san.api_config import ApiConfig
+from san.arrow import concat_tables, merge_tables
+from san.chunking import (
+    AUTO_SHARD_SIZE,
+    fetch_chunked,
+    fetch_sharded,
+    merge_frames,
+    merge_long_frames,
+    merge_long_shard_frames,
+    merge_shard_frames,
+    shard_slugs,
+)
 from san.graphql import execute_gql
 from san.query import parse_dataset
+from san.query_builder import build_document
 from san.transform import transform_timeseries_data_per_slug_query_result
 from san.error import SanError
 from san.param_validation import validate_kwargs
@@ -13,13 +29,67 @@ def get_many(dataset, **kwargs):
         slugs=["bitcoin", "ethereum"]
         from_date="2020-01-01"
         to_date="2020-01-10")
+
+    Pass `chunk_size="auto"` or a window length such as `chunk_size="30d"`
+    to split long ranges into concurrently fetched windows.
+
+    Pass `long_format=True` to get one row per (datetime, slug) point with
+    "slug" and "value" columns instead of one column per slug.
+
+    Pass `as_arrow=True` to get the long layout as a pyarrow.Table with
+    "datetime", "slug" and "value" columns.
+
+    Long slug lists are split into shards of at most
+    `ApiConfig.shard_max_points` estimated points that are fetched concurrently
+    and merged into the same frame. Pass `shard_size` as a number of slugs per
+    shard to size them yourself, or `shard_size=None` to send one request.
     """
     validate_kwargs("san.get_many", kwargs)
+    chunk_size = kwargs.pop("chunk_size", None)
+    if chunk_size is not None:
+        if kwargs.get("as_arrow"):
+            merge = merge_tables
+        elif kwargs.get("long_format"):
+            merge = merge_long_frames
+        else:
+            merge = merge_frames
+        return fetch_chunked(
+            functools.partial(get_many, dataset), chunk_size, len(kwargs.get("slugs") or []), merge=merge, **kwargs
+        )
+
+    shard_size = kwargs.pop("shard_size", AUTO_SHARD_SIZE)
+    if shard_size is not None and kwargs.get("slugs"):
+        shards = shard_slugs(
+            kwargs["slugs"],
+            shard_size,
+            kwargs.get("from_date", sgh._default_from_date()),
+            kwargs.get("to_date", sgh._default_to_date()),
+            kwargs.get("interval", sgh._DEFAULT_INTERVAL),
+        )
+        if len(shards) > 1:
+            if kwargs.get("as_arrow"):
+                merge = concat_tables
+            elif kwargs.get("long_format"):
+                merge = merge_long_shard_frames
+            else:
+                merge = merge_shard_frames
+            kwargs.pop("slugs")
+            return fetch_sharded(functools.partial(get_many, dataset, shard_size=None), shards, merge=merge, **kwargs)
+
+    long_format = kwargs.pop("long_format", False)
+    as_arrow = kwargs.pop("as_arrow", False)
     query, slug = parse_dataset(dataset)
-    return __get_many(query, **kwargs)
+    idx, gql_query = build_get_many_query(query, **kwargs)
+    res = execute_gql(gql_query, stream=ApiConfig.stream_responses)
+
+    return transform_timeseries_data_per_slug_query_result(idx, query, res, long_format=long_format, as_arrow=as_arrow)
 
 
-def __get_many(query, **kwargs):
+def build_get_many_query(query, **kwargs):
+    """
+    Build the GraphQL document for a `san.get_many` call without executing it.
+    Returns a tuple of (idx, document), where the document carries its variables.
+    """
     if not ("selector" in kwargs or "slugs" in kwargs):
         raise SanError("""
             Invalid call of the get function,you need to either
@@ -27,7 +97,6 @@ def __get_many(query, **kwargs):
             or selector as a key-word argument!""")
     idx = kwargs.pop("idx", 0)
 
-    gql_query = "{" + san.sanbase_graphql.get_metric_timeseries_data_per_slug(idx, query, **kwargs) + "}"
-    res = execute_gql(gql_query)
+    gql_query = build_document([san.sanbase_graphql._timeseries_data_per_slug_fragment(idx, query, **kwargs)])
 
-    return transform_timeseries_data_per_slug_query_result(idx, query, res)
+    return idx, gql_query
@@ -1,3 +1,5 @@
+import contextlib
+
 from san.api_config import ApiConfig
 from san.error import (
     SanAuthError,
@@ -7,29 +9,110 @@ from san.error import (
     SanResponseSizeLimitError,
     SanServerError,
 )
+from san.json_parser import loads_response
+from san.rate_limit import RATE_LIMITER, retry_after_seconds
+from san.singleflight import SINGLE_FLIGHT
+from san.streaming import parse_streamed_response
 from san.transport import RequestsTransport
 
 DEFAULT_TRANSPORT = RequestsTransport()
 
 
-def execute_gql(gql_query_str):
-    response = DEFAULT_TRANSPORT.execute(gql_query_str, headers=__build_headers())
+def execute_gql(gql_query_str, stream=False, transport=None):
+    """
+    Run a GraphQL query and return its `data`.
+
+    The request goes through `transport` if given, else ApiConfig.transport,
+    else DEFAULT_TRANSPORT.
+
+    With stream=True the body is parsed while it downloads and the arrays of
+    timeseriesDataJson, timeseriesDataPerSlugJson and runRawSqlQuery rows are
+    returned as san.streaming.StreamedColumns. Streamed queries bypass the
+    response cache and request coalescing.
+    """
+    if stream:
+        return __fetch_streamed(gql_query_str, transport)
+
+    cache = ApiConfig.cache
+    if cache is not None:
+        cached = cache.get(gql_query_str, ApiConfig.api_key)
+        if cached is not None:
+            return cached
+
+    if ApiConfig.coalesce_requests:
+        return SINGLE_FLIGHT.do(gql_query_str, ApiConfig.api_key, lambda: __fetch(gql_query_str, cache, transport))
+    return __fetch(gql_query_str, cache, transport)
+
+
+def __fetch(gql_query_str, cache, transport):
+    response = __execute_paced(gql_query_str, transport=transport)
+    data = handle_response(response, gql_query_str)
+
+    if cache is not None:
+        cache.set(gql_query_str, data, ApiConfig.api_key)
+    return data
 
-    if response.status_code == 200:
-        return __handle_success_response__(response, gql_query_str)
-    __raise_response_error__(response, gql_query_str)
+
+def __fetch_streamed(gql_query_str, transport):
+    transport = __select_transport(transport)
+    response = __execute_paced(gql_query_str, stream=True, transport=transport)
+    with contextlib.closing(response):
+        if response.status_code != 200:
+            return handle_response(response, gql_query_str)
+
+        try:
+            response_json = parse_streamed_response(transport.iter_content(response))
+        except ValueError as exc:
+            raise SanGraphqlQueryError(f"Invalid JSON response received from API: {exc}") from exc
+        return handle_response(response, gql_query_str, response_json=response_json)
 
 
 def get_response_headers(gql_query_str):
-    response = DEFAULT_TRANSPORT.execute(gql_query_str, headers=__build_headers())
+    response = __execute_paced(gql_query_str)
 
     if response.status_code == 200:
         return response.headers
     __raise_response_error__(response, gql_query_str)
 
 
-def __handle_success_response__(response, gql_query_str):
-    response_json = __json_response__(response)
+def handle_response(response, gql_query_str, response_json=None):
+    """
+    Return the `data` of a GraphQL response or raise the matching SanError.
+    Works with any response object exposing status_code, headers, json() and text.
+    `response_json` is the already decoded body, if the caller parsed it itself.
+    """
+    try:
+        if response.status_code == 200:
+            return __handle_success_response__(response, gql_query_str, response_json)
+        __raise_response_error__(response, gql_query_str)
+    except SanRateLimitError as exc:
+        seconds = retry_after_seconds(exc)
+        if seconds is not None:
+            RATE_LIMITER.block_for(seconds)
+        raise
+
+
+def __select_transport(transport):
+    return transport or ApiConfig.transport or DEFAULT_TRANSPORT
+
+
+def __execute_paced(gql_query_str, stream=False, transport=None):
+    transport = __select_transport(transport)
+    RATE_LIMITER.acquire()
+    response = None
+    try:
+        if stream:
+            response = transport.execute(gql_query_str, headers=build_headers(), stream=True)
+        else:
+            response = transport.execute(gql_query_str, headers=build_headers())
+    finally:
+        RATE_LIMITER.release(response)
+    return response
+
+
+def __handle_success_response__(response, gql_query_str, response_json=None):
+    if response_json is None:
+        response_json = __json_response__(response)
     if __result_has_gql_errors__(response_json):
         __raise_graphql_error__(gql_query_str, response_json["errors"])
     if __has_resolved_queries(response_json):
@@ -41,7 +124,7 @@ def __handle_success_response__(response, gql_query_str):
     )
 
 
-def __build_headers():
+def build_headers():
     headers = {}
     if ApiConfig.api_key:
         headers = {"authorization": "Apikey {}".format(ApiConfig.api_key)}
@@ -67,7 +150,7 @@ def __raise_response_error__(response, gql_query_str):
 
 def __json_response__(response):
     try:
-        return response.json()
+        return loads_response(response)
     except ValueError as exc:
         raise SanGraphqlQueryError(f"Invalid JSON response received from API: {exc}") from exc
 
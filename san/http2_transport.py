@@ -0,0 +1,113 @@
+"""
+HTTP/2 transport for the synchronous API.
+
+RequestsTransport keeps one requests.Session, and so one connection, per
+thread. Http2Transport shares a single httpx.Client between all threads and
+multiplexes their requests as streams over one HTTP/2 connection, so
+AsyncBatch workers and other threaded callers pay for one TLS handshake:
+
+    from san.http2_transport import Http2Transport
+
+    san.ApiConfig.transport = Http2Transport()
+
+Requires `pip install 'sanpy[http2]'`. Timeouts, retries and error mapping
+follow the same ApiConfig settings as RequestsTransport.
+"""
+
+import threading
+import time
+
+try:
+    import httpx
+except ImportError as exc:
+    raise ImportError("Http2Transport requires httpx with HTTP/2 support. Install it with `pip install 'sanpy[http2]'`.") from exc
+
+from san.api_config import ApiConfig
+from san.env_vars import SANBASE_GQL_HOST
+from san.error import SanError, SanTransportError
+from san.httpx_support import build_timeout, map_transport_error, retry_delay
+from san.streaming import STREAM_CHUNK_SIZE
+from san.transport import request_payload
+
+
+class Http2Transport:
+    """
+    Args:
+        base_url: GraphQL endpoint
+        http2: Negotiate HTTP/2. With False the same client speaks HTTP/1.1 only.
+    """
+
+    def __init__(self, base_url=SANBASE_GQL_HOST, http2=True):
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError as exc:
+                raise SanError("Http2Transport requires h2 for HTTP/2. Install it with `pip install 'sanpy[http2]'`.") from exc
+        self.base_url = base_url
+        self.http2 = http2
+        self._lock = threading.Lock()
+        self._client = None
+        self._config_signature_value = None
+
+    def execute(self, gql_query_str, headers=None, stream=False):
+        """
+        POST the query. With stream=True only the headers are read; the body
+        is consumed with iter_content and the response must be closed.
+        """
+        client = self._get_client()
+        retry_number = 0
+
+        while True:
+            try:
+                request = client.build_request(
+                    "POST",
+                    self.base_url,
+                    json=request_payload(gql_query_str),
+                    headers=headers or {},
+                    timeout=build_timeout(),
+                )
+                response = client.send(request, stream=stream)
+            except httpx.HTTPError as exc:
+                delay = retry_delay(retry_number, exc=exc)
+            else:
+                delay = retry_delay(retry_number, response=response)
+                if delay is None:
+                    return response
+                response.close()
+
+            retry_number += 1
+            time.sleep(delay)
+
+    def iter_content(self, response, chunk_size=STREAM_CHUNK_SIZE):
+        """Yield the (decompressed) body of a streamed response in byte chunks."""
+        try:
+            yield from response.iter_bytes(chunk_size=chunk_size)
+        except httpx.TransportError as exc:
+            raise map_transport_error(exc) from exc
+        except httpx.HTTPError as exc:
+            raise SanTransportError(f"Error running query: ({exc})") from exc
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _get_client(self):
+        config_signature = self._config_signature()
+        with self._lock:
+            if self._client is None or self._config_signature_value != config_signature:
+                if self._client is not None:
+                    self._client.close()
+                self._client = httpx.Client(
+                    http2=self.http2,
+                    limits=httpx.Limits(
+                        max_connections=ApiConfig.pool_connections,
+                        max_keepalive_connections=ApiConfig.pool_connections,
+                    ),
+                )
+                self._config_signature_value = config_signature
+            return self._client
+
+    def _config_signature(self):
+        return (ApiConfig.pool_connections,)
@@ -0,0 +1,47 @@
+"""
+Timeouts, error mapping and retries shared by the httpx based transports,
+san.http2_transport.Http2Transport and san.aio.transport.AsyncTransport.
+
+Both follow the ApiConfig settings RequestsTransport applies through urllib3.
+"""
+
+import httpx
+
+from san.api_config import ApiConfig
+from san.error import SanNetworkError, SanTimeoutError, SanTransportError
+from san.transport import RETRY_STATUS_CODES, retry_backoff
+
+
+def build_timeout():
+    timeout = ApiConfig.request_timeout
+    if isinstance(timeout, tuple):
+        connect_timeout, read_timeout = timeout
+        return httpx.Timeout(read_timeout, connect=connect_timeout)
+    return httpx.Timeout(timeout)
+
+
+def map_transport_error(exc):
+    if isinstance(exc, httpx.TimeoutException):
+        return SanTimeoutError(f"Error running query: ({exc})")
+    if isinstance(exc, httpx.NetworkError):
+        return SanNetworkError(f"Error running query: ({exc})")
+    return SanTransportError(f"Error running query: ({exc})")
+
+
+def retry_delay(retry_number, response=None, exc=None):
+    """
+    Seconds to wait before retrying an attempt that returned response or
+    raised exc, where retry_number is the count of retries made so far.
+    Returns None when the response is final and raises the mapped error when
+    the exception is.
+    """
+    if exc is not None:
+        if not isinstance(exc, httpx.TransportError):
+            raise SanTransportError(f"Error running query: ({exc})") from exc
+        if retry_number >= ApiConfig.request_retry_count:
+            raise map_transport_error(exc) from exc
+        return retry_backoff(retry_number + 1)
+
+    if response.status_code not in RETRY_STATUS_CODES or retry_number >= ApiConfig.request_retry_count:
+        return None
+    return retry_backoff(retry_number + 1, response.headers.get("retry-after"))
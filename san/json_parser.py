@@ -0,0 +1,43 @@
+"""
+Decoding of API response bodies.
+
+ApiConfig.json_parser selects the decoder: "json" uses the response's own
+json() method, "orjson" decodes the raw body with orjson, which is several
+times faster on large timeseries responses, and "auto" uses orjson when it
+is installed (`pip install sanpy[fast]`).
+"""
+
+from san.api_config import ApiConfig
+from san.error import SanError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_PARSERS = ("auto", "json", "orjson")
+
+
+def loads_response(response):
+    """Decode the JSON body of a response. Raises ValueError for invalid JSON."""
+    content = getattr(response, "content", None)
+    if _use_orjson() and isinstance(content, (bytes, bytearray, memoryview, str)):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson rejects integers wider than 64 bits, which the standard decoder accepts.
+            pass
+    return response.json()
+
+
+def _use_orjson():
+    parser = ApiConfig.json_parser
+    if parser == "auto":
+        return orjson is not None
+    if parser == "orjson":
+        if orjson is None:
+            raise ImportError('ApiConfig.json_parser = "orjson" requires orjson. Install it with: pip install sanpy[fast]')
+        return True
+    if parser == "json":
+        return False
+    raise SanError(f"Unknown ApiConfig.json_parser {parser!r}, expected one of {', '.join(JSON_PARSERS)}")
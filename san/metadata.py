@@ -1,7 +1,10 @@
+from .api_config import ApiConfig
 from .graphql import execute_gql
 
 
 def metadata(metric, arr):
+    if ApiConfig.catalog is not None:
+        return ApiConfig.catalog.metadata(metric, arr)
     query_str = (
         """{{
     getMetric (metric: \"{metric}\") {{
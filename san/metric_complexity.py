@@ -1,19 +1,54 @@
+import threading
+from collections import OrderedDict
+
 from san.sanbase_graphql_helper import _format_from_date, _format_to_date
 from san.graphql import execute_gql
 
+# Complexity only depends on the metric and the requested range, so the most recently used results are kept
+# for the process lifetime.
+_COMPLEXITY_CACHE = OrderedDict()
+_COMPLEXITY_CACHE_SIZE = 1024
+_CACHE_LOCK = threading.Lock()
+
 
 def metric_complexity(metric, from_date, to_date, interval):
-    query_str = (
-        """{{
-    getMetric (metric: \"{metric}\") {{
+    return metric_complexities([(metric, from_date, to_date, interval)])[0]
+
+
+def metric_complexities(requests):
+    """
+    Return the complexity of each (metric, from_date, to_date, interval) tuple.
+    Values missing from the cache are fetched together in one aliased query.
+    """
+    keys = [(metric, _format_from_date(from_date), _format_to_date(to_date), interval) for metric, from_date, to_date, interval in requests]
+
+    with _CACHE_LOCK:
+        complexities = {key: _COMPLEXITY_CACHE[key] for key in keys if key in _COMPLEXITY_CACHE}
+    missing = list(dict.fromkeys(key for key in keys if key not in complexities))
+
+    if missing:
+        queries = []
+        for idx, (metric, from_date, to_date, interval) in enumerate(missing):
+            queries.append(
+                """
+    query_{idx}: getMetric (metric: \"{metric}\") {{
         timeseriesDataComplexity(
             from: \"{from_date}\",
             to: \"{to_date}\",
             interval: \"{interval}\"
         )
-        }}
-    }}
-    """
-    ).format(metric=metric, from_date=_format_from_date(from_date), to_date=_format_to_date(to_date), interval=interval)
+    }}""".format(idx=idx, metric=metric, from_date=from_date, to_date=to_date, interval=interval)
+            )
+        result = execute_gql("{" + "".join(queries) + "\n}")
+
+        for idx, key in enumerate(missing):
+            complexities[key] = result[f"query_{idx}"]["timeseriesDataComplexity"]
+
+    with _CACHE_LOCK:
+        for key, complexity in complexities.items():
+            _COMPLEXITY_CACHE[key] = complexity
+            _COMPLEXITY_CACHE.move_to_end(key)
+        while len(_COMPLEXITY_CACHE) > _COMPLEXITY_CACHE_SIZE:
+            _COMPLEXITY_CACHE.popitem(last=False)
 
-    return execute_gql(query_str)["getMetric"]["timeseriesDataComplexity"]
+    return [complexities[key] for key in keys]
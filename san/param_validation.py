@@ -27,13 +27,24 @@ _SUPPORTED_KWARGS = frozenset(
     }
 )
 
-_PUBLIC_KWARGS = _SUPPORTED_KWARGS - {"idx"}
+# Parameters that only some functions handle, on top of the query parameters above.
+_FUNCTION_KWARGS = {
+    "san.get": frozenset({"chunk_size", "as_arrow"}),
+    "san.get_many": frozenset({"chunk_size", "shard_size", "long_format", "as_arrow"}),
+    "san.aio.get": frozenset({"as_arrow"}),
+    "san.aio.get_many": frozenset({"long_format", "as_arrow"}),
+    "san.aio.Batch.get": frozenset({"as_arrow"}),
+    "san.aio.Batch.get_many": frozenset({"long_format", "as_arrow"}),
+    "AsyncBatch.get": frozenset({"chunk_size", "as_arrow"}),
+    "AsyncBatch.get_many": frozenset({"chunk_size", "shard_size", "long_format", "as_arrow"}),
+}
 
 
 def validate_kwargs(func_name, kwargs):
     if not ApiConfig.strict_kwargs:
         return
-    unsupported = sorted(set(kwargs) - _SUPPORTED_KWARGS)
+    supported = _SUPPORTED_KWARGS | _FUNCTION_KWARGS.get(func_name, frozenset())
+    unsupported = sorted(set(kwargs) - supported)
     if not unsupported:
         return
     raise SanError(
@@ -43,6 +54,6 @@ def validate_kwargs(func_name, kwargs):
         "with `pip install --upgrade sanpy`.".format(
             func=func_name,
             bad=", ".join(unsupported),
-            ok=", ".join(sorted(_PUBLIC_KWARGS)),
+            ok=", ".join(sorted(supported - {"idx"})),
         )
     )
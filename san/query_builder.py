@@ -0,0 +1,64 @@
+"""
+GraphQL documents whose values are sent as `variables`.
+
+The private getMetric builders in san.sanbase_graphql that get, get_many,
+Batch and the CLI use return a QueryFragment: the aliased field text, which
+references variables suffixed with the alias index (`$from_0`), plus the
+values and GraphQL types of those variables. The public
+get_metric_timeseries_data builders keep returning self-contained text.
+build_document joins fragments into one Document, a str that also carries
+the variables, and execute_gql sends them along with the query text.
+
+Because values are not part of the text, the document for a given query
+shape is identical across calls and can be cached by the API and locally.
+"""
+
+import json
+
+
+class QueryFragment(str):
+    """Text of one aliased field. Must be combined with build_document, not plain string concatenation."""
+
+    def __new__(cls, text, variables=None, types=None):
+        fragment = super().__new__(cls, text)
+        fragment.variables = dict(variables or {})
+        fragment.types = dict(types or {})
+        return fragment
+
+
+class Document(str):
+    """A complete GraphQL document and the values of its variables."""
+
+    def __new__(cls, text, variables=None):
+        document = super().__new__(cls, text)
+        document.variables = dict(variables or {})
+        return document
+
+
+def build_document(fragments):
+    """Join fragments (QueryFragment or plain str) into one query Document."""
+    variables = {}
+    types = {}
+    for fragment in fragments:
+        variables.update(getattr(fragment, "variables", {}))
+        types.update(getattr(fragment, "types", {}))
+
+    body = "{\n" + "\n".join(fragments) + "\n}"
+    if not types:
+        return Document(body)
+
+    definitions = ", ".join(f"${name}: {gql_type}" for name, gql_type in types.items())
+    return Document(f"query({definitions}) {body}", variables)
+
+
+def query_variables(gql_query_str):
+    """Variables carried by a Document, or None for a plain query string."""
+    return getattr(gql_query_str, "variables", None) or None
+
+
+def variables_text(gql_query_str):
+    """Variables of a Document as canonical JSON preceded by a newline, or "" for a plain query string."""
+    variables = query_variables(gql_query_str)
+    if variables is None:
+        return ""
+    return "\n" + json.dumps(variables, sort_keys=True, separators=(",", ":"), default=str)
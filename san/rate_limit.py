@@ -0,0 +1,170 @@
+"""
+Process-wide client-side rate limiter.
+
+Every response carries `x-ratelimit-remaining-{minute,hour,month}` headers.
+RATE_LIMITER turns them into token buckets that refill at the API's rate and
+paces `execute_gql` calls from all threads (AsyncBatch workers included) and
+from `san.aio`, so requests wait just long enough instead of failing with 429.
+"""
+
+import asyncio
+import re
+import threading
+import time
+
+from san.api_config import ApiConfig
+from san.error import SanRateLimitError
+
+WINDOW_SECONDS = {"minute": 60, "hour": 60 * 60, "month": 30 * 24 * 60 * 60}
+
+_RETRY_IN_RE = re.compile(r"Try again in (\d+) seconds")
+
+
+def retry_after_seconds(exception):
+    """Seconds from a "Try again in N seconds" rate limit message, or None."""
+    match = _RETRY_IN_RE.search(str(exception))
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+class _Bucket:
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self.remaining = None
+        self.capacity = None
+        self.tokens = None
+        self.updated_at = None
+
+    def refill(self, now):
+        if self.tokens is None:
+            return
+        rate = self.capacity / self.window_seconds
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+
+    def wait_time(self):
+        if self.tokens is None or self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.window_seconds / self.capacity
+
+
+class RateLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def acquire(self):
+        """Block until a request fits in the budget."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Like acquire, but waits on the running event loop instead of blocking the thread."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, response=None):
+        """Finish a request started with acquire and learn the budget from its response headers."""
+        now = time.monotonic()
+        headers = getattr(response, "headers", None) or {}
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+            for window, bucket in self._buckets.items():
+                remaining = _header_int(headers, f"x-ratelimit-remaining-{window}")
+                if remaining is None:
+                    continue
+                limit = _header_int(headers, f"x-ratelimit-limit-{window}")
+                # Without a limit header the largest remaining value seen so far is the best estimate.
+                bucket.capacity = max(limit or 0, remaining + 1, bucket.capacity or 0)
+                bucket.remaining = remaining
+                # Requests still in flight are not reflected in the header yet.
+                bucket.tokens = max(remaining - ApiConfig.rate_limit_reserve - self._in_flight, 0)
+                bucket.updated_at = now
+
+    def block_for(self, seconds):
+        """Hold back all requests, e.g. after the API answered "Try again in N seconds"."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for window, bucket in self._buckets.items():
+                bucket.refill(now)
+                stats[f"{window}_remaining"] = bucket.remaining
+                stats[f"{window}_budget"] = None if bucket.tokens is None else int(bucket.tokens)
+            stats["in_flight"] = self._in_flight
+            stats["throttle_waits"] = self._throttle_waits
+            stats["throttle_wait_seconds"] = round(self._throttle_wait_seconds, 3)
+            stats["blocked_for_seconds"] = round(max(self._blocked_until - now, 0.0), 3)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._reset_state()
+
+    def _try_acquire(self):
+        if not ApiConfig.rate_limit_pacing:
+            return 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            if ApiConfig.api_key != self._api_key:
+                # Budgets belong to an API key.
+                self._reset_state()
+                self._api_key = ApiConfig.api_key
+
+            for bucket in self._buckets.values():
+                bucket.refill(now)
+            wait = max([self._blocked_until - now] + [bucket.wait_time() for bucket in self._buckets.values()])
+
+            if wait <= 0:
+                for bucket in self._buckets.values():
+                    if bucket.tokens is not None:
+                        bucket.tokens -= 1
+                self._in_flight += 1
+                return 0.0
+
+            if wait > ApiConfig.rate_limit_max_wait:
+                raise SanRateLimitError(
+                    f"API Rate Limit Reached. Try again in {int(wait) + 1} seconds (client-side rate limiter, "
+                    f"see san.ApiConfig.rate_limit_max_wait)"
+                )
+
+            self._throttle_waits += 1
+            self._throttle_wait_seconds += wait
+            return wait
+
+    def _reset_state(self):
+        self._buckets = {window: _Bucket(seconds) for window, seconds in WINDOW_SECONDS.items()}
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._throttle_waits = 0
+        self._throttle_wait_seconds = 0.0
+        self._api_key = ApiConfig.api_key
+
+
+def _header_int(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+RATE_LIMITER = RateLimiter()
+
+
+def rate_limit_stats():
+    """Current client-side view of the API budget and how long requests were throttled."""
+    return RATE_LIMITER.stats()
@@ -1,7 +1,8 @@
-import san.pandas_utils
+import functools
+
 import san.sanbase_graphql_helper as sgh
-from san.batch import Batch
 from san.error import SanError
+from san.query_builder import QueryFragment
 
 
 def prices(idx, slug, **kwargs):
@@ -168,6 +169,10 @@ def emerging_trends(idx, **kwargs):
 
 
 def ohlcv(idx, slug, **kwargs):
+    # Imported here so that query building does not load pandas.
+    import san.pandas_utils
+    from san.batch import Batch
+
     return_fields = ["openPriceUsd", "closePriceUsd", "highPriceUsd", "lowPriceUsd", "volume", "marketcap"]
 
     batch = Batch()
@@ -280,6 +285,95 @@ def get_metric_timeseries_data_per_slug(idx, metric, slugs=None, **kwargs):
     return query_str
 
 
+def _timeseries_data_fragment(idx, metric, slug=None, **kwargs):
+    """The query of get_metric_timeseries_data as a QueryFragment, for build_document."""
+    return _metric_query_fragment("timeseriesDataJson", idx, metric, slug, None, kwargs)
+
+
+def _timeseries_data_per_slug_fragment(idx, metric, slugs=None, **kwargs):
+    """The query of get_metric_timeseries_data_per_slug as a QueryFragment, for build_document."""
+    return _metric_query_fragment("timeseriesDataPerSlugJson", idx, metric, None, slugs, kwargs)
+
+
+def _metric_query_fragment(field, idx, metric, slug, slugs, kwargs):
+    """
+    Build a getMetric fragment. The metric, version, transform, interval and
+    aggregation define the query shape and are written into the cached
+    template; dates, the target and the boolean flags are sent as variables.
+    """
+    only_finalized_data = kwargs.pop("only_finalized_data", None)
+    if only_finalized_data is not None and not isinstance(only_finalized_data, bool):
+        raise SanError(f'"only_finalized_data" must be a bool, got: {only_finalized_data!r}')
+
+    if slug:
+        target = "slug"
+        target_value = slug
+    elif slugs:
+        target = "selector"
+        target_value = {"slugs": list(slugs)}
+    elif "selector" in kwargs:
+        target = "selector"
+        target_value = sgh.selector_variable(kwargs["selector"])
+    elif field == "timeseriesDataJson":
+        raise SanError('"slug" or "selector" must be provided as an argument!')
+    else:
+        raise SanError('"slugs" or "selector" must be provided as an argument!')
+
+    template = _metric_template(
+        field,
+        metric,
+        _version_arg_helper(kwargs),
+        _transform_arg_helper(kwargs),
+        kwargs.get("interval", sgh._DEFAULT_INTERVAL),
+        kwargs.get("aggregation") or "null",
+        target,
+        only_finalized_data is not None,
+    )
+
+    variables = {
+        f"{target}_{idx}": target_value,
+        f"from_{idx}": str(sgh._format_from_date(kwargs.get("from_date", sgh._default_from_date()))),
+        f"to_{idx}": str(sgh._format_to_date(kwargs.get("to_date", sgh._default_to_date()))),
+        f"includeIncompleteData_{idx}": bool(kwargs.get("include_incomplete_data", False)),
+    }
+    types = {
+        f"{target}_{idx}": _METRIC_VARIABLE_TYPES[target],
+        f"from_{idx}": "DateTime!",
+        f"to_{idx}": "DateTime!",
+        f"includeIncompleteData_{idx}": "Boolean",
+    }
+    if only_finalized_data is not None:
+        variables[f"onlyFinalizedData_{idx}"] = only_finalized_data
+        types[f"onlyFinalizedData_{idx}"] = "Boolean"
+
+    return QueryFragment(template.format(idx=idx), variables, types)
+
+
+_METRIC_VARIABLE_TYPES = {"slug": "String", "selector": "MetricTargetSelectorInputObject"}
+
+
+@functools.lru_cache(maxsize=1024)
+def _metric_template(field, metric, version_arg, transform_arg, interval, aggregation, target, has_only_finalized_data):
+    def escape(text):
+        return text.replace("{", "{{").replace("}", "}}")
+
+    only_finalized_data_arg = "onlyFinalizedData: $onlyFinalizedData_{idx}" if has_only_finalized_data else ""
+    return f"""
+    query_{{idx}}: getMetric(metric: "{escape(metric)}"{escape(version_arg)}){{{{
+        {field}(
+            {target}: ${target}_{{idx}}
+            {escape(transform_arg)}
+            from: $from_{{idx}}
+            to: $to_{{idx}}
+            interval: "{escape(interval)}"
+            aggregation: {escape(aggregation)}
+            includeIncompleteData: $includeIncompleteData_{{idx}}
+            {only_finalized_data_arg}
+        )
+    }}}}
+    """
+
+
 def _version_arg_helper(kwargs):
     if "version" in kwargs and kwargs["version"] is not None:
         return f', version: "{kwargs["version"]}"'
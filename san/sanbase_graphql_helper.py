@@ -1,10 +1,16 @@
 import iso8601
 import datetime
+import re
+
+from san.error import SanError
 
 _DEFAULT_INTERVAL = "1d"
 _DEFAULT_SOCIAL_VOLUME_TYPE = "TELEGRAM_CHATS_OVERVIEW"
 _DEFAULT_SOURCE = "TELEGRAM"
 _DEFAULT_SEARCH_TEXT = ""
+_RELATIVE_DATE_RE = re.compile(r"^utc_now(?:-(\d+)([smhdw]))?$")
+_INTERVAL_RE = re.compile(r"^(\d+)([smhdw])$")
+_TIMEDELTA_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
 
 QUERY_MAPPING = {
     "prices": {"query": "historyPrice", "return_fields": ["datetime", "priceUsd", "priceBtc", "marketcap", "volume"]},
@@ -112,6 +118,24 @@ def transform_selector(selector):
     return temp_selector
 
 
+def selector_variable(selector):
+    """The selector as a GraphQL variable value, converted like transform_selector formats it inline."""
+    result = {}
+    for key, value in selector.items():
+        if isinstance(value, bool):
+            result[key] = value
+        elif (isinstance(value, str) and value.isdigit()) or isinstance(value, int):
+            result[key] = int(value)
+        elif isinstance(value, str):
+            result[key] = value
+        elif isinstance(value, dict):
+            result[key] = selector_variable(value)
+        elif isinstance(value, list):
+            result[key] = [str(x) for x in value]
+
+    return result
+
+
 def transform_query_args(query, **kwargs):
     kwargs["from_date"] = kwargs["from_date"] if "from_date" in kwargs else _default_from_date()
     kwargs["to_date"] = kwargs["to_date"] if "to_date" in kwargs else _default_to_date()
@@ -185,6 +209,44 @@ def _format_to_date(datetime_obj_or_str):
     return dt.isoformat()
 
 
+def interval_to_timedelta(interval):
+    match = _INTERVAL_RE.match(str(interval).strip())
+    if match is None:
+        raise SanError(f"Unsupported interval {interval!r}, expected a fixed interval like 5m, 1h or 1d")
+    amount, unit = match.groups()
+    return datetime.timedelta(**{_TIMEDELTA_UNITS[unit]: int(amount)})
+
+
+def resolve_from_date(datetime_obj_or_str, now=None):
+    """Resolve a `from_date` argument, including `utc_now-<n><unit>` strings, to an aware UTC datetime."""
+    return _resolve_date(datetime_obj_or_str, _format_from_date, now)
+
+
+def resolve_to_date(datetime_obj_or_str, now=None):
+    """Resolve a `to_date` argument the same way the API does, e.g. "2020-01-10" ends at 23:59:59."""
+    return _resolve_date(datetime_obj_or_str, _format_to_date, now)
+
+
+def _resolve_date(datetime_obj_or_str, format_fn, now):
+    if isinstance(datetime_obj_or_str, str) and "utc_now" in datetime_obj_or_str:
+        match = _RELATIVE_DATE_RE.match(datetime_obj_or_str.replace(" ", ""))
+        if match is None:
+            raise SanError(f"Unsupported relative date {datetime_obj_or_str!r}")
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        amount, unit = match.groups()
+        if amount is None:
+            return now
+        return now - datetime.timedelta(**{_TIMEDELTA_UNITS[unit]: int(amount)})
+
+    if isinstance(datetime_obj_or_str, datetime.datetime) and datetime_obj_or_str.tzinfo is None:
+        datetime_obj_or_str = datetime_obj_or_str.replace(tzinfo=datetime.timezone.utc)
+
+    resolved = format_fn(datetime_obj_or_str)
+    if isinstance(resolved, str):
+        resolved = iso8601.parse_date(resolved)
+    return resolved.astimezone(datetime.timezone.utc)
+
+
 def _format_all_return_fields(fields):
     while any(isinstance(x, tuple) for x in fields):
         fields = _format_return_fields(fields)
@@ -0,0 +1,78 @@
+"""
+Coalesce identical GraphQL queries that are in flight at the same time.
+
+When several threads call `execute_gql` with the same normalized query and
+API key, only the first one sends the request. The others wait for its
+result (or exception) instead of issuing duplicate HTTP requests.
+"""
+
+import copy
+import threading
+
+from san.cache import api_key_scope, normalize_query
+from san.query_builder import variables_text
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {"executed": 0, "coalesced": 0}
+
+    def do(self, gql_query_str, api_key, fn):
+        """Return fn(), sharing the result with concurrent callers using the same query and API key."""
+        key = (api_key_scope(api_key), normalize_query(gql_query_str), variables_text(gql_query_str))
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._counters["executed"] += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self._counters["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            # Callers may modify what they get back, so each waiter gets its own copy.
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._counters = {"executed": 0, "coalesced": 0}
+
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+def coalescing_stats():
+    """How many execute_gql calls were sent and how many shared an identical in-flight request."""
+    return SINGLE_FLIGHT.stats()
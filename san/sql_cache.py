@@ -0,0 +1,138 @@
+"""
+Persistent on-disk cache for `san.execute_sql` results.
+
+The cache is opt-in. Enable it by assigning an instance to ApiConfig:
+
+    san.ApiConfig.sql_cache = san.SqlResultCache()
+
+Entries are keyed by the normalized SQL text, its parameters and a hash of the
+API key. Every entry stores the result column by column (names, ClickHouse
+types and one value list per column), so a hit is rebuilt into the same typed
+frame or pyarrow Table as a fresh result without reaching the API.
+"""
+
+import hashlib
+import json
+import re
+
+from san.cache import SqliteStore, api_key_scope, collapse_whitespace, default_cache_dir
+from san.json_parser import _use_orjson, orjson
+
+# Results of queries using the current time change between runs.
+_RELATIVE_TIME_RE = re.compile(r"\b(?:now|now64|today|yesterday|utc_now)\b", re.IGNORECASE)
+
+DEFAULT_TTL = 24 * 60 * 60
+RELATIVE_TIME_TTL = 5 * 60
+DEFAULT_MAX_SIZE_BYTES = 1024 * 1024 * 1024
+
+
+def normalize_sql(query):
+    """Collapse whitespace outside of string literals and drop a trailing semicolon."""
+    return collapse_whitespace(query, "'").rstrip(";").rstrip()
+
+
+class SqlResultCache(SqliteStore):
+    """
+    Size-bounded SQLite-backed store of `execute_sql` results.
+
+    Args:
+        path: Location of the SQLite file. Defaults to <user cache dir>/sanpy/sql_results.sqlite
+        default_ttl: Seconds a result stays valid
+        relative_time_ttl: TTL for queries using now(), today(), yesterday() or utc_now
+        max_size_bytes: Least recently used entries are evicted above this size
+    """
+
+    table = "results"
+    extra_columns = (("query_key", "TEXT NOT NULL"), ("query_seconds", "REAL NOT NULL"))
+
+    def __init__(
+        self,
+        path=None,
+        default_ttl=DEFAULT_TTL,
+        relative_time_ttl=RELATIVE_TIME_TTL,
+        max_size_bytes=DEFAULT_MAX_SIZE_BYTES,
+    ):
+        super().__init__(path if path is not None else default_cache_dir() / "sql_results.sqlite", max_size_bytes)
+        self.default_ttl = default_ttl
+        self.relative_time_ttl = relative_time_ttl
+
+        self._counters.update(invalidations=0, seconds_saved=0.0)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_query_key ON results (query_key)")
+
+    def get(self, query, parameters=None, api_key=None):
+        """
+        Return the cached result as a dict with "columns", "columnTypes" and
+        "values" (one list per column), or None on a miss.
+        """
+        row = self._read(self.key(query, parameters, api_key), columns=("query_seconds",))
+        if row is None:
+            return None
+
+        with self._lock:
+            self._counters["seconds_saved"] += row[1]
+        return _loads(row[0])
+
+    def set(self, query, parameters, result, query_seconds=0.0, api_key=None):
+        """
+        Store a result dict with "columns", "columnTypes" and "values".
+        query_seconds is how long the request took; every hit adds it to the
+        "seconds_saved" statistic.
+        """
+        self._write(
+            self.key(query, parameters, api_key),
+            _dumps(result),
+            self.ttl_for(query, parameters),
+            query_key=self._query_key(query, api_key),
+            query_seconds=query_seconds,
+        )
+
+    def ttl_for(self, query, parameters=None):
+        text = query + "\n" + _parameters_text(parameters)
+        if _RELATIVE_TIME_RE.search(text):
+            return min(self.default_ttl, self.relative_time_ttl)
+        return self.default_ttl
+
+    def key(self, query, parameters=None, api_key=None):
+        payload = api_key_scope(api_key) + "\n" + normalize_sql(query) + "\n" + _parameters_text(parameters)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def invalidate(self, query, parameters=None, api_key=None):
+        """
+        Drop the entry of a query and its parameters. Without parameters, the
+        entries of the query for every parameter set are dropped. Returns the
+        number of dropped entries.
+        """
+        with self._lock:
+            if parameters is None:
+                cursor = self._connection.execute("DELETE FROM results WHERE query_key = ?", (self._query_key(query, api_key),))
+            else:
+                cursor = self._connection.execute("DELETE FROM results WHERE key = ?", (self.key(query, parameters, api_key),))
+            self._counters["invalidations"] += cursor.rowcount
+        return cursor.rowcount
+
+    def _query_key(self, query, api_key):
+        payload = api_key_scope(api_key) + "\n" + normalize_sql(query)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _parameters_text(parameters):
+    return json.dumps(parameters or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _dumps(result):
+    if _use_orjson():
+        try:
+            return orjson.dumps(result)
+        except TypeError:
+            # orjson rejects integers wider than 64 bits, which the standard encoder accepts.
+            pass
+    return json.dumps(result, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(value):
+    if _use_orjson():
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(value)
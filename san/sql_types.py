@@ -0,0 +1,71 @@
+"""
+Typed columns for `runRawSqlQuery` results.
+
+The API reports the ClickHouse type of every column in `columnTypes`. Each
+column is built directly from its JSON values with the matching dtype, so
+`san.execute_sql` results need no `astype` / `to_datetime` calls afterwards:
+
+    DateTime, DateTime64, Date, Date32       -> UTC datetimes
+    Int8 ... Int64, UInt8 ... UInt32         -> int64 (Int64 with nulls)
+    UInt64                                   -> uint64 (UInt64 with nulls)
+    Float32, Float64, Decimal                -> float64 (NaN for nulls)
+    Bool                                     -> bool (boolean with nulls)
+    LowCardinality(String), Enum8, Enum16    -> category
+
+`Nullable(...)` and `LowCardinality(...)` wrappers are unwrapped. Strings,
+arrays and every other type keep the JSON values, and a column whose values
+do not parse as its type falls back to them as well.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from san.pandas_utils import parse_utc_datetimes
+
+_WRAPPER_RE = re.compile(r"^(Nullable|LowCardinality)\((.*)\)$")
+
+_DATETIME_TYPES = {"Date", "Date32", "DateTime", "DateTime64"}
+_INT_TYPES = {"Int8", "Int16", "Int32", "Int64", "UInt8", "UInt16", "UInt32"}
+_FLOAT_TYPES = {"Float32", "Float64", "Decimal", "Decimal32", "Decimal64", "Decimal128", "Decimal256"}
+_CATEGORY_TYPES = {"Enum8", "Enum16"}
+
+
+def sql_column(values, column_type):
+    """Column data for the JSON values of a ClickHouse column_type."""
+    name, low_cardinality = _base_type(column_type)
+    try:
+        if name in _DATETIME_TYPES:
+            return parse_utc_datetimes(values).rename(None)
+        if name in _INT_TYPES:
+            return _integers(values, np.int64, "Int64")
+        if name == "UInt64":
+            return _integers(values, np.uint64, "UInt64")
+        if name in _FLOAT_TYPES:
+            return np.array(values, dtype=np.float64)
+        if name == "Bool":
+            return pd.array(values, dtype="boolean") if None in values else np.array(values, dtype=bool)
+        if name in _CATEGORY_TYPES or (low_cardinality and name in ("String", "FixedString")):
+            return pd.Categorical(values)
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return values
+
+
+def _base_type(column_type):
+    """Type name without its Nullable/LowCardinality wrappers and parameters, and whether it is LowCardinality."""
+    low_cardinality = False
+    match = _WRAPPER_RE.match(column_type.strip())
+    while match:
+        low_cardinality = low_cardinality or match.group(1) == "LowCardinality"
+        column_type = match.group(2).strip()
+        match = _WRAPPER_RE.match(column_type)
+    return column_type.split("(", 1)[0], low_cardinality
+
+
+def _integers(values, dtype, nullable_dtype):
+    # 64-bit integers arrive as JSON strings, which numpy parses as well.
+    if None not in values:
+        return np.array(values, dtype=dtype)
+    return pd.array([None if value is None else int(value) for value in values], dtype=nullable_dtype)
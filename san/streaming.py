@@ -0,0 +1,245 @@
+"""
+Incremental parsing of large GraphQL responses.
+
+With `ApiConfig.stream_responses = True`, `san.get`, `san.get_many` and
+`san.execute_sql` parse the response body while it downloads. The points of
+`timeseriesDataJson`, `timeseriesDataPerSlugJson` and `runRawSqlQuery.rows`
+are decoded one at a time into StreamedColumns, so the raw body, its text and
+a list of per-point dicts are never held in memory at the same time.
+"""
+
+import codecs
+import json
+import re
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Streamed fields and the layout of their elements, found at data.<alias>.<field>.
+STREAMED_FIELDS = {
+    "timeseriesDataJson": "objects",
+    "timeseriesDataPerSlugJson": "per_slug",
+    "rows": "rows",
+}
+
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class StreamedColumns:
+    """
+    Elements of a streamed JSON array stored column by column.
+
+    "objects" arrays keep one list per key, "rows" arrays one list per position
+    and "per_slug" arrays the flat datetime/count/slug/value lists get_many
+    pivots. An element that does not fit the layout of the first one switches
+    the buffer to plain records, which `records()` always returns.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.columns = None
+        self.length = 0
+        self._records = None
+
+    @property
+    def is_columnar(self):
+        return self._records is None
+
+    def append(self, item):
+        if self._records is not None:
+            self._records.append(item)
+        elif not self._append_columns(item):
+            self._records = self.records()
+            self._records.append(item)
+            self.columns = None
+        self.length += 1
+
+    def records(self):
+        """The elements as the list the regular JSON decoder would have produced."""
+        if self._records is not None:
+            return list(self._records)
+        if self.columns is None:
+            return []
+        if self.kind == "objects":
+            keys = list(self.columns)
+            return [dict(zip(keys, values)) for values in zip(*self.columns.values())]
+        if self.kind == "rows":
+            return [list(values) for values in zip(*self.columns)]
+
+        records = []
+        position = 0
+        for datetime, count in zip(self.columns["datetime"], self.columns["count"]):
+            slugs = self.columns["slug"][position : position + count]
+            values = self.columns["value"][position : position + count]
+            records.append({"datetime": datetime, "data": [{"slug": s, "value": v} for s, v in zip(slugs, values)]})
+            position += count
+        return records
+
+    def __len__(self):
+        return self.length
+
+    def _append_columns(self, item):
+        if self.kind == "objects":
+            if not isinstance(item, dict):
+                return False
+            if self.columns is None:
+                self.columns = {key: [] for key in item}
+            if len(item) != len(self.columns) or not all(key in self.columns for key in item):
+                return False
+            for key, values in self.columns.items():
+                values.append(item[key])
+            return True
+
+        if self.kind == "rows":
+            if not isinstance(item, list):
+                return False
+            if self.columns is None:
+                self.columns = [[] for _ in item]
+            if len(item) != len(self.columns):
+                return False
+            for values, value in zip(self.columns, item):
+                values.append(value)
+            return True
+
+        try:
+            datetime = item["datetime"]
+            points = [(slug_data["slug"], slug_data["value"]) for slug_data in item["data"]]
+        except (KeyError, TypeError):
+            return False
+        if self.columns is None:
+            self.columns = {"datetime": [], "count": [], "slug": [], "value": []}
+        self.columns["datetime"].append(datetime)
+        self.columns["count"].append(len(points))
+        for slug, value in points:
+            self.columns["slug"].append(slug)
+            self.columns["value"].append(value)
+        return True
+
+
+def parse_streamed_response(chunks):
+    """
+    Parse a JSON response body from an iterable of byte chunks.
+    Streamed fields become StreamedColumns; everything else is decoded as usual.
+    Raises ValueError for invalid or truncated JSON.
+    """
+    reader = _StreamReader(chunks)
+    result = reader.parse(())
+    reader.expect_end()
+    return result
+
+
+class _StreamReader:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def parse(self, path):
+        char = self._peek()
+        if char == "{":
+            return self._parse_object(path)
+        if char == "[" and len(path) == 3 and path[0] == "data" and path[2] in STREAMED_FIELDS:
+            return self._parse_array(StreamedColumns(STREAMED_FIELDS[path[2]]))
+        return self._decode()
+
+    def expect_end(self):
+        self._skip_whitespace()
+        if self._pos < len(self._buffer):
+            raise ValueError(f"Extra data after the JSON document at position {self._pos}")
+
+    def _parse_object(self, path):
+        self._pos += 1
+        result = {}
+        if self._peek() == "}":
+            self._pos += 1
+            return result
+
+        while True:
+            key = self._decode()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key, got {key!r}")
+            self._expect(":")
+            result[key] = self.parse(path + (key,))
+            if self._next_separator("}"):
+                return result
+
+    def _parse_array(self, columns):
+        self._pos += 1
+        if self._peek() == "]":
+            self._pos += 1
+            return columns
+
+        while True:
+            columns.append(self._decode())
+            if self._next_separator("]"):
+                return columns
+
+    def _next_separator(self, closing):
+        char = self._peek()
+        self._pos += 1
+        if char == closing:
+            return True
+        if char != ",":
+            raise ValueError(f"Expected ',' or {closing!r}, got {char!r}")
+        return False
+
+    def _expect(self, expected):
+        char = self._peek()
+        if char != expected:
+            raise ValueError(f"Expected {expected!r}, got {char!r}")
+        self._pos += 1
+
+    def _decode(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Grow the buffer geometrically so a large value is not re-parsed once per chunk.
+                if not self._fill(2 * (len(self._buffer) - self._pos)):
+                    raise
+                continue
+
+            # A number ending exactly at the end of the buffer may continue in the next chunk.
+            if end == len(self._buffer) and _is_number(value) and self._fill(len(self._buffer) - self._pos + 1):
+                continue
+            self._pos = end
+            return value
+
+    def _peek(self):
+        while True:
+            self._skip_whitespace()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill(1):
+                raise ValueError("Unexpected end of the JSON response")
+
+    def _skip_whitespace(self):
+        self._pos = _WHITESPACE_RE.match(self._buffer, self._pos).end()
+
+    def _fill(self, min_length):
+        """Read chunks until at least min_length unread characters are buffered. False at the end of the body."""
+        if self._eof:
+            return False
+
+        parts = [self._buffer[self._pos :]]
+        length = len(parts[0])
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            parts.append(text)
+            length += len(text)
+            if length >= min_length:
+                break
+        else:
+            parts.append(self._decoder.decode(b"", final=True))
+            self._eof = True
+
+        self._buffer = "".join(parts)
+        self._pos = 0
+        return True
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -1,4 +1,9 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
+from san.rate_limit import RATE_LIMITER
 from san.tests.utils import TestResponse
 
 
@@ -10,3 +15,62 @@ def test_response():
         return response
 
     return _create_test_response
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter():
+    # Rate limit errors in one test must not throttle the next one.
+    RATE_LIMITER.reset()
+    yield
+    RATE_LIMITER.reset()
+
+
+@pytest.fixture
+def graphql_server(request):
+    """
+    Local GraphQL stand-in at state["url"]. The test sets state["handler"] to
+    a function mapping the call number and request body to (status, payload).
+    Speaks HTTP/1.1 with keep-alive unless parametrized indirectly with
+    another protocol version, e.g. "HTTP/1.0".
+    """
+    state = {"calls": 0, "queries": [], "ports": set(), "handler": None, "in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = getattr(request, "param", "HTTP/1.1")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", "0"))
+            body = json.loads(self.rfile.read(length))
+            with lock:
+                state["calls"] += 1
+                call = state["calls"]
+                state["queries"].append(body["query"])
+                state["ports"].add(self.client_address[1])
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+
+            status, payload = state["handler"](call, body)
+            with lock:
+                state["in_flight"] -= 1
+
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}"
+
+    yield state
+
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=1)
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("httpx")
+
+import san.aio  # noqa: E402
+from san.api_config import ApiConfig  # noqa: E402
+from san.error import SanAuthError, SanNetworkError, SanRateLimitError, SanServerError  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def restore_api_config():
+    original = (ApiConfig.request_retry_count, ApiConfig.request_backoff_factor, ApiConfig.request_timeout)
+    original_base_url = san.aio.graphql.DEFAULT_TRANSPORT.base_url
+
+    yield
+
+    ApiConfig.request_retry_count, ApiConfig.request_backoff_factor, ApiConfig.request_timeout = original
+    san.aio.graphql.DEFAULT_TRANSPORT.base_url = original_base_url
+
+
+@pytest.fixture
+def graphql_server(graphql_server):
+    san.aio.graphql.DEFAULT_TRANSPORT.base_url = graphql_server["url"]
+    return graphql_server
+
+
+def timeseries_payload(value):
+    return {"data": {"query_0": {"timeseriesDataJson": [{"datetime": "2024-01-01T00:00:00Z", "value": value}]}}}
+
+
+# The server closes every connection with HTTP/1.0 and keeps them alive with HTTP/1.1.
+@pytest.mark.parametrize("graphql_server", ["HTTP/1.0", "HTTP/1.1"], indirect=True)
+def test_aio_get_returns_same_frame_as_get(graphql_server):
+    graphql_server["handler"] = lambda call, body: (200, timeseries_payload(1.5))
+
+    df = asyncio.run(san.aio.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-02"))
+
+    assert list(df["value"]) == [1.5]
+    assert df.index[0] == pd.Timestamp("2024-01-01", tz="UTC")
+    assert 'getMetric(metric: "price_usd")' in graphql_server["queries"][0]
+
+
+def test_aio_get_many(graphql_server):
+    payload = {
+        "data": {
+            "query_0": {
+                "timeseriesDataPerSlugJson": [
+                    {"datetime": "2024-01-01T00:00:00Z", "data": [{"slug": "bitcoin", "value": 1.0}, {"slug": "ethereum", "value": 2.0}]}
+                ]
+            }
+        }
+    }
+    graphql_server["handler"] = lambda call, body: (200, payload)
+
+    df = asyncio.run(san.aio.get_many("price_usd", slugs=["bitcoin", "ethereum"], from_date="2024-01-01", to_date="2024-01-02"))
+
+    assert list(df.columns) == ["bitcoin", "ethereum"]
+
+
+def test_aio_execute_sql(graphql_server):
+    payload = {"data": {"query_0": {"columns": ["dt", "value"], "columnTypes": ["DateTime", "Float64"], "rows": [["2024-01-01", 1.0]]}}}
+    graphql_server["handler"] = lambda call, body: (200, payload)
+
+    df = asyncio.run(san.aio.execute_sql(query="SELECT dt, value FROM t", set_index="dt"))
+
+    assert list(df["value"]) == [1.0]
+
+
+def test_aio_batch_runs_concurrently_and_keeps_order(graphql_server):
+    def handler(call, body):
+        threading.Event().wait(0.05)
+        return 200, timeseries_payload(float(body["variables"]["slug_0"].split("_")[1]))
+
+    graphql_server["handler"] = handler
+
+    batch = san.aio.Batch()
+    for i in range(20):
+        batch.get("price_usd", slug=f"slug_{i}", from_date="2024-01-01", to_date="2024-01-02")
+    result = asyncio.run(batch.execute(max_concurrency=10))
+
+    assert [df["value"].iloc[0] for df in result] == [float(i) for i in range(20)]
+    assert 1 < graphql_server["max_in_flight"] <= 10
+
+
+def test_aio_retries_on_server_errors(graphql_server):
+    ApiConfig.request_retry_count = 3
+    ApiConfig.request_backoff_factor = 0
+    graphql_server["handler"] = lambda call, body: (503, {"errors": {"details": "unavailable"}}) if call < 3 else (
+        200,
+        timeseries_payload(1.0),
+    )
+
+    df = asyncio.run(san.aio.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-02"))
+
+    assert graphql_server["calls"] == 3
+    assert len(df) == 1
+
+
+def test_aio_raises_server_error_after_retries(graphql_server):
+    ApiConfig.request_retry_count = 1
+    ApiConfig.request_backoff_factor = 0
+    graphql_server["handler"] = lambda call, body: (503, {"errors": {"details": "unavailable"}})
+
+    with pytest.raises(SanServerError):
+        asyncio.run(san.aio.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-02"))
+    assert graphql_server["calls"] == 2
+
+
+@pytest.mark.parametrize(
+    ("status_code", "payload", "expected_error"),
+    [
+        (401, {"errors": {"details": "Unauthorized"}}, SanAuthError),
+        (429, {"errors": {"details": "API Rate Limit Reached. Try again in 5 seconds"}}, SanRateLimitError),
+    ],
+)
+def test_aio_maps_http_errors(graphql_server, status_code, payload, expected_error):
+    graphql_server["handler"] = lambda call, body: (status_code, payload)
+
+    with pytest.raises(expected_error):
+        asyncio.run(san.aio.execute_gql("{ query_0: projectsAll { slug } }"))
+    assert graphql_server["calls"] == 1
+
+
+def test_aio_maps_connection_errors():
+    ApiConfig.request_retry_count = 0
+    san.aio.graphql.DEFAULT_TRANSPORT.base_url = "http://127.0.0.1:9"
+
+    with pytest.raises(SanNetworkError):
+        asyncio.run(san.aio.execute_gql("{ query_0: projectsAll { slug } }"))
@@ -0,0 +1,153 @@
+import sys
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+import san
+from san.error import SanError
+from san.execute_sql import transform_sql_result
+from san.streaming import parse_streamed_response
+from san.transform import transform_timeseries_data_per_slug_query_result, transform_timeseries_data_query_result
+
+
+@pytest.fixture
+def pa():
+    return pytest.importorskip("pyarrow")
+
+
+def timeseries_payload(values, start_day=1):
+    points = [{"datetime": f"2024-01-{start_day + i:02d}T00:00:00Z", "value": value} for i, value in enumerate(values)]
+    return {"query_0": {"timeseriesDataJson": points}}
+
+
+def test_as_arrow_without_pyarrow_raises_san_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(SanError, match="sanpy\\[arrow\\]"):
+        transform_timeseries_data_query_result(0, "price_usd", timeseries_payload([1.0]), as_arrow=True)
+
+
+def test_timeseries_table_matches_frame(pa):
+    data = timeseries_payload([1.5, None, 3.0])
+
+    table = transform_timeseries_data_query_result(0, "price_usd", data, as_arrow=True)
+    frame = transform_timeseries_data_query_result(0, "price_usd", data)
+
+    assert table.column_names == ["datetime", "value"]
+    assert table.schema.field("datetime").type == pa.timestamp("us", tz="UTC")
+    assert table["value"].to_pylist() == [1.5, None, 3.0]
+    assert list(table["datetime"].to_pandas()) == list(frame.index)
+
+
+@pytest.mark.usefixtures("pa")
+def test_streamed_timeseries_table():
+    body = b'{"data": {"query_0": {"timeseriesDataJson": [{"datetime": "2024-01-01T00:00:00Z", "value": 2}]}}}'
+    data = parse_streamed_response([body[:30], body[30:]])["data"]
+
+    table = transform_timeseries_data_query_result(0, "price_usd", data, as_arrow=True)
+    assert table.to_pylist()[0]["value"] == 2
+
+
+@pytest.mark.usefixtures("pa")
+def test_per_slug_table_is_long():
+    data = {
+        "query_0": {
+            "timeseriesDataPerSlugJson": [
+                {"datetime": "2024-01-01T00:00:00Z", "data": [{"slug": "bitcoin", "value": 1.0}, {"slug": "ethereum", "value": 2.0}]},
+                {"datetime": "2024-01-02T00:00:00Z", "data": [{"slug": "bitcoin", "value": 3.0}]},
+            ]
+        }
+    }
+
+    table = transform_timeseries_data_per_slug_query_result(0, "price_usd", data, as_arrow=True)
+
+    assert table.column_names == ["datetime", "slug", "value"]
+    assert table["slug"].to_pylist() == ["bitcoin", "ethereum", "bitcoin"]
+    assert table["datetime"].to_pylist()[1] == table["datetime"].to_pylist()[0]
+
+
+@pytest.mark.usefixtures("pa")
+def test_sql_table_keeps_duplicate_columns():
+    response = {"query_0": {"columns": ["dt", "value", "value"], "rows": [["2024-01-01", 1, 2.5], ["2024-01-02", 3, 4.5]]}}
+
+    table = transform_sql_result(response, 0, as_arrow=True)
+
+    assert table.column_names == ["dt", "value", "value"]
+    assert table.column(2).to_pylist() == [2.5, 4.5]
+    with pytest.raises(SanError):
+        transform_sql_result(response, 0, as_arrow=True, set_index="dt")
+
+
+def test_sql_table_uses_column_types(pa):
+    response = {
+        "query_0": {
+            "columns": ["dt", "asset", "value"],
+            "columnTypes": ["DateTime", "LowCardinality(String)", "Nullable(UInt32)"],
+            "rows": [["2024-01-01T00:00:00Z", "bitcoin", 1], ["2024-01-02T00:00:00Z", "bitcoin", None]],
+        }
+    }
+
+    table = transform_sql_result(response, 0, as_arrow=True)
+
+    assert pa.types.is_timestamp(table.schema.field("dt").type)
+    assert pa.types.is_dictionary(table.schema.field("asset").type)
+    assert table["value"].to_pylist() == [1, None]
+
+
+def test_chunked_get_as_arrow_merges_windows(test_response, pa):
+    # The second window repeats the boundary day and holds integer values only.
+    responses = iter(
+        [
+            test_response(status_code=200, data=timeseries_payload([1.5, 2.5])),
+            test_response(status_code=200, data=timeseries_payload([7, 8], start_day=2)),
+        ]
+    )
+
+    with patch("san.transport.requests.Session.post", side_effect=lambda *args, **kwargs: next(responses)):
+        san.ApiConfig.chunk_max_workers, workers = 1, san.ApiConfig.chunk_max_workers
+        try:
+            table = san.get(
+                "price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-03", chunk_size="2d", as_arrow=True
+            )
+        finally:
+            san.ApiConfig.chunk_max_workers = workers
+
+    assert table["value"].type == pa.float64()
+    assert table["value"].to_pylist() == [1.5, 7.0, 8.0]
+
+
+def test_cli_writes_parquet_and_arrow(tmp_path, pa):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from san.cli import app
+
+    runner = CliRunner(mix_stderr=False)
+    table = pa.table({"datetime": pa.array([pd.Timestamp("2024-01-01", tz="UTC")]), "value": [1.0]})
+
+    with patch("san.get", return_value=table) as mock_get:
+        result = runner.invoke(app, ["get", "price_usd", "--slug", "bitcoin", "-f", "parquet", "-o", str(tmp_path / "out.parquet")])
+        assert result.exit_code == 0, result.stderr
+        assert mock_get.call_args.kwargs["as_arrow"] is True
+        assert pq.read_table(tmp_path / "out.parquet").equals(table)
+
+        result = runner.invoke(app, ["get", "price_usd", "--slug", "bitcoin", "-f", "arrow"])
+        assert result.exit_code == 0, result.stderr
+        assert pa.ipc.open_stream(result.stdout_bytes).read_all().equals(table)
+
+        result = runner.invoke(app, ["get", "price_usd", "--slug", "bitcoin", "-f", "csv", "-o", "out.csv"])
+        assert result.exit_code != 0
+
+
+def test_cli_fetch_writes_arrow_files(tmp_path, pa):
+    from san.cli import app
+
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text('[{"metric": "price_usd", "slug": "bitcoin", "from_date": "2024-01-01", "to_date": "2024-01-02"}]')
+
+    with patch("san.cli_fetch.execute_gql", return_value=timeseries_payload([1, 2])):
+        result = CliRunner(mix_stderr=False).invoke(app, ["fetch", str(manifest), "--out", str(tmp_path / "out"), "-f", "arrow"])
+
+    assert result.exit_code == 0, result.stderr
+    table = pa.ipc.open_file(str(tmp_path / "out" / "price_usd__bitcoin__1d.arrow")).read_all()
+    assert table["value"].to_pylist() == [1, 2]
@@ -1,10 +1,12 @@
+import importlib
+import re
 from san import Batch
 from unittest.mock import patch
 from san.pandas_utils import convert_to_datetime_idx_df
 import pandas.testing as pdt
 import pytest
 
-from san.error import SanGraphqlQueryError
+from san.error import SanError, SanGraphqlQueryError
 
 
 @patch("san.transport.requests.Session.post")
@@ -78,3 +80,82 @@ def test_batch_raises_on_partial_graphql_failure(mock, test_response):
 
     with pytest.raises(SanGraphqlQueryError):
         batch.execute()
+
+
+@patch("san.transport.requests.Session.post")
+def test_batch_splits_documents_by_complexity(mock, test_response):
+    complexities = {"price_usd": 600, "daily_active_addresses": 300, "volume_usd": 500}
+    documents = []
+
+    def respond(url, json, **kwargs):
+        query = json["query"]
+        aliases = re.findall(r"(query_\d+): getMetric\(metric: \"(\w+)\"", query.replace(" (", "("))
+        if "timeseriesDataComplexity" in query:
+            data = {alias: {"timeseriesDataComplexity": complexities[metric]} for alias, metric in aliases}
+        else:
+            documents.append(sorted(alias for alias, _ in aliases))
+            data = {
+                alias: {"timeseriesDataJson": [{"datetime": "2020-01-01T00:00:00Z", "value": int(alias.split("_")[1])}]}
+                for alias, _ in aliases
+            }
+        return test_response(status_code=200, data=data)
+
+    mock.side_effect = respond
+
+    batch = Batch()
+    for metric in ["price_usd", "daily_active_addresses", "volume_usd", "daily_active_addresses"]:
+        batch.get(f"{metric}/santiment", from_date="2020-01-01", to_date="2020-01-02", interval="1d")
+
+    result = batch.execute(max_complexity=1000)
+
+    assert [df["value"].iloc[0] for df in result] == [0, 1, 2, 3]
+    assert sorted(documents) == [["query_0", "query_1"], ["query_2", "query_3"]]
+
+    # Complexities are cached, so a second run only sends the data documents.
+    calls = mock.call_count
+    batch.execute(max_complexity=1000)
+    assert mock.call_count == calls + 2
+
+
+@patch("san.transport.requests.Session.post")
+def test_batch_rejects_non_positive_max_complexity(mock):
+    batch = Batch()
+    batch.get("price_usd/santiment")
+
+    for max_complexity in [0, -100]:
+        with pytest.raises(SanError, match="max_complexity must be positive"):
+            batch.execute(max_complexity=max_complexity)
+    mock.assert_not_called()
+
+
+@patch("san.transport.requests.Session.post")
+def test_batch_default_range_complexity_is_cached(mock, test_response, monkeypatch):
+    # san.metric_complexity is also the name of the function exported by san.
+    complexity_module = importlib.import_module("san.metric_complexity")
+    monkeypatch.setattr(complexity_module, "_COMPLEXITY_CACHE_SIZE", 2)
+    complexity_queries = []
+
+    def respond(url, json, **kwargs):
+        aliases = re.findall(r"(query_\d+): getMetric", json["query"].replace(" :", ":"))
+        if "timeseriesDataComplexity" in json["query"]:
+            complexity_queries.append(json["query"])
+            data = {alias: {"timeseriesDataComplexity": 10} for alias in aliases}
+        else:
+            data = {alias: {"timeseriesDataJson": []} for alias in aliases}
+        return test_response(status_code=200, data=data)
+
+    mock.side_effect = respond
+
+    batch = Batch()
+    batch.get("network_growth/santiment")
+    batch.get("network_growth/bitcoin")
+    batch.execute(max_complexity=1000)
+    batch.execute(max_complexity=1000)
+
+    assert len(complexity_queries) == 1
+    assert 'from: "utc_now-365d"' in complexity_queries[0]
+
+    complexity_module.metric_complexities(
+        [("network_growth", "2020-01-01", "2020-02-01", "1d"), ("network_growth", "2021-01-01", "2021-02-01", "1d")]
+    )
+    assert len(complexity_module._COMPLEXITY_CACHE) == 2
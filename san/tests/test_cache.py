@@ -0,0 +1,148 @@
+from copy import deepcopy
+from unittest.mock import patch
+
+import pytest
+
+import san
+from san.api_config import ApiConfig
+from san.cache import ResponseCache, normalize_query
+from san.error import SanGraphqlQueryError
+
+PRICE_QUERY = """{
+    query_0: getMetric(metric: "price_usd"){
+        timeseriesDataJson(
+            slug:"bitcoin"
+            from: "2024-01-01T00:00:00+00:00"
+            to: "2024-01-02T23:59:59+00:00"
+            interval: "1d"
+            aggregation: null
+            includeIncompleteData: false
+        )
+    }
+}"""
+
+PRICE_RESULT = {"query_0": {"timeseriesDataJson": [{"datetime": "2024-01-01T00:00:00Z", "value": 42000.0}]}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(path=tmp_path / "responses.sqlite")
+    original_cache, original_api_key = ApiConfig.cache, ApiConfig.api_key
+    ApiConfig.cache = cache
+
+    yield cache
+
+    ApiConfig.cache, ApiConfig.api_key = original_cache, original_api_key
+    cache.close()
+
+
+@patch("san.transport.requests.Session.post")
+def test_execute_gql_serves_repeated_queries_from_cache(mock, cache, test_response):
+    mock.return_value = test_response(status_code=200, data=deepcopy(PRICE_RESULT))
+
+    first = san.graphql.execute_gql(PRICE_QUERY)
+    second = san.graphql.execute_gql(PRICE_QUERY)
+
+    assert first == second == PRICE_RESULT
+    assert mock.call_count == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+@patch("san.transport.requests.Session.post")
+def test_cache_ignores_formatting_differences(mock, cache, test_response):
+    mock.return_value = test_response(status_code=200, data=deepcopy(PRICE_RESULT))
+
+    san.graphql.execute_gql(PRICE_QUERY)
+    san.graphql.execute_gql(normalize_query(PRICE_QUERY))
+
+    assert mock.call_count == 1
+
+
+def test_normalize_query_preserves_string_literals():
+    assert normalize_query('{ a(text: "x   y")\n  { b } }') == '{ a(text: "x   y") { b } }'
+
+
+@patch("san.transport.requests.Session.post")
+def test_cache_is_scoped_by_api_key(mock, cache, test_response):
+    mock.return_value = test_response(status_code=200, data=deepcopy(PRICE_RESULT))
+
+    ApiConfig.api_key = "first_key"
+    san.graphql.execute_gql(PRICE_QUERY)
+    ApiConfig.api_key = "second_key"
+    san.graphql.execute_gql(PRICE_QUERY)
+
+    assert mock.call_count == 2
+
+
+@patch("san.transport.requests.Session.post")
+def test_cache_does_not_store_errors(mock, cache, test_response):
+    mock.return_value = test_response(status_code=200, data={"errors": [{"message": "Unknown field"}]})
+
+    for _ in range(2):
+        with pytest.raises(SanGraphqlQueryError):
+            san.graphql.execute_gql(PRICE_QUERY)
+
+    assert mock.call_count == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_entries_expire(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("san.cache.time.time", lambda: now[0])
+
+    cache.set(PRICE_QUERY, PRICE_RESULT)
+    assert cache.get(PRICE_QUERY) == PRICE_RESULT
+
+    now[0] += cache.default_ttl + 1
+    assert cache.get(PRICE_QUERY) is None
+
+
+def test_ttl_rules(cache):
+    cache.metric_ttls = {"price_usd": 600}
+
+    assert cache.ttl_for(PRICE_QUERY) == 600
+    assert cache.ttl_for(PRICE_QUERY.replace("2024-01-01T00:00:00+00:00", "utc_now-30d")) == cache.relative_date_ttl
+    assert cache.ttl_for(PRICE_QUERY.replace("includeIncompleteData: false", "includeIncompleteData: true")) == (
+        cache.incomplete_data_ttl
+    )
+    assert cache.ttl_for('{ query_0: historicalBalance(slug: "santiment") { balance } }') == cache.default_ttl
+
+
+def test_account_queries_are_not_cached(cache):
+    query = san.sanbase_graphql.get_api_calls_made()
+    cache.set(query, {"currentUser": {"apiCallsHistory": []}})
+
+    assert cache.get(query) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("san.cache.time.time", lambda: now[0])
+    cache = ResponseCache(path=tmp_path / "small.sqlite", max_size_bytes=250)
+
+    for slug in ["bitcoin", "ethereum", "santiment"]:
+        now[0] += 1
+        query = PRICE_QUERY.replace("bitcoin", slug)
+        cache.set(query, {"query_0": {"timeseriesDataJson": [{"datetime": "2024-01-01T00:00:00Z", "value": 1.0}] * 2}})
+
+    stats = cache.stats()
+    assert stats["size_bytes"] <= 250
+    assert stats["evictions"] >= 1
+    assert cache.get(PRICE_QUERY.replace("bitcoin", "santiment")) is not None
+    assert cache.get(PRICE_QUERY) is None
+    cache.close()
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    first = ResponseCache(path=path)
+    first.set(PRICE_QUERY, PRICE_RESULT)
+    first.close()
+
+    second = ResponseCache(path=path)
+    assert second.get(PRICE_QUERY) == PRICE_RESULT
+    second.close()
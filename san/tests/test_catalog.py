@@ -0,0 +1,117 @@
+import re
+import threading
+
+import pytest
+
+import san
+from san.api_config import ApiConfig
+from san.catalog import MetricCatalog
+from san.error import SanEmptyResultError, SanGraphqlQueryError, SanPartialResultWarning
+
+_FIELD_RE = re.compile(r'(q_\d+): (\w+)(?:\((\w+): "([^"]*)"\))?(.*)')
+
+
+class FakeApi:
+    """Answer aliased catalog documents; documents mentioning an unknown slug fail as a whole."""
+
+    def __init__(self):
+        self.documents = []
+        self.lock = threading.Lock()
+
+    def __call__(self, document):
+        with self.lock:
+            self.documents.append(document)
+        data = {}
+        for alias, field, argument, value, selection in _FIELD_RE.findall(document):
+            if value == "unknown":
+                raise SanGraphqlQueryError("Project with slug unknown not found")
+            if field == "getAvailableMetrics":
+                data[alias] = ["price_usd", "daily_active_addresses"]
+            elif field == "projectBySlug":
+                data[alias] = {"availableMetrics": ["price_usd"] if value.startswith("slug") else ["price_usd", "dev_activity"]}
+            elif "availableSince" in selection:
+                slug = re.search(r'slug: "([^"]*)"', selection).group(1)
+                data[alias] = {"availableSince": f"2020-01-01T00:00:00Z/{slug}"}
+            else:
+                metadata = {"availableVersions": [{"version": "1.0"}], "defaultAggregation": "AVG", "humanReadableName": value}
+                fields = re.findall(r"\b(availableVersions|defaultAggregation|humanReadableName|isAccessible|canMutate)\b", selection)
+                data[alias] = {"metadata": {field: metadata.get(field, True) for field in fields}}
+        return data
+
+
+@pytest.fixture
+def api(monkeypatch):
+    fake = FakeApi()
+    monkeypatch.setattr("san.catalog.execute_gql", fake)
+    monkeypatch.setattr(ApiConfig, "catalog", None)
+    return fake
+
+
+def test_load_batches_requests_and_answers_from_memory(api, tmp_path):
+    catalog = MetricCatalog(path=tmp_path / "catalog.json", batch_size=100)
+    slugs = [f"slug-{i}" for i in range(250)]
+    catalog.load(slugs=slugs, metrics=["price_usd", "dev_activity"], available_since=True)
+
+    # One metric list, three slug batches, one metadata batch and three availableSince batches.
+    assert len(api.documents) == 8
+
+    san.ApiConfig.catalog = catalog
+    assert san.available_metrics_for_slug("slug-7") == ["price_usd"]
+    assert san.available_metric_for_slug_since("price_usd", "slug-7") == "2020-01-01T00:00:00Z/slug-7"
+    assert san.available_metric_versions("dev_activity") == ["1.0"]
+    assert san.metadata("price_usd", ["defaultAggregation"]) == {"defaultAggregation": "AVG"}
+    assert "daily_active_addresses" in san.available_metrics()
+    assert len(api.documents) == 8
+
+    # Fields that were not loaded are fetched and kept.
+    assert san.metadata("price_usd", ["canMutate"]) == {"canMutate": True}
+    assert san.metadata("price_usd", ["canMutate", "humanReadableName"])["humanReadableName"] == "price_usd"
+    assert len(api.documents) == 9
+
+
+def test_catalog_persists_and_expires(api, tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("san.catalog.time.time", lambda: now[0])
+    MetricCatalog(path=tmp_path / "catalog.json").load(slugs=["bitcoin"])
+    requests = len(api.documents)
+
+    catalog = MetricCatalog(path=tmp_path / "catalog.json", max_age=60)
+    assert catalog.available_metrics_for_slug("bitcoin") == ["price_usd", "dev_activity"]
+    assert len(api.documents) == requests
+
+    now[0] += 61
+    catalog.available_metrics_for_slug("bitcoin")
+    assert len(api.documents) == requests + 1
+    assert catalog.stats()["slug_metrics"] == 1
+
+    # Another API key has its own entries.
+    monkeypatch.setattr(ApiConfig, "api_key", "other-key")
+    catalog.available_metrics_for_slug("bitcoin")
+    assert len(api.documents) == requests + 2
+
+
+def test_load_leaves_out_rejected_items(api, tmp_path):
+    catalog = MetricCatalog(path=tmp_path / "catalog.json", batch_size=4)
+
+    with pytest.warns(SanPartialResultWarning, match="unknown"):
+        catalog.load(slugs=["bitcoin", "ethereum", "unknown", "santiment"])
+
+    assert catalog.stats()["slug_metrics"] == 3
+    with pytest.raises(SanGraphqlQueryError):
+        catalog.available_metrics_for_slug("unknown")
+
+
+def test_load_keeps_all_null_results(api, tmp_path, monkeypatch):
+    def all_null(document):
+        api.documents.append(document)
+        raise SanEmptyResultError("Empty result")
+
+    monkeypatch.setattr("san.catalog.execute_gql", all_null)
+    catalog = MetricCatalog(path=tmp_path / "catalog.json")
+    catalog.load(slugs=["bitcoin"], metrics=["price_usd"])
+
+    assert catalog.available_metrics_for_slug("bitcoin") == []
+    assert catalog.metadata("price_usd", ["defaultAggregation"]) == {"defaultAggregation": None}
+    assert len(api.documents) == 3
+    stats = MetricCatalog(path=tmp_path / "catalog.json").stats()
+    assert (stats["metrics"], stats["slug_metrics"], stats["metadata"]) == (1, 1, 1)
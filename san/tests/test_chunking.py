@@ -0,0 +1,194 @@
+import datetime
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import san
+from san.api_config import ApiConfig
+from san.chunking import chunk_windows, shard_slugs
+from san.error import SanError, SanResponseSizeLimitError
+from san.tests.utils import TestResponse
+
+
+@pytest.fixture(autouse=True)
+def restore_api_config():
+    original = (ApiConfig.chunk_max_points, ApiConfig.chunk_max_workers, ApiConfig.chunk_max_splits, ApiConfig.shard_max_points)
+    yield
+    ApiConfig.chunk_max_points, ApiConfig.chunk_max_workers, ApiConfig.chunk_max_splits, ApiConfig.shard_max_points = original
+
+
+def fake_hourly_api(requests_log, max_points=None, per_slug=False):
+    """Return one point per hour in [from, to]; answer with a 429 size limit error above max_points."""
+    lock = threading.Lock()
+
+    def post(*args, **kwargs):
+        variables = kwargs["json"]["variables"]
+        from_date, to_date = variables["from_0"], variables["to_0"]
+        hours = pd.date_range(pd.Timestamp(from_date).ceil("h"), pd.Timestamp(to_date), freq="h")
+        with lock:
+            requests_log.append((pd.Timestamp(from_date), pd.Timestamp(to_date), len(hours)))
+
+        response = TestResponse()
+        if max_points is not None and len(hours) > max_points:
+            response.setup(status_code=429, data={"errors": {"details": "Response size limit exceeded"}})
+            return response
+
+        points = [(hour.strftime("%Y-%m-%dT%H:%M:%SZ"), float(hour.value // 10**9)) for hour in hours]
+        if per_slug:
+            data = [{"datetime": dt, "data": [{"slug": "bitcoin", "value": v}, {"slug": "ethereum", "value": -v}]} for dt, v in points]
+            response.setup(status_code=200, data={"query_0": {"timeseriesDataPerSlugJson": data}})
+        else:
+            data = [{"datetime": dt, "value": v} for dt, v in points]
+            response.setup(status_code=200, data={"query_0": {"timeseriesDataJson": data}})
+        return response
+
+    return post
+
+
+def test_chunk_windows_cover_range_with_shared_boundaries():
+    windows = chunk_windows("2024-01-01", "2024-01-10", "1d", "3d")
+
+    assert windows[0][0] == datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    assert windows[-1][1] == datetime.datetime(2024, 1, 10, 23, 59, 59, tzinfo=datetime.timezone.utc)
+    assert all(previous[1] == current[0] for previous, current in zip(windows, windows[1:]))
+    assert len(windows) == 4
+
+
+def test_auto_chunk_windows_are_sized_by_points_and_slugs():
+    ApiConfig.chunk_max_points = 240
+
+    assert len(chunk_windows("2024-01-01", "2024-01-30", "1h", "auto")) == 3
+    assert len(chunk_windows("2024-01-01", "2024-01-30", "1h", "auto", series_count=2)) == 6
+
+
+def test_chunk_windows_reject_invalid_chunk_size():
+    with pytest.raises(SanError):
+        chunk_windows("2024-01-01", "2024-01-10", "1d", 5)
+
+
+def test_get_chunked_matches_single_request():
+    requests_log = []
+    with patch("san.transport.requests.Session.post", side_effect=fake_hourly_api(requests_log)):
+        full = san.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-10", interval="1h")
+        chunked = san.get(
+            "price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-10", interval="1h", chunk_size="2d"
+        )
+
+    assert len(requests_log) == 1 + 5
+    pd.testing.assert_frame_equal(chunked, full)
+
+
+def test_get_chunked_splits_only_the_failing_window():
+    ApiConfig.chunk_max_workers = 1
+    requests_log = []
+    with patch("san.transport.requests.Session.post", side_effect=fake_hourly_api(requests_log, max_points=50)):
+        result = san.get(
+            "price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-06T23:00:00Z", interval="1h", chunk_size="3d"
+        )
+
+    assert len(result) == 6 * 24
+    assert result.index.is_monotonic_increasing
+    # Both 3 day windows were rejected and each was retried as two halves.
+    assert [points > 50 for _, _, points in requests_log] == [True, False, False, True, False, False]
+
+
+def test_get_chunked_raises_when_window_cannot_be_split():
+    ApiConfig.chunk_max_splits = 1
+    requests_log = []
+    with patch("san.transport.requests.Session.post", side_effect=fake_hourly_api(requests_log, max_points=10)):
+        with pytest.raises(SanResponseSizeLimitError):
+            san.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-03", interval="1h", chunk_size="2d")
+
+
+def test_get_many_chunked():
+    requests_log = []
+    with patch("san.transport.requests.Session.post", side_effect=fake_hourly_api(requests_log, per_slug=True)):
+        result = san.get_many(
+            "price_usd",
+            slugs=["bitcoin", "ethereum"],
+            from_date="2024-01-01",
+            to_date="2024-01-04",
+            interval="1h",
+            chunk_size="1d",
+        )
+
+    assert len(requests_log) == 4
+    assert list(result.columns) == ["bitcoin", "ethereum"]
+    assert len(result) == 4 * 24
+    assert not result.index.duplicated().any()
+
+
+def fake_daily_per_slug_api(requests_log, max_slugs=None):
+    """Return one point per day and requested slug; answer with a 429 size limit error above max_slugs."""
+    lock = threading.Lock()
+
+    def post(*args, **kwargs):
+        variables = kwargs["json"]["variables"]
+        slugs = variables["selector_0"]["slugs"]
+        days = pd.date_range(pd.Timestamp(variables["from_0"]).ceil("D"), pd.Timestamp(variables["to_0"]), freq="D")
+        with lock:
+            requests_log.append(slugs)
+
+        response = TestResponse()
+        if max_slugs is not None and len(slugs) > max_slugs:
+            response.setup(status_code=429, data={"errors": {"details": "Response size limit exceeded"}})
+            return response
+
+        data = [
+            {"datetime": day.strftime("%Y-%m-%dT%H:%M:%SZ"), "data": [{"slug": slug, "value": float(i)} for i, slug in enumerate(slugs)]}
+            for day in days
+        ]
+        response.setup(status_code=200, data={"query_0": {"timeseriesDataPerSlugJson": data}})
+        return response
+
+    return post
+
+
+def test_shard_slugs_are_sized_by_points():
+    ApiConfig.shard_max_points = 25
+    slugs = [f"slug-{i}" for i in range(12)]
+
+    # 10 daily points per slug leave room for 2 slugs per shard.
+    shards = shard_slugs(slugs, "auto", "2024-01-01", "2024-01-10", "1d")
+    assert [len(shard) for shard in shards] == [2] * 6
+    assert [slug for shard in shards for slug in shard] == slugs
+    assert [len(shard) for shard in shard_slugs(slugs, 5, "2024-01-01", "2024-01-10", "1d")] == [5, 5, 2]
+    with pytest.raises(SanError, match="shard_size"):
+        shard_slugs(slugs, 0, "2024-01-01", "2024-01-10", "1d")
+
+
+def test_get_many_sharded_matches_single_request():
+    ApiConfig.shard_max_points = 30
+    slugs = [f"slug-{i}" for i in range(7)]
+    kwargs = dict(slugs=slugs, from_date="2024-01-01", to_date="2024-01-10", interval="1d")
+
+    requests_log = []
+    with patch("san.transport.requests.Session.post", side_effect=fake_daily_per_slug_api(requests_log)):
+        single = san.get_many("price_usd", shard_size=None, **kwargs)
+        sharded = san.get_many("price_usd", **kwargs)
+        long_frame = san.get_many("price_usd", long_format=True, **kwargs)
+
+    assert sorted(len(shard) for shard in requests_log[1:4]) == [1, 3, 3]
+    assert list(sharded.columns) == slugs
+    # Values depend on the position in the request, so compare the layout only.
+    assert sharded.index.equals(single.index)
+    assert sharded.notna().all().all()
+    assert list(long_frame["slug"].iloc[:7]) == slugs
+
+
+def test_get_many_retries_only_failed_shards():
+    slugs = [f"slug-{i}" for i in range(6)]
+    requests_log = []
+    with patch("san.transport.requests.Session.post", side_effect=fake_daily_per_slug_api(requests_log, max_slugs=2)):
+        result = san.get_many("price_usd", slugs=slugs, from_date="2024-01-01", to_date="2024-01-03", shard_size=3)
+
+    assert list(result.columns) == slugs
+    # Both shards of 3 were rejected and each was retried as shards of 1 and 2 slugs.
+    assert sorted(len(shard) for shard in requests_log) == [1, 1, 2, 2, 3, 3]
+
+
+def test_batch_rejects_chunk_size():
+    with pytest.raises(SanError, match="chunk_size"):
+        san.Batch().get("price_usd/bitcoin", chunk_size="auto")
@@ -5,12 +5,17 @@ These tests mock API responses and test CLI behavior.
 """
 
 import json
+import os
+import re
+import subprocess
+import sys
 import pytest
 from unittest.mock import patch
 from typer.testing import CliRunner
 import pandas as pd
 
 from san.cli import app
+from san.error import SanError
 
 
 runner = CliRunner(mix_stderr=False)
@@ -567,3 +572,267 @@ def test_timeout_shown_in_help():
     result = runner.invoke(app, ["--help"])
     assert result.exit_code == 0
     assert "--timeout" in result.stdout
+
+
+# =============================================================================
+# Streaming Output Tests
+# =============================================================================
+
+
+def _daily_frame(start, end, column="value"):
+    index = pd.date_range(start, end, freq="D", tz="UTC", name="datetime")
+    return pd.DataFrame({column: range(len(index))}, index=index)
+
+
+@patch("san.get_many")
+def test_get_many_ndjson_format(mock_get_many):
+    """Test get-many writes one JSON record per line."""
+    mock_get_many.return_value = pd.DataFrame(
+        {"bitcoin": [100.0, 101.0], "ethereum": [50.0, 51.0]},
+        index=pd.to_datetime(["2024-01-01", "2024-01-02"], utc=True).rename("datetime"),
+    )
+
+    result = runner.invoke(app, ["get-many", "price_usd", "--slugs", "bitcoin,ethereum", "-f", "ndjson"])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [record["bitcoin"] for record in records] == [100.0, 101.0]
+    assert records[0]["datetime"].startswith("2024-01-01")
+
+
+@patch("san.get")
+def test_get_chunked_csv_writes_each_window(mock_get):
+    """Test --chunk-size fetches windows and writes them without repeating the shared boundary row."""
+    mock_get.side_effect = lambda metric, **kwargs: _daily_frame(kwargs["from_date"][:10], kwargs["to_date"][:10])
+
+    result = runner.invoke(
+        app, ["get", "price_usd", "--slug", "bitcoin", "--from", "2024-01-01", "--to", "2024-01-09",
+              "--chunk-size", "3d", "-f", "csv"]
+    )
+    assert result.exit_code == 0, result.stderr
+    assert mock_get.call_count > 1
+    lines = result.stdout.splitlines()
+    assert lines[0] == "datetime,value"
+    assert len(lines) == 1 + 9
+
+
+@patch("san.get")
+def test_get_chunked_json_skips_shared_boundaries(mock_get):
+    """Test --chunk-size with JSON output has one record per day despite windows sharing boundaries."""
+    mock_get.side_effect = lambda metric, **kwargs: _daily_frame(kwargs["from_date"][:10], kwargs["to_date"][:10])
+
+    result = runner.invoke(
+        app, ["get", "price_usd", "--slug", "bitcoin", "--from", "2024-01-01", "--to", "2024-01-09",
+              "--chunk-size", "3d", "-f", "json"]
+    )
+    assert result.exit_code == 0, result.stderr
+    assert mock_get.call_count > 1
+    dates = [record["datetime"][:10] for record in json.loads(result.stdout)]
+    assert dates == [f"2024-01-0{day}" for day in range(1, 10)]
+
+
+def test_write_frames_streams_before_later_frames(capsys):
+    """Test CSV rows of a frame are written before the next frame is produced."""
+    from san.cli_formatters import write_frames
+
+    def frames():
+        yield _daily_frame("2024-01-01", "2024-01-02")
+        assert "2024-01-02" in capsys.readouterr().out
+        yield _daily_frame("2024-01-02", "2024-01-03")
+
+    write_frames(frames(), "csv")
+    assert capsys.readouterr().out.splitlines() == ["2024-01-03 00:00:00+00:00,1"]
+
+
+def test_write_frames_csv_keeps_the_first_header(capsys):
+    """Test later CSV chunks are written in the column order of the header, with missing columns left empty."""
+    from san.cli_formatters import write_frames
+
+    first = _daily_frame("2024-01-01", "2024-01-01", column="bitcoin").assign(ethereum=3.0)
+    second = _daily_frame("2024-01-02", "2024-01-02", column="ethereum").assign(bitcoin=6.0)
+    third = _daily_frame("2024-01-03", "2024-01-03", column="bitcoin")
+
+    write_frames([first, second, third], "csv")
+    assert capsys.readouterr().out.splitlines() == [
+        "datetime,bitcoin,ethereum",
+        "2024-01-01 00:00:00+00:00,0,3.0",
+        "2024-01-02 00:00:00+00:00,6.0,0",
+        "2024-01-03 00:00:00+00:00,0,",
+    ]
+
+
+def test_write_frames_csv_rejects_new_columns():
+    """Test a CSV chunk with columns the header does not have raises."""
+    from san.cli_formatters import write_frames
+
+    frames = [_daily_frame("2024-01-01", "2024-01-01", column="bitcoin"), _daily_frame("2024-01-02", "2024-01-02", column="solana")]
+    with pytest.raises(SanError, match="solana"):
+        write_frames(frames, "csv")
+
+
+@patch("san.get")
+def test_get_table_format_prints_the_whole_table(mock_get):
+    """Test the table format without --chunk-size prints every row."""
+    mock_get.return_value = _daily_frame("2020-01-01", "2020-12-31")
+
+    result = runner.invoke(app, ["get", "price_usd", "--slug", "bitcoin"])
+    assert result.exit_code == 0
+    assert result.stdout == mock_get.return_value.to_string() + "\n"
+
+
+@patch("san.get")
+def test_chunked_get_table_format_is_a_bounded_preview(mock_get):
+    """Test the table format with --chunk-size prints the first rows and counts the rest."""
+    from san.cli_formatters import TABLE_PREVIEW_ROWS
+
+    mock_get.side_effect = lambda metric, **kwargs: _daily_frame(kwargs["from_date"][:10], kwargs["to_date"][:10])
+
+    result = runner.invoke(
+        app, ["get", "price_usd", "--slug", "bitcoin", "--from", "2020-01-01", "--to", "2020-12-31",
+              "--chunk-size", "30d"]
+    )
+    assert result.exit_code == 0, result.stderr
+    assert f"{366 - TABLE_PREVIEW_ROWS} more rows" in result.stdout
+    assert "2020-12-31" not in result.stdout
+
+
+# =============================================================================
+# Fetch Command Tests
+# =============================================================================
+
+
+def _fake_execute_gql(failing_slugs=()):
+    """Answer batched getMetric documents with one point per day of each window."""
+    calls = []
+
+    def execute(document):
+        calls.append(document)
+        data = {}
+        for idx in re.findall(r"query_(\d+): getMetric", str(document)):
+            variables = document.variables
+            slug = variables.get(f"slug_{idx}")
+            if slug in failing_slugs:
+                raise SanError(f"failed {slug}")
+            days = pd.date_range(variables[f"from_{idx}"][:10], variables[f"to_{idx}"][:10], freq="D")
+            points = [{"datetime": day.strftime("%Y-%m-%dT%H:%M:%SZ"), "value": 1.0} for day in days]
+            data[f"query_{idx}"] = {"timeseriesDataJson": points}
+        return data
+
+    return execute, calls
+
+
+@pytest.fixture
+def manifest_csv(tmp_path):
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(
+        "metric,slug,slugs,selector,from_date,to_date,interval\n"
+        'price_usd,,"bitcoin,ethereum",,2024-01-01,2024-01-04,1d\n'
+        'dev_activity,,,"{""organization"": ""santiment""}",2024-01-01,2024-01-03,1d\n'
+    )
+    return manifest
+
+
+def test_fetch_writes_one_file_per_job(manifest_csv, tmp_path):
+    """Test fetch batches the manifest jobs and writes each to its own file."""
+    out_dir = tmp_path / "out"
+    execute, calls = _fake_execute_gql()
+
+    with patch("san.cli_fetch.execute_gql", side_effect=execute):
+        result = runner.invoke(app, ["fetch", str(manifest_csv), "--out", str(out_dir), "--batch-size", "2"])
+
+    assert result.exit_code == 0, result.stderr
+    assert len(calls) == 2
+    files = sorted(path.name for path in out_dir.iterdir())
+    assert files[0].startswith("dev_activity__selector-")
+    assert files[1:] == ["price_usd__bitcoin__1d.csv", "price_usd__ethereum__1d.csv"]
+    bitcoin = pd.read_csv(out_dir / "price_usd__bitcoin__1d.csv", index_col="datetime")
+    assert len(bitcoin) == 4
+    assert "[3/3]" in result.stderr
+    assert "3 written, 0 skipped, 0 failed" in result.stdout
+
+
+def test_fetch_resumes_and_chunks(manifest_csv, tmp_path):
+    """Test a second run skips written files and chunked windows are merged."""
+    out_dir = tmp_path / "out"
+    execute, calls = _fake_execute_gql()
+
+    with patch("san.cli_fetch.execute_gql", side_effect=execute):
+        runner.invoke(app, ["fetch", str(manifest_csv), "--out", str(out_dir)])
+        resumed = runner.invoke(app, ["fetch", str(manifest_csv), "--out", str(out_dir)])
+        assert len(calls) == 1
+        assert "0 written, 3 skipped" in resumed.stdout
+
+        forced = runner.invoke(
+            app, ["fetch", str(manifest_csv), "--out", str(out_dir), "--force", "--chunk-size", "1d", "--batch-size", "3"]
+        )
+
+    assert forced.exit_code == 0, forced.stderr
+    # 4 + 4 + 3 daily windows in batches of three.
+    assert len(calls) == 1 + 4
+    assert len(pd.read_csv(out_dir / "price_usd__ethereum__1d.csv")) == 4
+
+
+def test_fetch_reports_failed_jobs(manifest_csv, tmp_path):
+    """Test a failing request only fails the jobs it contained."""
+    out_dir = tmp_path / "out"
+    execute, _ = _fake_execute_gql(failing_slugs={"bitcoin"})
+
+    with patch("san.cli_fetch.execute_gql", side_effect=execute):
+        result = runner.invoke(app, ["fetch", str(manifest_csv), "--out", str(out_dir), "--batch-size", "1"])
+
+    assert result.exit_code == 1
+    assert "Failed price_usd__bitcoin__1d: failed bitcoin" in result.stderr
+    assert not (out_dir / "price_usd__bitcoin__1d.csv").exists()
+    assert (out_dir / "price_usd__ethereum__1d.csv").exists()
+
+
+def test_fetch_json_manifest_and_validation(tmp_path):
+    """Test JSON manifests with names and rejection of unknown fields."""
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"jobs": [{"name": "btc", "metric": "price_usd", "slug": "bitcoin",
+                                              "from_date": "2024-01-01", "to_date": "2024-01-02"}]}))
+    execute, _ = _fake_execute_gql()
+
+    with patch("san.cli_fetch.execute_gql", side_effect=execute):
+        result = runner.invoke(app, ["fetch", str(manifest), "--out", str(tmp_path / "out"), "-f", "json"])
+
+    assert result.exit_code == 0, result.stderr
+    assert json.loads((tmp_path / "out" / "btc.json").read_text())[0]["value"] == 1.0
+
+    manifest.write_text(json.dumps([{"metric": "price_usd", "slug": "bitcoin", "range": "30d"}]))
+    result = runner.invoke(app, ["fetch", str(manifest), "--out", str(tmp_path / "out")])
+    assert result.exit_code == 1
+    assert "unknown field(s): range" in result.stderr
+
+
+# =============================================================================
+# Startup Tests
+# =============================================================================
+
+# Time spent importing sanpy's own modules while starting the CLI. Typer and
+# click are excluded; pandas and requests must not be imported at all.
+CLI_STARTUP_BUDGET_SECONDS = 0.05
+_IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \| ( *)(\S+)$", re.MULTILINE)
+
+
+def _cli_startup_imports(args, tmp_path):
+    """Run the CLI in a fresh interpreter and return {module: self import time in seconds}."""
+    env = dict(os.environ, XDG_CONFIG_HOME=str(tmp_path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from san.cli import app; app()", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert result.returncode == 0, result.stderr
+    return {name: int(self_us) / 1e6 for self_us, _, name in _IMPORT_TIME_RE.findall(result.stderr)}
+
+
+@pytest.mark.parametrize("args", [["--help"], ["config", "show"]])
+def test_cli_startup_budget(args, tmp_path):
+    """Test that help and config commands start without loading data dependencies."""
+    imports = _cli_startup_imports(args, tmp_path)
+
+    assert "san.cli" in imports
+    assert not {"pandas", "numpy", "requests"} & set(imports)
+    san_seconds = sum(seconds for name, seconds in imports.items() if name == "san" or name.startswith("san."))
+    assert san_seconds < CLI_STARTUP_BUDGET_SECONDS
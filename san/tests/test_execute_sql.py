@@ -0,0 +1,203 @@
+import re
+import threading
+import time
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import san
+from san.error import SanError
+
+_PAGE_RE = re.compile(r"LIMIT (\d+) OFFSET (\d+)")
+
+
+def sql_result(columns, rows):
+    return {"query_0": {"columns": columns, "columnTypes": ["String"] * len(columns), "rows": rows}}
+
+
+def paged_table(total_rows, calls, delay=0.0):
+    """Answer LIMIT/OFFSET pages over a table of total_rows rows."""
+
+    def execute(document, stream=False):
+        limit, offset = map(int, _PAGE_RE.search(document).groups())
+        calls.append(offset)
+        time.sleep(delay)
+        rows = [[i, float(i)] for i in range(offset, min(offset + limit, total_rows))]
+        return sql_result(["id", "value"], rows)
+
+    return execute
+
+
+def test_execute_sql_iter_pages_with_limit_offset():
+    calls = []
+    with patch("san.execute_sql.execute_gql", side_effect=paged_table(25, calls)):
+        pages = list(san.execute_sql_iter(query="SELECT id, value FROM t ORDER BY id;", page_size=10, prefetch=1))
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert list(pd.concat(pages)["id"]) == list(range(25))
+    assert calls == [0, 10, 20]
+
+
+def test_execute_sql_iter_bounds_prefetch():
+    calls = []
+    in_flight = {"now": 0, "max": 0}
+    lock = threading.Lock()
+    execute = paged_table(1000, calls, delay=0.01)
+
+    def tracked(document, stream=False):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            return execute(document)
+        finally:
+            with lock:
+                in_flight["now"] -= 1
+
+    with patch("san.execute_sql.execute_gql", side_effect=tracked):
+        iterator = san.execute_sql_iter(query="SELECT id, value FROM t ORDER BY id", page_size=10, prefetch=3, set_index="id")
+        first = next(iterator)
+        time.sleep(0.05)
+        requested = len(calls)
+        iterator.close()
+
+    assert first.index.name == "id"
+    assert in_flight["max"] <= 3
+    # The consumed page plus at most `prefetch` pages requested ahead of it.
+    assert requested <= 4
+
+
+def test_execute_sql_iter_time_windows():
+    documents = []
+
+    def execute(document, stream=False):
+        documents.append(document)
+        return sql_result(["dt", "value"], [["2024-01-01 00:00:00", 1]] if len(documents) == 1 else [])
+
+    with patch("san.execute_sql.execute_gql", side_effect=execute):
+        pages = list(
+            san.execute_sql_iter(
+                query="SELECT dt, value FROM daily_metrics_v2",
+                time_column="dt",
+                from_date="2024-01-01",
+                to_date="2024-01-04T00:00:00Z",
+                window="1d",
+            )
+        )
+
+    assert len(documents) == 3
+    assert len(pages) == 1
+    assert "dt >= toDateTime({{sanpy_window_from}}, 'UTC')" in documents[0]
+    assert '\\"sanpy_window_from\\": \\"2024-01-02 00:00:00\\"' in documents[1]
+
+
+def test_execute_sql_iter_validates_arguments():
+    with pytest.raises(SanError):
+        next(san.execute_sql_iter(query="SELECT 1", time_column="dt"))
+    with pytest.raises(SanError):
+        next(san.execute_sql_iter(query="SELECT 1", page_size=0))
+
+
+def test_execute_sql_types_columns_from_column_types():
+    response = {
+        "query_0": {
+            "columns": ["dt", "day", "count", "volume", "price", "missing", "asset", "tags", "is_active", "name"],
+            "columnTypes": [
+                "DateTime",
+                "Date",
+                "UInt32",
+                "UInt64",
+                "Float64",
+                "Nullable(Int64)",
+                "LowCardinality(String)",
+                "Array(String)",
+                "Bool",
+                "String",
+            ],
+            "rows": [
+                ["2024-01-01T00:00:00Z", "2024-01-01", 1, "18446744073709551615", 1.5, "7", "bitcoin", ["a"], True, "x"],
+                ["2024-01-02T00:00:00Z", "2024-01-02", 2, "3", None, None, "bitcoin", ["a", "b"], False, "y"],
+            ],
+        }
+    }
+
+    with patch("san.execute_sql.execute_gql", return_value=response):
+        frame = san.execute_sql(query="SELECT 1", set_index="dt")
+
+    assert isinstance(frame.index, pd.DatetimeIndex) and str(frame.index.tz) == "UTC"
+    assert isinstance(frame["day"].dtype, pd.DatetimeTZDtype)
+    assert frame["count"].dtype == "int64"
+    assert frame["volume"].dtype == "uint64"
+    assert frame["volume"].iloc[0] == 2**64 - 1
+    assert frame["price"].dtype == "float64"
+    assert pd.isna(frame["price"].iloc[1])
+    assert str(frame["missing"].dtype) == "Int64"
+    assert frame["missing"].iloc[0] == 7
+    assert isinstance(frame["asset"].dtype, pd.CategoricalDtype)
+    assert frame["tags"].iloc[1] == ["a", "b"]
+    assert frame["is_active"].dtype == "bool"
+
+
+def test_execute_sql_keeps_values_that_do_not_match_their_type(monkeypatch):
+    response = {"query_0": {"columns": ["dt", "value"], "columnTypes": ["DateTime", "Int64"], "rows": [["soon", "1.5"]]}}
+
+    with patch("san.execute_sql.execute_gql", return_value=response):
+        frame = san.execute_sql(query="SELECT 1")
+    assert frame.iloc[0].tolist() == ["soon", "1.5"]
+
+    monkeypatch.setattr(san.ApiConfig, "sql_column_types", False)
+    response["query_0"]["rows"] = [["2024-01-01T00:00:00Z", "1"]]
+    with patch("san.execute_sql.execute_gql", return_value=response):
+        frame = san.execute_sql(query="SELECT 1")
+    assert frame.iloc[0].tolist() == ["2024-01-01T00:00:00Z", "1"]
+
+
+def sweep(failures, calls):
+    """Answer a query per slug, failing each slug the given number of times first."""
+
+    def execute(document, stream=False):
+        slug = re.search(r'slug\\": \\"(\w+)', document).group(1)
+        calls.append(slug)
+        if failures.get(slug, 0) > 0:
+            failures[slug] -= 1
+            raise SanError(f"Timeout for {slug}")
+        return {"query_0": {"columns": ["value"], "columnTypes": ["Float64"], "rows": [[len(slug)], [len(slug) + 0.5]]}}
+
+    return execute
+
+
+def test_execute_sql_many_tags_and_concatenates_in_order(monkeypatch):
+    monkeypatch.setattr(san.ApiConfig, "request_backoff_factor", 0)
+    calls = []
+    parameter_sets = [{"slug": slug} for slug in ["bitcoin", "eth", "santiment"]]
+
+    with patch("san.execute_sql.execute_gql", side_effect=sweep({"eth": 2}, calls)):
+        frame = san.execute_sql_many(query="SELECT {{slug}}", parameter_sets=parameter_sets, max_concurrency=3)
+
+    assert list(frame.columns) == ["slug", "value"]
+    assert list(frame["slug"]) == ["bitcoin", "bitcoin", "eth", "eth", "santiment", "santiment"]
+    assert list(frame["value"]) == [7.0, 7.5, 3.0, 3.5, 9.0, 9.5]
+    # Only the failing parameter set was retried.
+    assert sorted(calls) == ["bitcoin", "eth", "eth", "eth", "santiment"]
+
+
+def test_execute_sql_many_failures(monkeypatch):
+    monkeypatch.setattr(san.ApiConfig, "request_backoff_factor", 0)
+    parameter_sets = [{"slug": "bitcoin"}, {"slug": "eth"}]
+
+    with patch("san.execute_sql.execute_gql", side_effect=sweep({"eth": 5}, [])):
+        with pytest.raises(SanError, match="eth"):
+            san.execute_sql_many(query="SELECT {{slug}}", parameter_sets=parameter_sets, retries=1)
+
+    with patch("san.execute_sql.execute_gql", side_effect=sweep({"eth": 5}, [])):
+        with pytest.warns(san.error.SanPartialResultWarning, match="eth"):
+            frame = san.execute_sql_many(query="SELECT {{slug}}", parameter_sets=parameter_sets, retries=1, skip_failed=True)
+    assert set(frame["slug"]) == {"bitcoin"}
+
+    with patch("san.execute_sql.execute_gql", side_effect=sweep({}, [])):
+        results = dict(
+            (parameters["slug"], result)
+            for parameters, result in san.execute_sql_many_iter(query="SELECT {{slug}}", parameter_sets=parameter_sets)
+        )
+    assert list(results["eth"]["value"]) == [3.0, 3.5]
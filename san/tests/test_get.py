@@ -427,6 +427,15 @@ def test_get_many_raises_on_unsupported_kwarg():
         san.get_many("price_usd", slugs=["bitcoin"], foo_bar=1)
 
 
+def test_function_specific_kwargs_are_rejected_elsewhere():
+    with pytest.raises(SanError, match="unsupported parameter.*shard_size"):
+        san.get("price_usd", slug="bitcoin", shard_size=3)
+    with pytest.raises(SanError, match="unsupported parameter.*long_format"):
+        san.get("price_usd/bitcoin", long_format=True)
+    with pytest.raises(SanError, match="unsupported parameter.*as_arrow"):
+        Batch().get("price_usd/bitcoin", as_arrow=True)
+
+
 def test_batch_get_raises_on_unsupported_kwarg():
     batch = Batch()
     with pytest.raises(SanError, match="unsupported parameter"):
@@ -469,8 +478,9 @@ def test_get_with_only_finalized_data(mock, test_response):
         only_finalized_data=True,
     )
 
-    query = mock.call_args.kwargs["json"]["query"]
-    assert "onlyFinalizedData: true" in query
+    payload = mock.call_args.kwargs["json"]
+    assert "onlyFinalizedData: $onlyFinalizedData_0" in payload["query"]
+    assert payload["variables"]["onlyFinalizedData_0"] is True
 
 
 @patch("san.transport.requests.Session.post")
@@ -487,8 +497,9 @@ def test_get_many_with_only_finalized_data(mock, test_response):
         only_finalized_data=False,
     )
 
-    query = mock.call_args.kwargs["json"]["query"]
-    assert "onlyFinalizedData: false" in query
+    payload = mock.call_args.kwargs["json"]
+    assert "onlyFinalizedData: $onlyFinalizedData_0" in payload["query"]
+    assert payload["variables"]["onlyFinalizedData_0"] is False
 
 
 @patch("san.transport.requests.Session.post")
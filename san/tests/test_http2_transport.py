@@ -0,0 +1,110 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from san.api_config import ApiConfig  # noqa: E402
+from san.error import SanError, SanNetworkError, SanServerError, SanTimeoutError  # noqa: E402
+from san.graphql import execute_gql  # noqa: E402
+from san.http2_transport import Http2Transport  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def restore_api_config():
+    original = (
+        ApiConfig.request_retry_count,
+        ApiConfig.request_backoff_factor,
+        ApiConfig.request_timeout,
+        ApiConfig.transport,
+        ApiConfig.stream_responses,
+    )
+
+    yield
+
+    (
+        ApiConfig.request_retry_count,
+        ApiConfig.request_backoff_factor,
+        ApiConfig.request_timeout,
+        ApiConfig.transport,
+        ApiConfig.stream_responses,
+    ) = original
+
+
+def projects_payload():
+    return {"data": {"query_0": [{"slug": "bitcoin"}]}}
+
+
+def test_http2_transport_selected_per_call_and_via_api_config(graphql_server):
+    graphql_server["handler"] = lambda call, body: (200, projects_payload())
+    transport = Http2Transport(graphql_server["url"], http2=False)
+
+    assert execute_gql("{ query_0: projectsAll { slug } }", transport=transport) == projects_payload()["data"]
+    assert graphql_server["calls"] == 1
+
+    ApiConfig.transport = transport
+    ApiConfig.stream_responses = True
+    assert execute_gql("{ query_0: allProjects { slug } }", stream=True) == projects_payload()["data"]
+    assert graphql_server["calls"] == 2
+    transport.close()
+
+
+def test_http2_transport_reuses_one_client_across_threads(graphql_server):
+    graphql_server["handler"] = lambda call, body: (200, projects_payload())
+    transport = Http2Transport(graphql_server["url"], http2=False)
+
+    def run(idx):
+        return execute_gql(f"{{ query_0: projectsAll(page: {idx}) {{ slug }} }}", transport=transport)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(run, range(8)))
+
+    assert all(result == projects_payload()["data"] for result in results)
+    # Keep-alive connections from the shared pool, not one session per thread.
+    assert len(graphql_server["ports"]) <= 4
+    transport.close()
+
+
+def test_http2_transport_retries_server_errors(graphql_server):
+    ApiConfig.request_retry_count = 2
+    ApiConfig.request_backoff_factor = 0
+    graphql_server["handler"] = lambda call, body: (503, {}) if call < 3 else (200, projects_payload())
+    transport = Http2Transport(graphql_server["url"], http2=False)
+
+    assert execute_gql("{ query_0: projectsAll { slug } }", transport=transport) == projects_payload()["data"]
+    assert graphql_server["calls"] == 3
+
+    ApiConfig.request_retry_count = 1
+    graphql_server["handler"] = lambda call, body: (503, {"errors": {"details": "Service unavailable"}})
+    with pytest.raises(SanServerError):
+        execute_gql("{ query_0: projectsAll(page: 2) { slug } }", transport=transport)
+    transport.close()
+
+
+def test_http2_transport_maps_connection_errors():
+    ApiConfig.request_retry_count = 0
+    transport = Http2Transport("http://127.0.0.1:9", http2=False)
+
+    with pytest.raises((SanNetworkError, SanTimeoutError)):
+        execute_gql("{ query_0: projectsAll { slug } }", transport=transport)
+    transport.close()
+
+
+def test_http2_transport_negotiates_http2(graphql_server):
+    pytest.importorskip("h2")
+    graphql_server["handler"] = lambda call, body: (200, projects_payload())
+    transport = Http2Transport(graphql_server["url"])
+
+    # Cleartext servers without h2c fall back to HTTP/1.1 on the same client.
+    assert execute_gql("{ query_0: projectsAll { slug } }", transport=transport) == projects_payload()["data"]
+    transport.close()
+
+
+
+def test_http2_transport_without_h2_raises_san_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "h2", None)
+
+    with pytest.raises(SanError, match=r"sanpy\[http2\]"):
+        Http2Transport()
+    Http2Transport(http2=False).close()
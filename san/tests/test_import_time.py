@@ -0,0 +1,43 @@
+import re
+import subprocess
+import sys
+
+import san
+
+# Generous enough for slow CI machines; the eager package took about 0.4s.
+IMPORT_TIME_BUDGET_SECONDS = 0.15
+HEAVY_MODULES = ("pandas", "numpy", "requests")
+
+_IMPORT_TIME_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| san$", re.MULTILINE)
+
+
+def run_python(code, *flags):
+    return subprocess.run([sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True)
+
+
+def test_import_san_does_not_load_heavy_modules():
+    code = f"import sys, san; print([name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    assert run_python(code).stdout.strip() == "[]"
+
+
+def test_rate_limit_helpers_do_not_load_pandas():
+    code = "import sys, san; san.api_calls_remaining; san.rate_limit_stats; print('pandas' in sys.modules)"
+    assert run_python(code).stdout.strip() == "False"
+
+
+def test_import_san_time_budget():
+    # The cumulative time of the `san` package itself, as reported by -X importtime.
+    stderr = run_python("import san", "-X", "importtime").stderr
+    microseconds = int(_IMPORT_TIME_RE.search(stderr).group(1))
+    assert microseconds / 1e6 < IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_lazy_attributes_resolve_to_public_objects():
+    # Importing the san.get submodule directly must not replace the san.get function.
+    from san.get import build_get_query  # noqa: F401
+
+    assert callable(san.get)
+    assert callable(san.get_many)
+    assert san.Batch.__name__ == "Batch"
+    assert san.graphql.DEFAULT_TRANSPORT is not None
+    assert set(san.__all__) <= set(dir(san))
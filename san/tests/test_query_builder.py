@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import san
+from san.cache import ResponseCache
+from san.get import build_get_query
+from san.get_many import build_get_many_query
+from san.query_builder import Document, QueryFragment, build_document
+from san.sanbase_graphql import get_metric_timeseries_data, get_metric_timeseries_data_per_slug
+
+
+def test_build_document_declares_fragment_variables():
+    fragments = [
+        QueryFragment("query_0: a(x: $x_0)", {"x_0": 1}, {"x_0": "Int"}),
+        "query_1: b",
+        QueryFragment("query_2: c(x: $x_2)", {"x_2": 2}, {"x_2": "Int"}),
+    ]
+    document = build_document(fragments)
+
+    assert document.startswith("query($x_0: Int, $x_2: Int) {")
+    assert document.variables == {"x_0": 1, "x_2": 2}
+    assert build_document(["query_0: a"]) == "{\nquery_0: a\n}"
+
+
+def test_metric_document_text_is_stable_across_values():
+    _idx, first = build_get_query("price_usd", slug="bitcoin", from_date="2020-01-01", to_date="2020-02-01")
+    _idx, second = build_get_query("price_usd", slug="ethereum", from_date="2021-01-01", to_date="utc_now")
+
+    assert str(first) == str(second)
+    assert first.variables["slug_0"] == "bitcoin"
+    assert first.variables["from_0"] == "2020-01-01T00:00:00+00:00"
+    assert second.variables["to_0"] == "utc_now"
+
+
+def test_selector_and_slugs_are_sent_as_variables():
+    _idx, document = build_get_query("dev_activity", selector={"organization": "ethereum", "holders": "10"})
+    assert "selector: $selector_0" in document
+    assert document.variables["selector_0"] == {"organization": "ethereum", "holders": 10}
+
+    _idx, document = build_get_many_query("price_usd", slugs=["bitcoin", "ethereum"], include_incomplete_data=True)
+    assert "timeseriesDataPerSlugJson" in document
+    assert document.variables["selector_0"] == {"slugs": ["bitcoin", "ethereum"]}
+    assert document.variables["includeIncompleteData_0"] is True
+
+
+def test_public_metric_builders_return_literal_text():
+    query = (
+        "{"
+        + get_metric_timeseries_data(0, "price_usd", "bitcoin", from_date="2020-01-01", to_date="2020-02-01")
+        + get_metric_timeseries_data_per_slug(1, "price_usd", ["bitcoin", "ethereum"], only_finalized_data=True)
+        + "}"
+    )
+
+    assert "$" not in query
+    assert 'slug:"bitcoin"' in query
+    assert 'from: "2020-01-01T00:00:00+00:00"' in query
+    assert 'selector: {slugs: ["bitcoin", "ethereum"]}' in query
+    assert "onlyFinalizedData: true" in query
+
+
+@patch("san.transport.requests.Session.post")
+def test_variables_are_sent_with_the_query(mock, test_response):
+    mock.return_value = test_response(status_code=200, data={"query_0": {"timeseriesDataJson": []}})
+
+    san.get("price_usd", slug="bitcoin", from_date="2020-01-01", to_date="2020-01-02")
+
+    payload = mock.call_args.kwargs["json"]
+    assert payload["variables"]["slug_0"] == "bitcoin"
+    assert "$slug_0" in payload["query"]
+
+
+def test_cache_keys_and_ttls_include_variables(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    text = "query($from_0: DateTime!) { query_0: x(from: $from_0) }"
+    first = Document(text, {"from_0": "2020-01-01"})
+    second = Document(text, {"from_0": "2021-01-01"})
+
+    assert cache.key(first) != cache.key(second)
+    assert cache.ttl_for(Document(text, {"from_0": "utc_now-1d"})) == cache.relative_date_ttl
+    assert cache.ttl_for(Document(text, {"includeIncompleteData_0": True})) == cache.incomplete_data_ttl
+    cache.close()
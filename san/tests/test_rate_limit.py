@@ -0,0 +1,150 @@
+from unittest.mock import patch
+
+import pytest
+
+import san
+from san.api_config import ApiConfig
+from san.error import SanRateLimitError
+from san.rate_limit import RateLimiter
+from san.tests.utils import TestResponse
+
+QUERY = "{ query_0: projectsAll { slug } }"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("san.rate_limit.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("san.rate_limit.time.sleep", clock.sleep)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def restore_api_config():
+    original = (ApiConfig.rate_limit_pacing, ApiConfig.rate_limit_reserve, ApiConfig.rate_limit_max_wait)
+    yield
+    ApiConfig.rate_limit_pacing, ApiConfig.rate_limit_reserve, ApiConfig.rate_limit_max_wait = original
+
+
+def response_with_headers(minute, hour=1000, month=100000, status_code=200, data=None):
+    response = TestResponse()
+    response.setup(
+        status_code=status_code,
+        data=data or {"query_0": [{"slug": "bitcoin"}]},
+        headers={
+            "x-ratelimit-remaining-minute": str(minute),
+            "x-ratelimit-remaining-hour": str(hour),
+            "x-ratelimit-remaining-month": str(month),
+            "x-ratelimit-limit-minute": "60",
+        },
+    )
+    return response
+
+
+def test_limiter_does_not_wait_without_headers(clock):
+    limiter = RateLimiter()
+
+    for _ in range(100):
+        limiter.acquire()
+        limiter.release(None)
+
+    assert clock.sleeps == []
+
+
+def test_limiter_paces_when_minute_budget_is_exhausted(clock):
+    limiter = RateLimiter()
+    limiter.acquire()
+    limiter.release(response_with_headers(minute=2))
+
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+
+    # The minute limit is 60, so a new call becomes available every second.
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+    stats = limiter.stats()
+    assert stats["minute_remaining"] == 2
+    assert stats["in_flight"] == 3
+    assert stats["throttle_waits"] == 1
+    assert stats["throttle_wait_seconds"] == pytest.approx(1.0)
+
+
+def test_limiter_accounts_for_requests_in_flight(clock):
+    limiter = RateLimiter()
+    limiter.acquire()
+    limiter.acquire()
+    # The first response reports 1 call left, but the second request is still in flight.
+    limiter.release(response_with_headers(minute=1))
+
+    assert limiter.stats()["minute_budget"] == 0
+
+
+def test_limiter_keeps_reserve(clock):
+    ApiConfig.rate_limit_reserve = 5
+    limiter = RateLimiter()
+    limiter.acquire()
+    limiter.release(response_with_headers(minute=5))
+
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_limiter_raises_when_wait_exceeds_max_wait(clock):
+    ApiConfig.rate_limit_max_wait = 10
+    limiter = RateLimiter()
+    limiter.acquire()
+    limiter.release(response_with_headers(minute=50, hour=0))
+
+    with pytest.raises(SanRateLimitError, match="Try again in"):
+        limiter.acquire()
+
+
+def test_limiter_can_be_disabled(clock):
+    ApiConfig.rate_limit_pacing = False
+    limiter = RateLimiter()
+    limiter.release(response_with_headers(minute=0))
+
+    limiter.acquire()
+    assert clock.sleeps == []
+
+
+def test_execute_gql_learns_budget_from_every_response(clock):
+    with patch("san.transport.requests.Session.post", return_value=response_with_headers(minute=42)):
+        san.graphql.execute_gql(QUERY)
+
+    stats = san.rate_limit_stats()
+    assert stats["minute_remaining"] == 42
+    assert stats["hour_remaining"] == 1000
+    assert stats["month_remaining"] == 100000
+    assert stats["in_flight"] == 0
+
+
+def test_execute_gql_holds_back_requests_after_rate_limit_error(clock):
+    rate_limited = response_with_headers(
+        minute=0, status_code=429, data={"errors": {"details": "API Rate Limit Reached. Try again in 5 seconds"}}
+    )
+    with patch("san.transport.requests.Session.post", return_value=rate_limited):
+        with pytest.raises(SanRateLimitError):
+            san.graphql.execute_gql(QUERY)
+
+    assert san.rate_limit_stats()["blocked_for_seconds"] == 5
+
+    with patch("san.transport.requests.Session.post", return_value=response_with_headers(minute=59)):
+        san.graphql.execute_gql(QUERY)
+
+    assert sum(clock.sleeps) == pytest.approx(5.0)
@@ -0,0 +1,118 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from san.api_config import ApiConfig
+from san.error import SanServerError
+from san.graphql import execute_gql
+from san.singleflight import SINGLE_FLIGHT, SingleFlight
+
+QUERY = '{ query_0: getMetric(metric: "price_usd") { timeseriesDataJson(slug: "bitcoin") } }'
+
+
+@pytest.fixture(autouse=True)
+def reset_single_flight():
+    SINGLE_FLIGHT.reset()
+    yield
+    SINGLE_FLIGHT.reset()
+
+
+def _run_concurrently(target, count):
+    results = [None] * count
+    errors = [None] * count
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as exc:
+            errors[i] = exc
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+@patch("san.transport.requests.Session.post")
+def test_identical_queries_share_one_request(mock, test_response):
+    release = threading.Event()
+
+    def slow_post(*args, **kwargs):
+        release.wait(5)
+        return test_response(status_code=200, data={"query_0": {"timeseriesDataJson": [1, 2]}})
+
+    mock.side_effect = slow_post
+    threads, results, errors = _run_concurrently(lambda: execute_gql(QUERY), 5)
+    while SINGLE_FLIGHT.stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert mock.call_count == 1
+    assert errors == [None] * 5
+    assert all(result == {"query_0": {"timeseriesDataJson": [1, 2]}} for result in results)
+    # Waiters get their own copy of the result.
+    assert len({id(result) for result in results}) == 5
+    assert SINGLE_FLIGHT.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+@patch("san.transport.requests.Session.post")
+def test_waiters_receive_the_leader_exception(mock, test_response):
+    release = threading.Event()
+
+    def failing_post(*args, **kwargs):
+        release.wait(5)
+        return test_response(status_code=500, data={})
+
+    mock.side_effect = failing_post
+    threads, _results, errors = _run_concurrently(lambda: execute_gql(QUERY), 3)
+    while SINGLE_FLIGHT.stats()["coalesced"] < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(error, SanServerError) for error in errors)
+
+
+@patch("san.transport.requests.Session.post")
+def test_coalescing_can_be_disabled(mock, test_response, monkeypatch):
+    monkeypatch.setattr(ApiConfig, "coalesce_requests", False)
+    mock.return_value = test_response(status_code=200, data={"query_0": {"timeseriesDataJson": []}})
+
+    execute_gql(QUERY)
+    execute_gql(QUERY)
+
+    assert mock.call_count == 2
+    assert SINGLE_FLIGHT.stats()["executed"] == 0
+
+
+def test_queries_are_keyed_by_api_key_and_normalized_text():
+    flight = SingleFlight()
+    key_started = threading.Event()
+    release = threading.Event()
+
+    def leader():
+        key_started.set()
+        release.wait(5)
+        return "leader"
+
+    thread = threading.Thread(target=flight.do, args=(QUERY, "key-1", leader))
+    thread.start()
+    key_started.wait(5)
+
+    # A different API key never shares a request.
+    assert flight.do(QUERY, "key-2", lambda: "other key") == "other key"
+
+    follower = threading.Thread(target=flight.do, args=(QUERY.replace(" ", "  "), "key-1", lambda: "unused"))
+    follower.start()
+    while flight.stats()["coalesced"] < 1:
+        time.sleep(0.01)
+    release.set()
+    thread.join()
+    follower.join()
+
+    assert flight.stats() == {"executed": 2, "coalesced": 1, "in_flight": 0}
@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+import san
+from san.api_config import ApiConfig
+from san.sql_cache import SqlResultCache, normalize_sql
+
+QUERY = "SELECT dt, asset, value FROM daily_metrics_v2 WHERE asset_id = get_asset_id({{slug}}) AND dt < '2024-01-03'"
+
+SQL_RESULT = {
+    "query_0": {
+        "columns": ["dt", "asset", "value"],
+        "columnTypes": ["DateTime", "LowCardinality(String)", "Float64"],
+        "rows": [["2024-01-01T00:00:00Z", "bitcoin", 1.5], ["2024-01-02T00:00:00Z", "bitcoin", 2.5]],
+    }
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SqlResultCache(path=tmp_path / "sql_results.sqlite")
+    original_cache, original_api_key = ApiConfig.sql_cache, ApiConfig.api_key
+    ApiConfig.sql_cache = cache
+
+    yield cache
+
+    ApiConfig.sql_cache, ApiConfig.api_key = original_cache, original_api_key
+    cache.close()
+
+
+def test_execute_sql_serves_repeated_queries_from_cache(cache):
+    with patch("san.execute_sql.execute_gql", return_value=SQL_RESULT) as execute:
+        first = san.execute_sql(query=QUERY, parameters={"slug": "bitcoin"}, set_index="dt")
+        reformatted = "  " + QUERY.replace(" FROM ", "\n    FROM ") + ";"
+        second = san.execute_sql(query=reformatted, parameters={"slug": "bitcoin"}, set_index="dt")
+        san.execute_sql(query=QUERY, parameters={"slug": "ethereum"})
+
+    assert execute.call_count == 2
+    pd.testing.assert_frame_equal(first, second)
+    assert isinstance(second["asset"].dtype, pd.CategoricalDtype)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 2, 2, 2)
+    assert stats["seconds_saved"] >= 0
+
+
+def test_cache_is_scoped_by_api_key(cache):
+    with patch("san.execute_sql.execute_gql", return_value=SQL_RESULT) as execute:
+        ApiConfig.api_key = "first-key"
+        san.execute_sql(query=QUERY, parameters={"slug": "bitcoin"})
+        ApiConfig.api_key = "second-key"
+        san.execute_sql(query=QUERY, parameters={"slug": "bitcoin"})
+
+    assert execute.call_count == 2
+
+
+def test_cache_invalidation(cache):
+    values = {"columns": ["value"], "columnTypes": ["Float64"], "values": [[1.0]]}
+    for slug in ["bitcoin", "ethereum", "santiment"]:
+        cache.set(QUERY, {"slug": slug}, values)
+
+    assert cache.invalidate(QUERY, {"slug": "bitcoin"}) == 1
+    assert cache.get(QUERY, {"slug": "bitcoin"}) is None
+    assert cache.get(QUERY, {"slug": "ethereum"}) == values
+    assert cache.invalidate(QUERY) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_entries_expire(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("san.cache.time.time", lambda: now[0])
+    values = {"columns": ["value"], "columnTypes": ["Float64"], "values": [[1.0]]}
+
+    cache.set(QUERY, {}, values, query_seconds=2.0)
+    cache.set("SELECT value FROM t WHERE dt > now() - INTERVAL 1 DAY", {}, values)
+    now[0] += cache.relative_time_ttl + 1
+
+    assert cache.get("SELECT value FROM t WHERE dt > now() - INTERVAL 1 DAY", {}) is None
+    assert cache.get(QUERY, {}) == values
+    assert cache.stats()["seconds_saved"] == 2.0
+
+    now[0] += cache.default_ttl
+    assert cache.get(QUERY, {}) is None
+
+
+def test_normalize_sql_keeps_string_literals():
+    assert normalize_sql("SELECT  1\n FROM t WHERE a = 'x  y';") == "SELECT 1 FROM t WHERE a = 'x  y'"
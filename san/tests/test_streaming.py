@@ -0,0 +1,143 @@
+import json
+from unittest.mock import patch
+
+import pandas.testing as pdt
+import pytest
+
+import san
+from san.api_config import ApiConfig
+from san.error import SanGraphqlQueryError
+from san.execute_sql import transform_sql_result
+from san.streaming import StreamedColumns, parse_streamed_response
+from san.transform import transform_timeseries_data_per_slug_query_result, transform_timeseries_data_query_result
+
+TIMESERIES = {
+    "data": {
+        "query_0": {
+            "timeseriesDataJson": [
+                {"datetime": "2020-01-01T00:00:00Z", "value": 1.5},
+                {"datetime": "2020-01-02T00:00:00Z", "value": 12345678901234},
+                {"datetime": "2020-01-03T00:00:00Z", "value": None},
+            ]
+        }
+    }
+}
+
+PER_SLUG = {
+    "data": {
+        "query_0": {
+            "timeseriesDataPerSlugJson": [
+                {"datetime": "2020-01-01T00:00:00Z", "data": [{"slug": "bitcoin", "value": 1}, {"slug": "ethereum", "value": 2.5}]},
+                {"datetime": "2020-01-02T00:00:00Z", "data": [{"slug": "bitcoin", "value": 3}]},
+            ]
+        }
+    }
+}
+
+SQL = {
+    "data": {
+        "query_0": {
+            "columns": ["dt", "value", "label"],
+            "columnTypes": ["DateTime", "Float64", "String"],
+            "rows": [["2020-01-01 00:00:00", 1.0, 'a " \u00e9'], ["2020-01-02 00:00:00", None, "b"]],
+        }
+    }
+}
+
+
+def _chunks(document, size):
+    body = json.dumps(document, indent=1, ensure_ascii=False).encode("utf-8")
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class StreamedResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, document, chunk_size=7):
+        self._chunks = _chunks(document, chunk_size)
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        yield from self._chunks
+
+    def close(self):
+        self.closed = True
+
+
+def _as_plain(value):
+    if isinstance(value, StreamedColumns):
+        return value.records()
+    if isinstance(value, dict):
+        return {key: _as_plain(item) for key, item in value.items()}
+    return value
+
+
+@pytest.mark.parametrize("document", [TIMESERIES, PER_SLUG, SQL, {"data": {"query_0": None}, "errors": [{"message": "x"}]}])
+@pytest.mark.parametrize("chunk_size", [1, 3, 64 * 1024])
+def test_streamed_parse_matches_json_loads(document, chunk_size):
+    parsed = parse_streamed_response(_chunks(document, chunk_size))
+    assert _as_plain(parsed) == json.loads(json.dumps(document))
+
+
+def test_streamed_arrays_are_columnar():
+    parsed = parse_streamed_response(_chunks(TIMESERIES, 5))
+    points = parsed["data"]["query_0"]["timeseriesDataJson"]
+
+    assert points.is_columnar
+    assert points.columns["value"] == [1.5, 12345678901234, None]
+
+
+def test_mismatched_elements_fall_back_to_records():
+    document = {"data": {"query_0": {"timeseriesDataJson": [{"datetime": "2020-01-01T00:00:00Z", "value": 1}, {"value": 2}]}}}
+    points = parse_streamed_response(_chunks(document, 4))["data"]["query_0"]["timeseriesDataJson"]
+
+    assert not points.is_columnar
+    assert points.records() == document["data"]["query_0"]["timeseriesDataJson"]
+
+
+@pytest.mark.parametrize("body", [b'{"data": {"query_0": {"timeseriesDataJson": [{"value": 1}', b'{"data": 1} x', b'{"data": [1 2]}'])
+def test_invalid_json_raises(body):
+    with pytest.raises(ValueError):
+        parse_streamed_response([body])
+
+
+def test_streamed_frames_match_regular_frames():
+    streamed = parse_streamed_response(_chunks(TIMESERIES, 3))["data"]
+    pdt.assert_frame_equal(
+        transform_timeseries_data_query_result(0, "price_usd", streamed),
+        transform_timeseries_data_query_result(0, "price_usd", TIMESERIES["data"]),
+    )
+
+    streamed = parse_streamed_response(_chunks(PER_SLUG, 3))["data"]
+    pdt.assert_frame_equal(
+        transform_timeseries_data_per_slug_query_result(0, "price_usd", streamed),
+        transform_timeseries_data_per_slug_query_result(0, "price_usd", PER_SLUG["data"]),
+    )
+
+    streamed = parse_streamed_response(_chunks(SQL, 3))["data"]
+    pdt.assert_frame_equal(transform_sql_result(streamed, 0, set_index="dt"), transform_sql_result(SQL["data"], 0, set_index="dt"))
+
+
+@patch("san.transport.requests.Session.post")
+def test_get_streams_when_enabled(mock, monkeypatch):
+    monkeypatch.setattr(ApiConfig, "stream_responses", True)
+    response = StreamedResponse(TIMESERIES)
+    mock.return_value = response
+
+    df = san.get("price_usd", slug="bitcoin", from_date="2020-01-01", to_date="2020-01-03")
+
+    assert mock.call_args.kwargs["stream"] is True
+    assert response.closed
+    assert df["value"].tolist()[:2] == [1.5, 12345678901234]
+
+
+@patch("san.transport.requests.Session.post")
+def test_streamed_invalid_json_raises_san_error(mock, monkeypatch):
+    monkeypatch.setattr(ApiConfig, "stream_responses", True)
+    response = StreamedResponse(TIMESERIES)
+    response._chunks = response._chunks[:-3]
+    mock.return_value = response
+
+    with pytest.raises(SanGraphqlQueryError):
+        san.execute_sql(query="SELECT 1")
@@ -0,0 +1,156 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from san.error import SanError
+from san.tests.utils import TestResponse
+from san.timeseries_store import TimeseriesStore
+
+_ALIAS_RE = re.compile(r"query_(\d+): getMetric")
+
+
+def fake_daily_api(requests_log):
+    """Answer every aliased getMetric query with one point per day in its [from, to] range."""
+
+    def post(*args, **kwargs):
+        query = kwargs["json"]["query"]
+        variables = kwargs["json"]["variables"]
+        data = {}
+        for idx in _ALIAS_RE.findall(query):
+            alias, from_date, to_date = f"query_{idx}", variables[f"from_{idx}"], variables[f"to_{idx}"]
+            requests_log.append((from_date, to_date))
+            days = pd.date_range(pd.Timestamp(from_date).ceil("D"), pd.Timestamp(to_date), freq="D")
+            data[alias] = {
+                "timeseriesDataJson": [{"datetime": day.strftime("%Y-%m-%dT%H:%M:%SZ"), "value": float(day.day)} for day in days]
+            }
+        response = TestResponse()
+        response.setup(status_code=200, data=data)
+        return response
+
+    return post
+
+
+def test_store_only_fetches_missing_range(tmp_path):
+    requests_log = []
+    store = TimeseriesStore(tmp_path)
+
+    with patch("san.transport.requests.Session.post", side_effect=fake_daily_api(requests_log)) as mock:
+        first = store.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-10", interval="1d")
+        second = store.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-12", interval="1d")
+
+    assert mock.call_count == 2
+    assert len(first) == 10
+    assert len(second) == 12
+    assert second.index.is_monotonic_increasing
+    assert not second.index.duplicated().any()
+    # The second request starts at the day where the held span ends, not at from_date.
+    assert requests_log[1][0].startswith("2024-01-10")
+
+
+def test_store_does_not_refetch_held_range(tmp_path):
+    requests_log = []
+    store = TimeseriesStore(tmp_path)
+
+    with patch("san.transport.requests.Session.post", side_effect=fake_daily_api(requests_log)) as mock:
+        store.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-31", interval="1d")
+        inner = store.get("price_usd", slug="bitcoin", from_date="2024-01-05", to_date="2024-01-07", interval="1d")
+
+    assert mock.call_count == 1
+    assert list(inner.index.day) == [5, 6, 7]
+
+
+def test_store_fetches_all_gaps_in_one_request(tmp_path):
+    requests_log = []
+    store = TimeseriesStore(tmp_path)
+
+    with patch("san.transport.requests.Session.post", side_effect=fake_daily_api(requests_log)) as mock:
+        store.get("price_usd", slug="bitcoin", from_date="2024-01-10", to_date="2024-01-20", interval="1d")
+        result = store.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-31", interval="1d")
+
+    assert mock.call_count == 2
+    assert len(requests_log) == 3
+    assert len(result) == 31
+    assert store.stats()["gaps_fetched"] == 3
+
+
+def test_store_persists_spans_to_disk(tmp_path):
+    requests_log = []
+
+    with patch("san.transport.requests.Session.post", side_effect=fake_daily_api(requests_log)) as mock:
+        TimeseriesStore(tmp_path).get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-10")
+        reopened = TimeseriesStore(tmp_path)
+        result = reopened.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-10")
+
+    assert mock.call_count == 1
+    assert len(result) == 10
+    assert len(reopened.spans("price_usd", slug="bitcoin")) == 1
+
+
+def test_store_keeps_series_apart(tmp_path):
+    requests_log = []
+    store = TimeseriesStore(tmp_path)
+
+    with patch("san.transport.requests.Session.post", side_effect=fake_daily_api(requests_log)) as mock:
+        store.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-10")
+        store.get("price_usd", slug="ethereum", from_date="2024-01-01", to_date="2024-01-10")
+        store.get("price_usd", slug="bitcoin", from_date="2024-01-01", to_date="2024-01-10", version="2.0")
+
+    assert mock.call_count == 3
+
+
+def test_store_requires_slug_or_selector():
+    with pytest.raises(SanError):
+        TimeseriesStore().get("price_usd", from_date="2024-01-01", to_date="2024-01-10")
+
+
+def test_store_rejects_calendar_intervals():
+    with pytest.raises(SanError, match="Unsupported interval"):
+        TimeseriesStore().get("price_usd", slug="bitcoin", interval="toStartOfMonth")
+
+
+def test_store_fetches_unrelated_series_concurrently(tmp_path):
+    store = TimeseriesStore(tmp_path)
+    # Both requests must be in flight at the same time to pass the barrier.
+    barrier = threading.Barrier(2, timeout=5)
+    fake_api = fake_daily_api([])
+
+    def post(*args, **kwargs):
+        barrier.wait()
+        return fake_api(*args, **kwargs)
+
+    with patch("san.transport.requests.Session.post", side_effect=post):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(store.get, "price_usd", slug=slug, from_date="2024-01-01", to_date="2024-01-05", interval="1d")
+                for slug in ["bitcoin", "ethereum"]
+            ]
+            frames = [future.result() for future in futures]
+
+    assert [len(frame) for frame in frames] == [5, 5]
+    assert store.stats()["requests"] == 2
+
+
+def test_store_does_not_keep_incomplete_interval(tmp_path):
+    store = TimeseriesStore(tmp_path)
+    today = pd.Timestamp.now(tz="UTC").floor("D")
+
+    with patch("san.transport.requests.Session.post", side_effect=fake_daily_api([])):
+        incomplete = store.get("price_usd", slug="bitcoin", from_date="utc_now-3d", to_date="utc_now", include_incomplete_data=True)
+    assert incomplete.index[-1] == today
+
+    def no_points(*args, **kwargs):
+        aliases = _ALIAS_RE.findall(kwargs["json"]["query"])
+        response = TestResponse()
+        response.setup(status_code=200, data={f"query_{idx}": {"timeseriesDataJson": []} for idx in aliases})
+        return response
+
+    with patch("san.transport.requests.Session.post", side_effect=no_points) as mock:
+        finalized = store.get("price_usd", slug="bitcoin", from_date="utc_now-3d", to_date="utc_now")
+
+    assert mock.call_count == 1
+    assert finalized.index[-1] < today
+    assert len(finalized) == len(incomplete) - 1
@@ -0,0 +1,126 @@
+import json
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from san.api_config import ApiConfig
+from san.json_parser import loads_response
+from san.pandas_utils import convert_timeseries_to_df, convert_to_datetime_idx_df, parse_utc_datetimes
+from san.chunking import merge_long_frames
+from san.transform import (
+    _per_slug_rows,
+    transform_timeseries_data_per_slug_query_result,
+    transform_timeseries_data_query_result,
+)
+
+
+def _points(values, datetime_format="2020-01-{:02d}T00:00:00Z"):
+    return [{"datetime": datetime_format.format(i + 1), "value": value} for i, value in enumerate(values)]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [1, 2, 3],
+        [1.5, 2, 3],
+        [1, None, 3],
+        [None, None],
+        [True, False],
+        ["a", "b"],
+        [2**70, 1],
+        [],
+    ],
+)
+def test_columnar_frame_matches_generic_conversion(values):
+    points = _points(values)
+    pdt.assert_frame_equal(convert_timeseries_to_df(points), convert_to_datetime_idx_df(points))
+
+
+def test_columnar_frame_falls_back_for_other_shapes():
+    fractional = _points([1.0, 2.0], "2020-01-{:02d}T00:00:00.500Z")
+    pdt.assert_frame_equal(convert_timeseries_to_df(fractional), convert_to_datetime_idx_df(fractional))
+
+    extra_fields = [{"datetime": "2020-01-01T00:00:00Z", "value": 1.0, "slug": "bitcoin"}]
+    pdt.assert_frame_equal(convert_timeseries_to_df(extra_fields), convert_to_datetime_idx_df(extra_fields))
+
+
+def test_parse_utc_datetimes_matches_pandas():
+    values = ["2020-01-01T00:00:00Z", "2021-06-30T23:55:00Z"]
+    expected = pd.DatetimeIndex(pd.to_datetime(values, utc=True), name="datetime")
+    pdt.assert_index_equal(parse_utc_datetimes(values), expected)
+
+
+def test_get_metric_result_uses_columnar_frame():
+    points = _points([1.0, 2.0, 3.0])
+    data = {"query_0": {"timeseriesDataJson": points}}
+    pdt.assert_frame_equal(transform_timeseries_data_query_result(0, "price_usd", data), convert_to_datetime_idx_df(points))
+
+
+@pytest.mark.parametrize("parser", ["auto", "json", "orjson"])
+def test_loads_response_parsers(parser, monkeypatch):
+    if parser == "orjson":
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(ApiConfig, "json_parser", parser)
+    body = {"data": {"query_0": {"timeseriesDataJson": _points([1.5, 2**70])}}}
+    response = MagicMock(content=json.dumps(body).encode("utf-8"))
+    response.json.return_value = body
+
+    assert loads_response(response) == body
+
+
+def _per_slug_result(points):
+    result = [{"datetime": dt, "data": [{"slug": slug, "value": value} for slug, value in data]} for dt, data in points]
+    return {"query_0": {"timeseriesDataPerSlugJson": result}}
+
+
+@pytest.mark.parametrize(
+    "points",
+    [
+        # Integer columns stay int64 only when every datetime has an integer value.
+        [("2020-01-01T00:00:00Z", [("bitcoin", 1), ("ethereum", 2.5)]), ("2020-01-02T00:00:00Z", [("bitcoin", 3)])],
+        # Columns are ordered by first appearance.
+        [("2020-01-01T00:00:00Z", [("ethereum", 1.0)]), ("2020-01-02T00:00:00Z", [("bitcoin", None), ("ethereum", 2.0)])],
+        [("2020-01-01T00:00:00Z", [("bitcoin", 1), ("bitcoin", 2.0)])],
+        [("2020-01-01T00:00:00Z", [("bitcoin", None)])],
+        [("2020-01-01T00:00:00Z", [("bitcoin", "n/a")])],
+        [("2020-01-01T00:00:00Z", [("bitcoin", 2**60)])],
+        [("2020-01-01T00:00:00Z", [])],
+        [],
+    ],
+)
+def test_per_slug_pivot_matches_per_datetime_rows(points):
+    data = _per_slug_result(points)
+    expected = convert_to_datetime_idx_df(_per_slug_rows(data["query_0"]["timeseriesDataPerSlugJson"]))
+
+    pdt.assert_frame_equal(transform_timeseries_data_per_slug_query_result(0, "price_usd", data), expected)
+
+
+def test_per_slug_long_format():
+    data = _per_slug_result(
+        [("2020-01-01T00:00:00Z", [("bitcoin", 1.0), ("ethereum", 2.0)]), ("2020-01-02T00:00:00Z", [("bitcoin", 3.0)])]
+    )
+    df = transform_timeseries_data_per_slug_query_result(0, "price_usd", data, long_format=True)
+
+    assert df.index.name == "datetime"
+    assert df["slug"].tolist() == ["bitcoin", "ethereum", "bitcoin"]
+    assert df["value"].tolist() == [1.0, 2.0, 3.0]
+    assert df.index.tolist() == parse_utc_datetimes(["2020-01-01T00:00:00Z"] * 2 + ["2020-01-02T00:00:00Z"]).tolist()
+
+
+def test_merge_long_frames_dedupes_by_datetime_and_slug():
+    first = transform_timeseries_data_per_slug_query_result(
+        0, "price_usd", _per_slug_result([("2020-01-01T00:00:00Z", [("bitcoin", 1.0), ("ethereum", 2.0)])]), long_format=True
+    )
+    second = transform_timeseries_data_per_slug_query_result(
+        0,
+        "price_usd",
+        _per_slug_result(
+            [("2020-01-01T00:00:00Z", [("bitcoin", 5.0)]), ("2020-01-02T00:00:00Z", [("bitcoin", 3.0)])]
+        ),
+        long_format=True,
+    )
+    merged = merge_long_frames([first, second])
+
+    assert list(zip(merged["slug"], merged["value"])) == [("ethereum", 2.0), ("bitcoin", 5.0), ("bitcoin", 3.0)]
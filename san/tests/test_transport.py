@@ -1,3 +1,5 @@
+import gzip
+import hashlib
 import json
 import threading
 from http.server import BaseHTTPRequestHandler, HTTPServer
@@ -18,6 +20,8 @@ from san.error import (
     SanTimeoutError,
 )
 from san.graphql import execute_gql, get_response_headers
+from san.streaming import parse_streamed_response
+from san.query_builder import Document
 from san.transport import RequestsTransport
 
 
@@ -47,6 +51,7 @@ def restore_api_config():
     original_backoff_factor = ApiConfig.request_backoff_factor
     original_pool_connections = ApiConfig.pool_connections
     original_pool_maxsize = ApiConfig.pool_maxsize
+    original_request_compression_threshold = ApiConfig.request_compression_threshold
 
     yield
 
@@ -55,6 +60,7 @@ def restore_api_config():
     ApiConfig.request_backoff_factor = original_backoff_factor
     ApiConfig.pool_connections = original_pool_connections
     ApiConfig.pool_maxsize = original_pool_maxsize
+    ApiConfig.request_compression_threshold = original_request_compression_threshold
 
 
 @pytest.mark.parametrize(
@@ -372,3 +378,173 @@ def test_transport_does_not_retry_on_429():
         server.shutdown()
         server.server_close()
         thread.join(timeout=1)
+
+
+class PersistedQueryServer:
+    """Stand-in GraphQL server implementing Automatic Persisted Queries."""
+
+    def __init__(self, supported=True):
+        self.supported = supported
+        self.documents = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length))
+                server.requests.append(body)
+                status, payload = server.respond(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(json.dumps(payload).encode())
+
+            def log_message(self, format, *args):
+                return
+
+        self._http = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._http.server_port}"
+
+    def respond(self, body):
+        persisted = (body.get("extensions") or {}).get("persistedQuery")
+        query = body.get("query")
+        if not self.supported:
+            if query is None:
+                return 400, {"errors": [{"message": "No query document supplied"}]}
+        elif persisted is not None:
+            digest = persisted["sha256Hash"]
+            if query is None:
+                if digest not in self.documents:
+                    return 200, {"errors": [{"message": "PersistedQueryNotFound"}]}
+                query = self.documents[digest]
+            elif hashlib.sha256(query.encode()).hexdigest() != digest:
+                return 400, {"errors": [{"message": "provided sha does not match query"}]}
+            else:
+                self.documents[digest] = query
+        return 200, {"data": {"query_0": {"query_length": len(query), "variables": body.get("variables")}}}
+
+    def __enter__(self):
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+@pytest.fixture
+def persisted_queries():
+    ApiConfig.persisted_queries = True
+    yield
+    ApiConfig.persisted_queries = False
+
+
+def test_persisted_queries_register_once_then_send_hash_only(persisted_queries):
+    document = Document("query($x_0: Int) { query_0: field(x: $x_0) }", {"x_0": 1})
+
+    with PersistedQueryServer() as server:
+        transport = RequestsTransport(base_url=server.url)
+        first = transport.execute(document)
+        second = transport.execute(Document(str(document), {"x_0": 2}))
+
+    assert first.json()["data"]["query_0"] == {"query_length": len(document), "variables": {"x_0": 1}}
+    assert second.json()["data"]["query_0"]["variables"] == {"x_0": 2}
+    # Miss, registration, then a hash-only hit.
+    assert ["query" in body for body in server.requests] == [False, True, False]
+    assert transport.persisted_query_stats() == {"hits": 1, "misses": 1}
+
+
+def test_persisted_queries_fall_back_when_server_lacks_support(persisted_queries):
+    with PersistedQueryServer(supported=False) as server:
+        transport = RequestsTransport(base_url=server.url)
+        transport.execute("{ query_0: field }")
+        transport.execute("{ query_0: field }")
+
+    # After the first rejection full documents are sent directly.
+    assert ["query" in body for body in server.requests] == [False, True, True]
+
+
+def test_persisted_queries_are_off_by_default():
+    with PersistedQueryServer() as server:
+        RequestsTransport(base_url=server.url).execute("{ query_0: field }")
+
+    assert server.requests == [{"query": "{ query_0: field }"}]
+
+
+class GzipServer:
+    """Stand-in GraphQL server that gzips responses and accepts gzipped requests."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                server.requests.append((dict(self.headers), json.loads(body)))
+
+                data = json.dumps({"data": {"query_0": {"rows": server.rows}}}).encode()
+                compress = "gzip" in self.headers.get("Accept-Encoding", "")
+                if compress:
+                    data = gzip.compress(data)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if compress:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                return
+
+        self._http = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._http.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+def test_transport_negotiates_compressed_responses_and_counts_bytes():
+    rows = [[i, 1.5] for i in range(2000)]
+
+    with GzipServer(rows) as server:
+        transport = RequestsTransport(base_url=server.url)
+        response = transport.execute("{ query_0: rows }")
+        streamed = transport.execute("{ query_0: rows }", stream=True)
+        streamed_json = parse_streamed_response(transport.iter_content(streamed, chunk_size=1024))
+
+    assert "gzip" in server.requests[0][0]["Accept-Encoding"]
+    assert response.json()["data"]["query_0"]["rows"] == rows
+    assert streamed_json["data"]["query_0"]["rows"].records() == rows
+
+    stats = transport.transfer_stats()
+    body_size = len(response.content)
+    assert stats["responses"] == 2
+    assert stats["response_bytes"] == 2 * body_size
+    assert stats["response_wire_bytes"] < body_size
+
+
+def test_transport_compresses_large_request_bodies():
+    ApiConfig.request_compression_threshold = 1000
+    large_query = "{ query_0: rows }" + " " * 2000
+
+    with GzipServer([]) as server:
+        transport = RequestsTransport(base_url=server.url)
+        transport.execute("{ query_0: rows }")
+        transport.execute(large_query)
+
+    assert "Content-Encoding" not in server.requests[0][0]
+    assert server.requests[1][0]["Content-Encoding"] == "gzip"
+    assert server.requests[1][1] == {"query": large_query}
+    stats = transport.transfer_stats()
+    assert stats["request_wire_bytes"] < stats["request_bytes"]
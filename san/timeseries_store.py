@@ -0,0 +1,213 @@
+"""
+Local time-series store that only downloads the parts of a range it does not hold yet.
+
+    store = san.TimeseriesStore("~/.cache/sanpy/timeseries")
+    store.get("price_usd", slug="bitcoin", from_date="2018-01-01", to_date="utc_now", interval="1d")
+
+Each (metric, selector, interval, version, aggregation) series keeps the
+[from, to] spans that were already fetched. A call only requests the gaps,
+all in one batched GraphQL document, and stitches them into the held frame.
+The point of the current, still incomplete interval is returned but never
+kept, so include_incomplete_data=True does not affect later calls.
+"""
+
+import datetime
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+import san.sanbase_graphql
+import san.sanbase_graphql_helper as sgh
+from san.error import SanError
+from san.graphql import execute_gql
+from san.param_validation import validate_kwargs
+from san.query_builder import build_document
+from san.transform import transform_timeseries_data_query_result
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class TimeseriesStore:
+    """
+    Args:
+        path: Directory where series are persisted. None keeps them in memory only.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path).expanduser() if path is not None else None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+        self._series = {}
+        # self._lock guards the shared dicts and counters; each series has its own lock held while it is fetched.
+        self._lock = threading.Lock()
+        self._series_locks = {}
+        self._counters = {"requests": 0, "gaps_fetched": 0, "points_fetched": 0}
+
+    def get(self, metric, slug=None, selector=None, **kwargs):
+        """
+        Same arguments as `san.get(metric, slug=..., ...)` for `getMetric` metrics.
+        Returns a frame with a DatetimeIndex covering [from_date, to_date].
+        """
+        validate_kwargs("TimeseriesStore.get", kwargs)
+        kwargs.pop("idx", None)
+        if (slug is None) == (selector is None):
+            raise SanError('Exactly one of "slug" or "selector" must be provided to TimeseriesStore.get')
+
+        interval = kwargs.pop("interval", sgh._DEFAULT_INTERVAL)
+        step = sgh.interval_to_timedelta(interval)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        from_dt = _floor(sgh.resolve_from_date(kwargs.pop("from_date", sgh._default_from_date()), now), step)
+        to_dt = sgh.resolve_to_date(kwargs.pop("to_date", sgh._default_to_date()), now)
+        if from_dt > to_dt:
+            raise SanError(f"from_date {from_dt.isoformat()} is after to_date {to_dt.isoformat()}")
+
+        target = {"slug": slug} if slug is not None else {"selector": selector}
+        key = _series_key(metric, target, interval, kwargs)
+
+        with self._series_lock(key):
+            series = self._load(key)
+            gaps = _missing_spans(series["spans"], from_dt, to_dt)
+            if gaps:
+                frames = self._fetch(metric, target, interval, step, kwargs, gaps)
+                frame = _stitch(series["frame"], frames)
+                # The current interval can still change, so it is never recorded as held and its point,
+                # returned with include_incomplete_data=True, is not kept.
+                current_interval = _floor(now, step)
+                series["frame"] = frame if frame.empty else frame.loc[frame.index < pd.Timestamp(current_interval)]
+                held_until = min(to_dt, current_interval - datetime.timedelta(microseconds=1))
+                series["spans"] = _merge_spans(series["spans"] + [(start, min(end, held_until)) for start, end in gaps])
+                self._save(key, series)
+            else:
+                frame = series["frame"]
+
+        if frame.empty:
+            return frame
+        return frame.loc[pd.Timestamp(from_dt) : pd.Timestamp(to_dt)].copy()
+
+    def spans(self, metric, slug=None, selector=None, **kwargs):
+        """Return the [from, to] spans held locally for a series."""
+        target = {"slug": slug} if slug is not None else {"selector": selector}
+        interval = kwargs.pop("interval", sgh._DEFAULT_INTERVAL)
+        key = _series_key(metric, target, interval, kwargs)
+        with self._series_lock(key):
+            return list(self._load(key)["spans"])
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["series"] = len(self._series)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._series = {}
+            if self.path is not None:
+                for file in self.path.glob("*.pkl"):
+                    file.unlink()
+
+    def _fetch(self, metric, target, interval, step, kwargs, gaps):
+        queries = []
+        for idx, (start, end) in enumerate(gaps):
+            # Gaps start where a held span ends; aligning to the interval refetches at most one known point.
+            from_date = _floor(start, step).isoformat()
+            query_kwargs = dict(kwargs, interval=interval, from_date=from_date, to_date=end.isoformat(), **target)
+            queries.append(san.sanbase_graphql._timeseries_data_fragment(idx, metric, **query_kwargs))
+
+        result = execute_gql(build_document(queries))
+        frames = [transform_timeseries_data_query_result(idx, metric, result) for idx in range(len(gaps))]
+
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["gaps_fetched"] += len(gaps)
+            self._counters["points_fetched"] += sum(len(frame) for frame in frames)
+        return frames
+
+    def _series_lock(self, key):
+        with self._lock:
+            return self._series_locks.setdefault(key, threading.Lock())
+
+    def _load(self, key):
+        """Return the held series. Must be called with the series lock."""
+        with self._lock:
+            if key in self._series:
+                return self._series[key]
+
+        series = None
+        file = self._file(key)
+        if file is not None and file.exists():
+            series = pd.read_pickle(file)
+        if series is None:
+            series = {"spans": [], "frame": pd.DataFrame()}
+
+        with self._lock:
+            return self._series.setdefault(key, series)
+
+    def _save(self, key, series):
+        file = self._file(key)
+        if file is None:
+            return
+        tmp_file = file.with_suffix(".tmp")
+        pd.to_pickle(series, tmp_file)
+        tmp_file.replace(file)
+
+    def _file(self, key):
+        if self.path is None:
+            return None
+        return self.path / (hashlib.sha256(key.encode("utf-8")).hexdigest() + ".pkl")
+
+
+def _series_key(metric, target, interval, kwargs):
+    key = {
+        "metric": metric,
+        "target": target,
+        "interval": interval,
+        "version": kwargs.get("version"),
+        "aggregation": kwargs.get("aggregation"),
+        "transform": kwargs.get("transform"),
+        "only_finalized_data": kwargs.get("only_finalized_data"),
+    }
+    return json.dumps(key, sort_keys=True, default=str)
+
+
+def _floor(dt, step):
+    return dt - (dt - _EPOCH) % step
+
+
+def _missing_spans(spans, from_dt, to_dt):
+    gaps = []
+    cursor = from_dt
+    for start, end in spans:
+        if end < cursor or start > to_dt:
+            continue
+        if start > cursor:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+        if cursor >= to_dt:
+            return gaps
+
+    gaps.append((cursor, to_dt))
+    return gaps
+
+
+def _merge_spans(spans):
+    merged = []
+    for start, end in sorted(span for span in spans if span[0] <= span[1]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _stitch(frame, frames):
+    frames = [f for f in [frame] + frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    stitched = pd.concat(frames)
+    stitched = stitched[~stitched.index.duplicated(keep="last")]
+    return stitched.sort_index()
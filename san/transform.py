@@ -4,11 +4,23 @@ In order to have metrics, which require different order, we need to have transfo
 """
 
 import operator
-from san.pandas_utils import convert_to_datetime_idx_df
+
+import numpy as np
+import pandas as pd
+
+from san.arrow import frame_table, per_slug_table, timeseries_table
+from san.pandas_utils import convert_to_datetime_idx_df, convert_timeseries_to_df, parse_utc_datetimes
 from functools import reduce
 from collections import OrderedDict
 from san.error import SanError
 from san.sanbase_graphql_helper import QUERY_MAPPING
+from san.streaming import StreamedColumns
+
+# Integers up to 2**53 survive a round trip through float64.
+_MAX_EXACT_FLOAT_INT = 2**53
+
+_get_slug = operator.itemgetter("slug")
+_get_value = operator.itemgetter("value")
 
 QUERY_PATH_MAP = {
     "eth_top_transactions": ["ethTopTransactions"],
@@ -35,10 +47,13 @@ def path_to_data(idx, query, data):
     )
 
 
-def transform_timeseries_data_query_result(idx, query, data):
+def transform_timeseries_data_query_result(idx, query, data, as_arrow=False):
     """
     If there is a transforming function for this query, then the result is
     passed for it for another transformation
+
+    With `as_arrow=True` a pyarrow.Table is returned; getMetric points are
+    converted without building a DataFrame.
     """
     if query in QUERY_PATH_MAP:
         result = path_to_data(idx, query, data)
@@ -49,15 +64,65 @@ def transform_timeseries_data_query_result(idx, query, data):
 
     if query + "_transform" in globals():
         result = globals()[query + "_transform"](result)
+    elif query not in QUERY_PATH_MAP and query not in QUERY_MAPPING:
+        return timeseries_table(result) if as_arrow else convert_timeseries_to_df(result)
 
-    return convert_to_datetime_idx_df(result)
+    frame = convert_to_datetime_idx_df(result)
+    return frame_table(frame) if as_arrow else frame
 
 
-def transform_timeseries_data_per_slug_query_result(idx, query, data):
+def transform_timeseries_data_per_slug_query_result(idx, query, data, long_format=False, as_arrow=False):
+    """
+    Pivot a timeseriesDataPerSlugJson result into a frame with one column per slug,
+    or with `long_format=True` into a frame with "slug" and "value" columns and one
+    row per returned point. `as_arrow=True` returns the long layout as a pyarrow.Table
+    with a "datetime" column.
+    """
     if query in QUERY_MAPPING:
         raise SanError(f"The get_many call is available only for get_metric. Called with {query}")
 
     result = path_to_data(idx, "get_metric_many", data)
+    if isinstance(result, StreamedColumns) and not result.is_columnar:
+        result = result.records()
+
+    if isinstance(result, StreamedColumns):
+        columns = result.columns or {"datetime": [], "count": [], "slug": [], "value": []}
+        datetimes, counts, slugs, values = columns["datetime"], columns["count"], columns["slug"], columns["value"]
+    else:
+        datetimes, counts, slugs, values = _gather_per_slug(result)
+    if as_arrow:
+        return per_slug_table(datetimes, counts, slugs, values)
+    rows = np.repeat(np.arange(len(datetimes)), counts)
+
+    if long_format:
+        index = parse_utc_datetimes(datetimes)[rows]
+        return pd.DataFrame({"slug": slugs, "value": values}, index=index)
+
+    frame = _pivot_per_slug(datetimes, rows, slugs, values)
+    if frame is not None:
+        return frame
+
+    if isinstance(result, StreamedColumns):
+        result = result.records()
+    return convert_to_datetime_idx_df(_per_slug_rows(result))
+
+
+def _gather_per_slug(result):
+    # Gather the points into flat columns instead of building one dict per datetime.
+    datetimes = []
+    counts = []
+    slugs = []
+    values = []
+    for datetime_point in result:
+        slug_data = datetime_point["data"]
+        datetimes.append(datetime_point["datetime"])
+        counts.append(len(slug_data))
+        slugs.extend(map(_get_slug, slug_data))
+        values.extend(map(_get_value, slug_data))
+    return datetimes, counts, slugs, values
+
+
+def _per_slug_rows(result):
     rows = []
 
     for datetime_point in result:
@@ -67,7 +132,51 @@ def transform_timeseries_data_per_slug_query_result(idx, query, data):
 
         rows.append(row)
 
-    return convert_to_datetime_idx_df(rows)
+    return rows
+
+
+def _pivot_per_slug(datetimes, rows, slugs, values):
+    """
+    Fill a preallocated (datetimes x slugs) float array with the points.
+    Returns None for results the array cannot represent exactly as pandas
+    would from per-datetime dicts, e.g. non-numeric values, an all-null slug,
+    repeated slugs within one datetime or integers beyond float precision.
+    """
+    value_types = set(map(type, values))
+    if not values or not value_types <= {int, float, type(None)}:
+        return None
+
+    codes, columns = pd.factorize(pd.Index(slugs, dtype=object), sort=False)
+    cells = rows * len(columns) + codes
+    if np.bincount(cells, minlength=len(datetimes) * len(columns)).max() > 1:
+        return None
+
+    if type(None) in value_types:
+        values = [np.nan if value is None else value for value in values]
+    flat_values = np.array(values, dtype=np.float64)
+    if int in value_types and np.nanmax(np.abs(flat_values), initial=0) > _MAX_EXACT_FLOAT_INT:
+        return None
+
+    matrix = np.full(len(datetimes) * len(columns), np.nan)
+    matrix[cells] = flat_values
+    matrix = matrix.reshape(len(datetimes), len(columns))
+
+    filled = ~np.isnan(matrix)
+    if not filled.any(axis=0).all():
+        return None
+
+    frame = pd.DataFrame(matrix, index=parse_utc_datetimes(datetimes), columns=list(columns))
+    if int in value_types:
+        # pandas keeps int64 for columns holding only integers at every datetime.
+        is_float = np.zeros(len(cells), dtype=bool)
+        if float in value_types:
+            is_float = np.fromiter((type(value) is float for value in values), dtype=bool, count=len(values))
+        has_float = np.bincount(codes[is_float], minlength=len(columns)) > 0
+        int_columns = [column for i, column in enumerate(columns) if filled[:, i].all() and not has_float[i]]
+        if int_columns:
+            frame = frame.astype({column: np.int64 for column in int_columns})
+
+    return frame
 
 
 def eth_top_transactions_transform(data):
@@ -1,36 +1,162 @@
+import contextlib
+import functools
+import gzip
+import hashlib
+import json
 import threading
 
 import requests
 from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
 from urllib3.util.retry import Retry
 
 from san.api_config import ApiConfig
 from san.env_vars import SANBASE_GQL_HOST
 from san.error import SanNetworkError, SanTimeoutError, SanTransportError
+from san.query_builder import query_variables
+from san.streaming import STREAM_CHUNK_SIZE
+
+RETRY_STATUS_CODES = (408, 500, 502, 503, 504)
+MAX_BACKOFF_SECONDS = 120
+# Automatic persisted query errors are short; larger bodies are never inspected for them.
+_PERSISTED_QUERY_ERROR_MAX_BYTES = 4096
+_NO_QUERY_MESSAGE = "No query document supplied"
+# Every encoding urllib3 can decode here: gzip and deflate, plus br and zstd when brotli / zstandard are installed.
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+_REQUEST_COMPRESSION_LEVEL = 5
 
 
 class RequestsTransport:
     def __init__(self, base_url=SANBASE_GQL_HOST):
         self.base_url = base_url
         self._local = threading.local()
+        self._lock = threading.Lock()
+        self._persisted_queries_supported = True
+        self._persisted_query_counters = {"hits": 0, "misses": 0}
+        self._transfer_counters = dict.fromkeys(
+            ["responses", "response_bytes", "response_wire_bytes", "request_bytes", "request_wire_bytes"], 0
+        )
+
+    def execute(self, gql_query_str, headers=None, stream=False):
+        """
+        POST the query. With stream=True only the headers are read; the body
+        is consumed with iter_content and the response must be closed.
+
+        With ApiConfig.persisted_queries the first attempt sends only the
+        SHA-256 of the document (Automatic Persisted Queries). When the server
+        does not know the hash yet, the full document is sent to register it.
+        """
+        if ApiConfig.persisted_queries and self._persisted_queries_supported and not stream:
+            return self._execute_persisted(gql_query_str, headers)
+        return self._post(request_payload(gql_query_str), headers, stream)
+
+    def persisted_query_stats(self):
+        with self._lock:
+            return dict(self._persisted_query_counters)
+
+    def transfer_stats(self):
+        """
+        Bytes sent and received. `*_wire_bytes` are the (possibly compressed)
+        sizes on the connection, `response_bytes` / `request_bytes` the JSON sizes.
+        Request sizes are only measured while request compression is enabled.
+        """
+        with self._lock:
+            return dict(self._transfer_counters)
+
+    def _execute_persisted(self, gql_query_str, headers):
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": document_hash(str(gql_query_str))}}
+        payload = request_payload(gql_query_str)
+        query = payload.pop("query")
+
+        response = self._post(dict(payload, extensions=extensions), headers)
+        error = _persisted_query_error(response)
+        if error is None:
+            with self._lock:
+                self._persisted_query_counters["hits"] += 1
+            return response
 
-    def execute(self, gql_query_str, headers=None):
-        request_headers = headers or {}
+        with self._lock:
+            self._persisted_query_counters["misses"] += 1
+            if error == "PersistedQueryNotSupported":
+                self._persisted_queries_supported = False
+        return self._post(dict(payload, query=query, extensions=extensions), headers)
+
+    def _post(self, payload, headers, stream=False):
+        request_headers = dict(headers or {})
+        request_headers.setdefault("Accept-Encoding", ACCEPT_ENCODING if ApiConfig.response_compression else "identity")
+        body = self._encode_body(payload, request_headers)
         session = self._get_session()
 
+        with _map_request_errors():
+            if body is None:
+                response = session.post(
+                    self.base_url,
+                    json=payload,
+                    headers=request_headers,
+                    timeout=ApiConfig.request_timeout,
+                    stream=stream,
+                )
+            else:
+                response = session.post(
+                    self.base_url,
+                    data=body,
+                    headers=request_headers,
+                    timeout=ApiConfig.request_timeout,
+                    stream=stream,
+                )
+
+        if not stream:
+            content = getattr(response, "content", None)
+            if isinstance(content, bytes):
+                self._record_response(response, len(content))
+        return response
+
+    def iter_content(self, response, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Yield the body of a streamed response in byte chunks. Compressed bodies
+        are decompressed chunk by chunk as they arrive.
+        """
+        size = 0
         try:
-            return session.post(
-                self.base_url,
-                json={"query": gql_query_str},
-                headers=request_headers,
-                timeout=ApiConfig.request_timeout,
-            )
-        except requests.exceptions.Timeout as exc:
-            raise SanTimeoutError(f"Error running query: ({exc})") from exc
-        except requests.exceptions.ConnectionError as exc:
-            raise SanNetworkError(f"Error running query: ({exc})") from exc
-        except requests.exceptions.RequestException as exc:
-            raise SanTransportError(f"Error running query: ({exc})") from exc
+            with _map_request_errors():
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            self._record_response(response, size)
+
+    def _encode_body(self, payload, headers):
+        """Gzipped JSON body when request compression applies, else None to let requests encode the payload."""
+        threshold = ApiConfig.request_compression_threshold
+        if threshold is None:
+            return None
+
+        body = json.dumps(payload, allow_nan=False).encode("utf-8")
+        wire_body = body
+        if len(body) >= threshold:
+            wire_body = gzip.compress(body, compresslevel=_REQUEST_COMPRESSION_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+        headers["Content-Type"] = "application/json"
+
+        with self._lock:
+            self._transfer_counters["request_bytes"] += len(body)
+            self._transfer_counters["request_wire_bytes"] += len(wire_body)
+        return wire_body
+
+    def _record_response(self, response, size):
+        raw = getattr(response, "raw", None)
+        try:
+            # Bytes urllib3 read from the connection before decompressing them.
+            wire_size = raw.tell()
+        except (AttributeError, OSError, TypeError):
+            wire_size = size
+        if not isinstance(wire_size, int):
+            wire_size = size
+
+        with self._lock:
+            self._transfer_counters["responses"] += 1
+            self._transfer_counters["response_bytes"] += size
+            self._transfer_counters["response_wire_bytes"] += wire_size
 
     def _get_session(self):
         session = getattr(self._local, "session", None)
@@ -57,7 +183,7 @@ class RequestsTransport:
             read=ApiConfig.request_retry_count,
             status=ApiConfig.request_retry_count,
             allowed_methods=frozenset(["POST"]),
-            status_forcelist=(408, 500, 502, 503, 504),
+            status_forcelist=RETRY_STATUS_CODES,
             backoff_factor=ApiConfig.request_backoff_factor,
             respect_retry_after_header=True,
             raise_on_status=False,
@@ -70,3 +196,71 @@ class RequestsTransport:
             ApiConfig.pool_connections,
             ApiConfig.pool_maxsize,
         )
+
+
+def request_payload(gql_query_str):
+    """JSON body of a GraphQL request. Variables are included when the query is a Document carrying them."""
+    payload = {"query": gql_query_str}
+    variables = query_variables(gql_query_str)
+    if variables is not None:
+        payload["variables"] = variables
+    return payload
+
+
+@functools.lru_cache(maxsize=1024)
+def document_hash(document):
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
+def _persisted_query_error(response):
+    """Return "PersistedQueryNotFound" / "PersistedQueryNotSupported" for an APQ error response, else None."""
+    content = getattr(response, "content", None)
+    if not isinstance(content, bytes) or len(content) > _PERSISTED_QUERY_ERROR_MAX_BYTES:
+        return None
+    if b"PersistedQuery" not in content and _NO_QUERY_MESSAGE.encode() not in content:
+        return None
+
+    try:
+        errors = response.json().get("errors") or []
+    except (ValueError, AttributeError):
+        return None
+
+    for error in errors if isinstance(errors, list) else []:
+        if not isinstance(error, dict):
+            continue
+        code = (error.get("extensions") or {}).get("code")
+        message = error.get("message")
+        # Servers without APQ support reject a request that has no query text.
+        if message in ("PersistedQueryNotSupported", _NO_QUERY_MESSAGE) or code == "PERSISTED_QUERY_NOT_SUPPORTED":
+            return "PersistedQueryNotSupported"
+        if message == "PersistedQueryNotFound" or code == "PERSISTED_QUERY_NOT_FOUND":
+            return "PersistedQueryNotFound"
+    return None
+
+
+@contextlib.contextmanager
+def _map_request_errors():
+    try:
+        yield
+    except requests.exceptions.Timeout as exc:
+        raise SanTimeoutError(f"Error running query: ({exc})") from exc
+    except requests.exceptions.ConnectionError as exc:
+        raise SanNetworkError(f"Error running query: ({exc})") from exc
+    except requests.exceptions.RequestException as exc:
+        raise SanTransportError(f"Error running query: ({exc})") from exc
+
+
+def retry_backoff(retry_number, retry_after=None):
+    """
+    Seconds to wait before the given retry (1-based), following urllib3's Retry:
+    the first retry is immediate, later ones back off exponentially and a
+    Retry-After header takes precedence.
+    """
+    if retry_after is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+    if retry_number <= 1:
+        return 0.0
+    return min(ApiConfig.request_backoff_factor * (2 ** (retry_number - 1)), MAX_BACKOFF_SECONDS)
@@ -1,8 +1,7 @@
-import re
-
 import san.sanbase_graphql
 from san.graphql import execute_gql, get_response_headers
 from san.error import SanEmptyResultError, SanError, SanRateLimitError
+from san.rate_limit import retry_after_seconds
 
 
 def is_rate_limit_exception(exception):
@@ -10,10 +9,10 @@ def is_rate_limit_exception(exception):
 
 
 def rate_limit_time_left(exception):
-    match = re.search(r"Try again in (\d+) seconds", str(exception))
-    if match is None:
+    seconds = retry_after_seconds(exception)
+    if seconds is None:
         raise SanError("The exception does not contain a retry-after rate limit delay.")
-    return int(match.group(1))
+    return seconds
 
 
 def api_calls_remaining():
@@ -19,6 +19,12 @@ setuptools.setup(
     install_requires=["pandas>=1.3.0", "requests", "urllib3", "iso8601", "setuptools", "typer>=0.9.0"],
     extras_require={
         "extras": ["numpy", "matplotlib", "scipy", "mlfinlab"],
+        "async": ["httpx"],
+        "http2": ["httpx[http2]"],
+        "fast": ["orjson"],
+        "compression": ["urllib3[brotli,zstd]"],
+        "yaml": ["pyyaml"],
+        "arrow": ["pyarrow>=14"],
         "dev": ["ruff", "pytest"],
     },
     entry_points={